@@ -0,0 +1,110 @@
+"""
+Incremental SEO Audit Support
+=============================
+Loads the previous seo-audit-report.csv into a URL-keyed index, decides
+which URLs need auditing again and diffs the new results against the old
+ones.
+
+A URL is audited again when it is new, failed last time, or may have
+changed. A URL has not changed if the sitemap's <lastmod> is older than
+the start of the run that wrote the previous report; those rows are
+reused without any request. All other
+URLs go through the conditional-GET page cache, so unchanged pages cost
+a 304 and no parsing.
+
+The delta report (seo-audit-delta.csv) lists issues that were newly
+introduced or newly resolved since the previous report. Issues are
+compared without their numbers, so "Title too long (71 chars)" becoming
+"(65 chars)" is not reported as a change.
+
+Usage:
+    python seo_audit.py --incremental
+"""
+
+import csv
+import os
+import re
+from datetime import datetime
+
+from audit_report import REPORT_FILE, STARTED_SUFFIX, read_report
+from sitemap_discovery import discover, parse_lastmod
+
+DELTA_FILE = 'seo-audit-delta.csv'
+
+
+def load_report(path=REPORT_FILE):
+    """{url: result dict} from a report written by seo_audit.py"""
+    if not os.path.exists(path):
+        return {}
+    return {result['url']: result for result in read_report(path)}
+
+
+def load_sitemap_lastmod(sitemaps=None):
+    """{url: lastmod} from the site's sitemaps (sitemap_discovery.py)"""
+    return {url: modified for url, modified in discover(sitemaps=sitemaps) if modified}
+
+
+def plan_incremental(urls, previous, report_time, lastmod=None):
+    """
+    Split urls into (to_audit, reused).
+
+    reused maps URLs to their previous result: pages that were audited
+    fine last time and whose sitemap lastmod predates report_time, the
+    start of the previous run. Date-only lastmod values count as changed
+    on that run's own day. Without report_time nothing is reused.
+    """
+    lastmod = lastmod or {}
+    to_audit = []
+    reused = {}
+    for url in urls:
+        row = previous.get(url)
+        modified = lastmod.get(url)
+        unchanged = modified is not None and report_time is not None and (
+            modified < report_time if modified.time() != datetime.min.time()
+            else modified.date() < report_time.date()
+        )
+        if row and row['status'] == 'success' and unchanged:
+            reused[url] = row
+        else:
+            to_audit.append(url)
+    return to_audit, reused
+
+
+def report_time(path=REPORT_FILE):
+    """
+    When the run that wrote the previous report started (UTC), or None.
+
+    Not the report's mtime: a page edited while that run was going may
+    have been fetched before the edit.
+    """
+    try:
+        with open(path + STARTED_SUFFIX, 'r', encoding='utf-8') as f:
+            return datetime.fromisoformat(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def issue_key(issue):
+    """Issue text without its numbers, e.g. '⚠️ Title too long'"""
+    return re.sub(r'\s*\(.*\)$', '', issue)
+
+
+def diff_result(previous, result):
+    """[(url, 'introduced' | 'resolved', issue)] for one page"""
+    url = result['url']
+    old = {issue_key(issue): issue for issue in previous.get(url, {}).get('issues', [])}
+    new = {issue_key(issue): issue for issue in result['issues']}
+    return ([(url, 'introduced', new[key]) for key in new if key not in old]
+            + [(url, 'resolved', old[key]) for key in old if key not in new])
+
+
+def diff_results(previous, results):
+    """[(url, 'introduced' | 'resolved', issue)] between two audits"""
+    return [row for result in results for row in diff_result(previous, result)]
+
+
+def write_delta(delta, path=DELTA_FILE):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['URL', 'Change', 'Issue'])
+        writer.writerows(delta)
@@ -0,0 +1,390 @@
+"""
+SEO Audit History
+=================
+Every seo_audit.py run is appended to a SQLite store (seo-audit-history.db),
+one row per (run, URL), so trends and regressions can be queried across
+hundreds of runs without re-reading old CSV reports.
+
+URLs are stored once in a lookup table and referenced by id. Page rows are
+clustered by (run_id, url_id) for whole-run queries, with a second index
+on (url_id, run_id) for one page's history. The per-run totals shown by
+"runs" are computed once when a run finishes, so trend queries never scan
+page rows.
+
+An interrupted audit keeps appending to its unfinished run when it resumes
+from the partial report; rows are replaced per (run, URL), never duplicated.
+
+Usage:
+    python audit_history.py                              # runs with issue counts
+    python audit_history.py page <url>                   # one page across runs
+    python audit_history.py lost description --days 30   # lost since (also: title, h1)
+    python audit_history.py lost description --since 2026-10-01
+    python audit_history.py regressions [FROM_RUN TO_RUN] [--min-drop 100]
+"""
+
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+from seo_audit import AUDIT_VERSION
+
+SEO_AUDIT_HISTORY = os.environ.get('SEO_AUDIT_HISTORY', 'seo-audit-history.db')
+
+# Rows are written in batches of this many
+INSERT_BATCH = 500
+
+# Word count drops smaller than this are not reported as regressions
+MIN_WORD_DROP = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    audit_version INTEGER NOT NULL,
+    pages INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    with_issues INTEGER NOT NULL DEFAULT 0,
+    no_title INTEGER NOT NULL DEFAULT 0,
+    no_description INTEGER NOT NULL DEFAULT 0,
+    no_h1 INTEGER NOT NULL DEFAULT 0,
+    low_word_count INTEGER NOT NULL DEFAULT 0,
+    avg_word_count REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs (started_at);
+
+CREATE TABLE IF NOT EXISTS urls (
+    url_id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS page_audits (
+    run_id INTEGER NOT NULL,
+    url_id INTEGER NOT NULL,
+    success INTEGER NOT NULL,
+    title_length INTEGER NOT NULL,
+    desc_length INTEGER NOT NULL,
+    has_h1 INTEGER NOT NULL,
+    word_count INTEGER NOT NULL,
+    issue_count INTEGER NOT NULL,
+    issues TEXT NOT NULL,
+    PRIMARY KEY (run_id, url_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_page_audits_url ON page_audits (url_id, run_id);
+"""
+
+# Field name on the command line -> "page has it" condition
+FIELDS = {
+    'title': 'title_length > 0',
+    'description': 'desc_length > 0',
+    'h1': 'has_h1 = 1',
+}
+
+# Options that take a value
+VALUE_OPTIONS = ('--days', '--since', '--min-drop')
+
+
+class AuditHistory:
+    """Append-only store of audit results, one row per run and URL"""
+
+    def __init__(self, path=SEO_AUDIT_HISTORY):
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+        self.url_ids = dict(self.conn.execute('SELECT url, url_id FROM urls'))
+        self.run_id = None
+        self.pending = []
+
+    def start_run(self, resume=False):
+        """
+        Begin a run and return its id.
+
+        With resume, the newest unfinished run is continued instead (an
+        audit picking up its partial report).
+        """
+        if resume:
+            row = self.conn.execute(
+                'SELECT run_id FROM runs WHERE finished_at IS NULL ORDER BY run_id DESC LIMIT 1'
+            ).fetchone()
+            if row:
+                self.run_id = row[0]
+                return self.run_id
+        cursor = self.conn.execute(
+            'INSERT INTO runs (started_at, audit_version) VALUES (?, ?)', (time.time(), AUDIT_VERSION)
+        )
+        self.conn.commit()
+        self.run_id = cursor.lastrowid
+        return self.run_id
+
+    def url_id(self, url):
+        url_id = self.url_ids.get(url)
+        if url_id is None:
+            url_id = self.conn.execute('INSERT INTO urls (url) VALUES (?)', (url,)).lastrowid
+            self.url_ids[url] = url_id
+        return url_id
+
+    def add(self, result):
+        success = result['status'] == 'success'
+        self.pending.append((
+            self.run_id,
+            self.url_id(result['url']),
+            int(success),
+            result['title_length'],
+            result['desc_length'],
+            int(bool(result['h1'])),
+            result['word_count'],
+            len(result['issues']),
+            ' | '.join(result['issues']),
+        ))
+        if len(self.pending) >= INSERT_BATCH:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO page_audits (run_id, url_id, success, title_length, desc_length, '
+                'has_h1, word_count, issue_count, issues) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                self.pending,
+            )
+            self.pending = []
+        self.conn.commit()
+
+    def finish_run(self):
+        """Store the run's totals and mark it finished"""
+        self.flush()
+        totals = self.conn.execute(
+            """
+            SELECT COUNT(*),
+                   COALESCE(SUM(success = 0), 0),
+                   COALESCE(SUM(issue_count > 0), 0),
+                   COALESCE(SUM(title_length = 0), 0),
+                   COALESCE(SUM(desc_length = 0), 0),
+                   COALESCE(SUM(success = 1 AND has_h1 = 0), 0),
+                   COALESCE(SUM(success = 1 AND word_count < 1000), 0),
+                   COALESCE(AVG(CASE WHEN success = 1 THEN word_count END), 0)
+            FROM page_audits WHERE run_id = ?
+            """,
+            (self.run_id,),
+        ).fetchone()
+        self.conn.execute(
+            'UPDATE runs SET finished_at = ?, pages = ?, errors = ?, with_issues = ?, no_title = ?, '
+            'no_description = ?, no_h1 = ?, low_word_count = ?, avg_word_count = ? WHERE run_id = ?',
+            (time.time(), *totals, self.run_id),
+        )
+        self.conn.commit()
+
+    # Queries
+
+    def runs(self, limit=50):
+        """Finished runs, newest first, with their totals"""
+        cursor = self.conn.execute(
+            'SELECT run_id, started_at, pages, errors, with_issues, no_title, no_description, no_h1, '
+            'low_word_count, avg_word_count FROM runs WHERE finished_at IS NOT NULL '
+            'ORDER BY run_id DESC LIMIT ?',
+            (limit,),
+        )
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def latest_runs(self, count=2):
+        """Ids of the newest finished runs, newest first"""
+        return [row[0] for row in self.conn.execute(
+            'SELECT run_id FROM runs WHERE finished_at IS NOT NULL ORDER BY run_id DESC LIMIT ?', (count,)
+        )]
+
+    def page_history(self, url):
+        """[(run_id, started_at, success, title_length, desc_length, has_h1, word_count, issues)]"""
+        url_id = self.url_ids.get(url)
+        if url_id is None:
+            return []
+        return self.conn.execute(
+            """
+            SELECT p.run_id, r.started_at, p.success, p.title_length, p.desc_length, p.has_h1,
+                   p.word_count, p.issues
+            FROM page_audits p JOIN runs r ON r.run_id = p.run_id
+            WHERE p.url_id = ? AND r.finished_at IS NOT NULL
+            ORDER BY p.run_id
+            """,
+            (url_id,),
+        ).fetchall()
+
+    def lost(self, field, since):
+        """
+        URLs that had field (title / description / h1) in a run started
+        since the given timestamp but lack it in the latest run.
+        """
+        latest = self.latest_runs(1)
+        if not latest:
+            return []
+        present = FIELDS[field]
+        return [row[0] for row in self.conn.execute(
+            f"""
+            SELECT u.url
+            FROM page_audits cur JOIN urls u ON u.url_id = cur.url_id
+            WHERE cur.run_id = ? AND cur.success = 1 AND NOT cur.{present}
+              AND EXISTS (
+                  SELECT 1 FROM page_audits old
+                  WHERE old.url_id = cur.url_id AND old.run_id < cur.run_id AND old.success = 1
+                    AND old.{present}
+                    AND old.run_id IN (SELECT run_id FROM runs WHERE started_at >= ? AND finished_at IS NOT NULL)
+              )
+            ORDER BY u.url
+            """,
+            (latest[0], since),
+        )]
+
+    def regressions(self, from_run, to_run, min_drop=MIN_WORD_DROP):
+        """[(url, [what got worse])] between two runs"""
+        rows = self.conn.execute(
+            """
+            SELECT u.url, a.success, b.success, a.title_length, b.title_length, a.desc_length,
+                   b.desc_length, a.has_h1, b.has_h1, a.word_count, b.word_count,
+                   a.issue_count, b.issue_count
+            FROM page_audits a
+            JOIN page_audits b ON b.run_id = ? AND b.url_id = a.url_id
+            JOIN urls u ON u.url_id = a.url_id
+            WHERE a.run_id = ?
+              AND (b.success < a.success
+                   OR (b.success = 1 AND a.success = 1 AND (
+                       (a.title_length > 0 AND b.title_length = 0)
+                       OR (a.desc_length > 0 AND b.desc_length = 0)
+                       OR b.has_h1 < a.has_h1
+                       OR a.word_count - b.word_count >= ?
+                       OR b.issue_count > a.issue_count)))
+            ORDER BY u.url
+            """,
+            (to_run, from_run, min_drop),
+        )
+        regressed = []
+        for (url, ok_before, ok_now, title_before, title_now, desc_before, desc_now,
+             h1_before, h1_now, words_before, words_now, issues_before, issues_now) in rows:
+            if not ok_now:
+                regressed.append((url, ['now failing to fetch']))
+                continue
+            changes = []
+            if title_before and not title_now:
+                changes.append('lost meta title')
+            if desc_before and not desc_now:
+                changes.append('lost meta description')
+            if h1_before and not h1_now:
+                changes.append('lost H1')
+            if words_before - words_now >= min_drop:
+                changes.append(f'word count {words_before} → {words_now}')
+            if issues_now > issues_before:
+                changes.append(f'issues {issues_before} → {issues_now}')
+            regressed.append((url, changes))
+        return regressed
+
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M')
+
+
+def option(name, default=None):
+    """Value following --name on the command line"""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+
+def print_runs(history):
+    runs = history.runs()
+    print(f"{'Run':>5}  {'Started':<16} {'Pages':>6} {'Errors':>6} {'Issues':>6} {'NoTitle':>7} "
+          f"{'NoDesc':>6} {'NoH1':>5} {'<1000w':>6} {'AvgWords':>8}")
+    print("-" * 80)
+    for run in runs:
+        print(f"{run['run_id']:>5}  {format_time(run['started_at']):<16} {run['pages']:>6} {run['errors']:>6} "
+              f"{run['with_issues']:>6} {run['no_title']:>7} {run['no_description']:>6} {run['no_h1']:>5} "
+              f"{run['low_word_count']:>6} {run['avg_word_count']:>8.0f}")
+    if not runs:
+        print("No finished audit runs yet - run seo_audit.py first")
+
+
+def print_page(history, url):
+    rows = history.page_history(url)
+    if not rows:
+        print(f"❌ {url} is not in the audit history")
+        return
+    print(f"📄 {url}")
+    print()
+    print(f"{'Run':>5}  {'Started':<16} {'Title':>5} {'Desc':>5} {'H1':>3} {'Words':>6}  Change")
+    print("-" * 80)
+    previous = None
+    for run_id, started_at, success, title_length, desc_length, has_h1, word_count, issues in rows:
+        if not success:
+            print(f"{run_id:>5}  {format_time(started_at):<16} {issues}")
+            continue
+        change = ''
+        if previous is not None and word_count != previous:
+            change = f"{'📉' if word_count < previous else '📈'} {word_count - previous:+d} words"
+        print(f"{run_id:>5}  {format_time(started_at):<16} {title_length:>5} {desc_length:>5} "
+              f"{'✅' if has_h1 else '❌':>3} {word_count:>6}  {change}")
+        previous = word_count
+
+
+def print_lost(history, field):
+    if field not in FIELDS:
+        print(f"❌ Unknown field '{field}' - use one of: {', '.join(FIELDS)}")
+        return
+    since_date = option('--since')
+    if since_date:
+        since = datetime.strptime(since_date, '%Y-%m-%d').timestamp()
+    else:
+        since = time.time() - int(option('--days', '30')) * 86400
+    urls = history.lost(field, since)
+    print(f"📉 {len(urls)} pages lost their {field} since {format_time(since)}")
+    for url in urls:
+        print(f"   {url}")
+
+
+def print_regressions(history, run_ids):
+    if len(run_ids) < 2:
+        run_ids = list(reversed(history.latest_runs(2)))
+    if len(run_ids) < 2:
+        print("❌ Need at least two finished runs to compare")
+        return
+    from_run, to_run = int(run_ids[0]), int(run_ids[1])
+    regressed = history.regressions(from_run, to_run, int(option('--min-drop', MIN_WORD_DROP)))
+    print(f"📉 {len(regressed)} pages regressed between run {from_run} and run {to_run}")
+    for url, changes in regressed:
+        print(f"   {url} - {', '.join(changes)}")
+
+
+def main():
+    print("=" * 80)
+    print("📈 SEO AUDIT HISTORY")
+    print("=" * 80)
+    print()
+
+    if not os.path.exists(SEO_AUDIT_HISTORY):
+        print(f"❌ {SEO_AUDIT_HISTORY} not found - run seo_audit.py first")
+        return
+
+    history = AuditHistory()
+    args = [arg for previous, arg in zip(sys.argv, sys.argv[1:])
+            if not arg.startswith('--') and previous not in VALUE_OPTIONS]
+    command = args[0] if args else 'runs'
+    started = time.perf_counter()
+
+    if command == 'page' and len(args) > 1:
+        print_page(history, args[1])
+    elif command == 'lost' and len(args) > 1:
+        print_lost(history, args[1])
+    elif command == 'regressions':
+        print_regressions(history, args[1:3])
+    else:
+        print_runs(history)
+
+    print()
+    print(f"⏱️  Query took {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrupted")
@@ -0,0 +1,280 @@
+"""
+SEO Audit Report Writer
+=======================
+Streams audit results to seo-audit-report.csv (and optionally a JSONL
+sidecar with the full result dicts) as pages finish, instead of holding
+every result until the end of the run.
+
+While the audit runs, output goes to "<file>.partial" and is flushed every
+FLUSH_EVERY rows or FLUSH_SECONDS. The partial files replace the previous
+report only when the run completes. If a run dies, the next one reads the
+partial report back, skips the URLs already in it and keeps appending.
+The time the run started is kept next to the report in "<file>.started"
+(a resumed run keeps the original start), for incremental audits.
+
+Rows are written in the order pages finish, not sitemap order. The
+content metrics from text_metrics.py follow the word count. The last
+columns hold the page's fetch timings in milliseconds (request_timing.py);
+they are empty for pages that were not fetched.
+
+Usage:
+    writer = ReportWriter(jsonl_path=JSONL_FILE)
+    done = writer.open(on_resumed=summary.add)
+    for result in ...:
+        writer.write(result)
+    writer.close(complete=True)
+"""
+
+import csv
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from text_metrics import format_terms
+
+REPORT_FILE = 'seo-audit-report.csv'
+FIXING_FILE = 'pages-need-fixing.txt'
+JSONL_FILE = 'seo-audit-report.jsonl'
+PARTIAL_SUFFIX = '.partial'
+STARTED_SUFFIX = '.started'
+
+FLUSH_EVERY = 100
+FLUSH_SECONDS = 5.0
+
+HEADER = ['URL', 'Meta Title', 'Title Length', 'Meta Description', 'Desc Length', 'H1', 'Word Count',
+          'Sentences', 'Words/Sentence', 'Syllables/Word', 'Reading Ease', 'Top Terms', 'Issues',
+          'DNS ms', 'Connect ms', 'TLS ms', 'TTFB ms', 'Download ms', 'Bytes']
+# Report columns of the text_metrics values, with their type
+METRIC_COLUMNS = (('sentence_count', 'Sentences', int), ('avg_sentence_length', 'Words/Sentence', float),
+                  ('syllables_per_word', 'Syllables/Word', float), ('reading_ease', 'Reading Ease', float))
+# Report columns of the timing dict's keys
+TIMING_COLUMNS = (('dns', 'DNS ms'), ('connect', 'Connect ms'), ('tls', 'TLS ms'), ('ttfb', 'TTFB ms'),
+                  ('download', 'Download ms'), ('bytes', 'Bytes'))
+
+# Issues written for pages that could not be checked
+ERROR_PREFIXES = ('❌ Failed to fetch', '❌ Error')
+
+
+def result_row(result):
+    """CSV row for an audit result"""
+    timing = result.get('timing') or {}
+    return [
+        result['url'],
+        result['meta_title'] or 'MISSING',
+        result['title_length'],
+        result['meta_description'] or 'MISSING',
+        result['desc_length'],
+        result['h1'] or 'MISSING',
+        result['word_count'],
+        *('' if result.get(key) is None else result[key] for key, column, kind in METRIC_COLUMNS),
+        format_terms(result.get('top_terms') or (), result['word_count']),
+        ' | '.join(result['issues']) if result['issues'] else 'OK',
+        *('' if timing.get(key) is None else timing[key] for key, column in TIMING_COLUMNS),
+    ]
+
+
+def report_value(value):
+    """Report cell -> result value ('MISSING' was written for None)"""
+    return None if value == 'MISSING' else value
+
+
+def row_timing(row):
+    """Timing dict from a report row, or None (no timings, or a report from before they were recorded)"""
+    if not row.get('TTFB ms'):
+        return None
+    timing = {key: float(row[column]) if row.get(column) else None for key, column in TIMING_COLUMNS}
+    timing['bytes'] = int(timing['bytes'] or 0)
+    return timing
+
+
+def row_terms(value, word_count):
+    """top_terms back from format_terms() output (counts rebuilt from the densities)"""
+    terms = []
+    for part in (value or '').split('; '):
+        term, _, density = part.rpartition(' ')
+        if term and density.endswith('%'):
+            terms.append((term, round(float(density[:-1]) / 100 * word_count)))
+    return terms
+
+
+def row_to_result(row):
+    """Audit result dict from a report row (csv.DictReader)"""
+    issues = [] if row['Issues'] == 'OK' else row['Issues'].split(' | ')
+    failed = any(issue.startswith(ERROR_PREFIXES) for issue in issues)
+    word_count = int(row['Word Count'] or 0)
+    result = {
+        'url': row['URL'],
+        'meta_title': report_value(row['Meta Title']),
+        'title_length': int(row['Title Length'] or 0),
+        'meta_description': report_value(row['Meta Description']),
+        'desc_length': int(row['Desc Length'] or 0),
+        'h1': report_value(row['H1']),
+        'word_count': word_count,
+        'issues': issues,
+        'status': 'error' if failed else 'success',
+        'timing': row_timing(row),
+    }
+    # Reports from before the content metrics have no such columns
+    for key, column, kind in METRIC_COLUMNS:
+        result[key] = kind(row[column]) if row.get(column) else None
+    result['top_terms'] = row_terms(row.get('Top Terms'), word_count)
+    return result
+
+
+def read_report(path):
+    """Yield result dicts from a report, skipping rows cut short by a crash"""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if None in row.values() or None in row:
+                continue
+            try:
+                yield row_to_result(row)
+            except ValueError:
+                continue
+
+
+def write_fixing_entry(f, result):
+    f.write(f"{result['url']}\n")
+    for issue in result['issues']:
+        f.write(f"  {issue}\n")
+    f.write("\n")
+
+
+class AuditSummary:
+    """Running counters for the summary printed at the end of an audit"""
+
+    def __init__(self):
+        self.total = 0
+        self.perfect = 0
+        self.with_issues = 0
+        self.no_title = []
+        self.no_description = []
+        self.no_h1 = []
+        self.low_word_count = []
+
+    def add(self, result):
+        self.total += 1
+        success = result['status'] == 'success'
+        if success and not result['issues']:
+            self.perfect += 1
+            return
+        self.with_issues += 1
+        if not result['meta_title']:
+            self.no_title.append(result['url'])
+        if not result['meta_description']:
+            self.no_description.append(result['url'])
+        if success and not result['h1']:
+            self.no_h1.append(result['url'])
+        if success and result['word_count'] < 1000:
+            self.low_word_count.append((result['url'], result['word_count']))
+
+
+class ReportWriter:
+    """CSV report, pages-need-fixing list and optional JSONL, written as results arrive"""
+
+    def __init__(self, report_path=REPORT_FILE, fixing_path=FIXING_FILE, jsonl_path=None, resume=True):
+        self.paths = [path for path in (report_path, fixing_path, jsonl_path) if path]
+        self.report_path = report_path
+        self.started_path = report_path + STARTED_SUFFIX
+        self.fixing_path = fixing_path
+        self.jsonl_path = jsonl_path
+        self.resume = resume
+        self.pending = 0
+        self.flushed_at = time.monotonic()
+        self.files = []
+
+    def has_partial(self):
+        """Whether open() will resume an interrupted run's partial report"""
+        return self.resume and os.path.exists(self.report_path + PARTIAL_SUFFIX)
+
+    def open(self, on_resumed=None):
+        """
+        Start writing; returns the set of URLs already in a partial report.
+
+        on_resumed(result) is called for each result read back.
+        """
+        report_partial = self.report_path + PARTIAL_SUFFIX
+        done = set()
+        if self.has_partial():
+            # Rewrite the partial files from the rows that survived intact
+            recovered = report_partial + '.tmp'
+            with open(recovered, 'w', newline='', encoding='utf-8') as report, \
+                    open(self.fixing_path + PARTIAL_SUFFIX, 'w', encoding='utf-8') as fixing:
+                writer = csv.writer(report)
+                writer.writerow(HEADER)
+                for result in read_report(report_partial):
+                    if result['url'] in done:
+                        continue
+                    done.add(result['url'])
+                    writer.writerow(result_row(result))
+                    if result['issues']:
+                        write_fixing_entry(fixing, result)
+                    if on_resumed:
+                        on_resumed(result)
+            os.replace(recovered, report_partial)
+            if self.jsonl_path:
+                self._recover_jsonl(done)
+
+        if not self.has_partial():
+            with open(self.started_path + PARTIAL_SUFFIX, 'w', encoding='utf-8') as f:
+                f.write(datetime.now(timezone.utc).isoformat() + '\n')
+
+        mode = 'a' if done else 'w'
+        self.report = open(report_partial, mode, newline='', encoding='utf-8')
+        self.csv = csv.writer(self.report)
+        if not done:
+            self.csv.writerow(HEADER)
+        self.fixing = open(self.fixing_path + PARTIAL_SUFFIX, mode, encoding='utf-8')
+        self.files = [self.report, self.fixing]
+        self.jsonl = None
+        if self.jsonl_path:
+            self.jsonl = open(self.jsonl_path + PARTIAL_SUFFIX, mode, encoding='utf-8')
+            self.files.append(self.jsonl)
+        return done
+
+    def _recover_jsonl(self, done):
+        partial = self.jsonl_path + PARTIAL_SUFFIX
+        if not os.path.exists(partial):
+            return
+        recovered = partial + '.tmp'
+        with open(partial, 'r', encoding='utf-8') as source, open(recovered, 'w', encoding='utf-8') as target:
+            for line in source:
+                try:
+                    url = json.loads(line)['url']
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if url in done:
+                    target.write(line if line.endswith('\n') else line + '\n')
+        os.replace(recovered, partial)
+
+    def write(self, result):
+        self.csv.writerow(result_row(result))
+        if result['issues']:
+            write_fixing_entry(self.fixing, result)
+        if self.jsonl:
+            self.jsonl.write(json.dumps(result, ensure_ascii=False) + '\n')
+        self.pending += 1
+        if self.pending >= FLUSH_EVERY or time.monotonic() - self.flushed_at >= FLUSH_SECONDS:
+            self.flush()
+
+    def flush(self):
+        for f in self.files:
+            f.flush()
+        self.pending = 0
+        self.flushed_at = time.monotonic()
+
+    def close(self, complete=False):
+        """Close the files; a complete run replaces the previous report"""
+        for f in self.files:
+            f.close()
+        if complete:
+            for path in self.paths:
+                if os.path.exists(path + PARTIAL_SUFFIX):
+                    os.replace(path + PARTIAL_SUFFIX, path)
+            # A partial report from before start times were kept has none;
+            # don't leave the previous run's start next to the new report
+            if os.path.exists(self.started_path + PARTIAL_SUFFIX):
+                os.replace(self.started_path + PARTIAL_SUFFIX, self.started_path)
+            elif os.path.exists(self.started_path):
+                os.remove(self.started_path)
@@ -0,0 +1,175 @@
+"""
+Crawler Throughput Benchmark
+============================
+Runs the SEO audit crawl (crawl_engine.crawl_pages: fetch, parse, audit)
+against the local fixture site at several concurrency levels and reports
+pages/sec, CPU time and peak memory for each.
+
+The fixture site (fixture_site.py) is served from this process. Each level
+runs in its own Python process, which discovers the URLs from the fixture's
+robots.txt and sitemaps and crawls them; its CPU time (parse workers
+included) and peak RSS come from the operating system when it exits.
+
+The adaptive per-host delay is turned off (CRAWL_DELAY=0), so the numbers
+show what the engine can do rather than how polite it is; --polite keeps
+the production delay. --cached runs every level twice with a page cache,
+cold and then warm, to show what 304s save.
+
+Fixture options (--pages, --latency, --jitter, --error-rate,
+--redirect-rate, --no-gzip, --no-etags, --seed) are passed through, see
+fixture_site.py.
+
+Usage:
+    python benchmark_crawler.py                         # levels 1, 4, 16, 64
+    python benchmark_crawler.py --levels 8,32,128 --pages 2000 --latency 50
+    python benchmark_crawler.py --cached --error-rate 0.02
+"""
+
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from fixture_site import option, site_from_args
+
+LEVELS = (1, 4, 16, 64)
+RESULTS_FILE = 'crawler-benchmark.csv'
+
+
+def run_level(site_url, cache_path=None):
+    """Child process: crawl the fixture site once and print its numbers as JSON"""
+    from crawl_engine import crawl_pages
+    from page_cache import PageCache
+    from sitemap_discovery import discover
+
+    urls = [url for url, lastmod in discover(site_url)]
+    cache = PageCache(cache_path) if cache_path else None
+    stats = {}
+    errors = 0
+
+    def count(index, total, result):
+        nonlocal errors
+        if result.get('status') == 'error':
+            errors += 1
+
+    started = time.perf_counter()
+    crawl_pages(urls, on_result=count, cache=cache, stats=stats, collect=False)
+    elapsed = time.perf_counter() - started
+    if cache:
+        cache.flush()
+    print(json.dumps({
+        'pages': len(urls),
+        'elapsed': elapsed,
+        'errors': errors,
+        'fetched': stats.get('fetched', 0),
+        'not_modified': stats.get('not_modified', 0),
+        'bytes': stats.get('bytes', 0),
+    }))
+
+
+def measure(command, env):
+    """(child's JSON output or None, CPU seconds, peak RSS in KB) of a child process"""
+    with tempfile.TemporaryFile(mode='w+') as errors:
+        process = subprocess.Popen(command, env=env, stdout=subprocess.PIPE, stderr=errors, text=True)
+        output = process.stdout.read()
+        process.stdout.close()
+        cpu = peak = None
+        if hasattr(os, 'wait4'):
+            # Usage of the child and its waited-for children (the parse pool)
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            cpu = usage.ru_utime + usage.ru_stime
+            # Linux reports KB, macOS bytes
+            peak = usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss
+        else:
+            process.wait()
+        if process.returncode != 0:
+            errors.seek(0)
+            print(f"⚠️  Run failed: {errors.read().strip().splitlines()[-1:]}")
+            return None, cpu, peak
+    return json.loads(output), cpu, peak
+
+
+def main():
+    print("=" * 80)
+    print("⏱️  CRAWLER THROUGHPUT BENCHMARK")
+    print("=" * 80)
+    print()
+
+    levels = [int(level) for level in option('--levels', ','.join(map(str, LEVELS)), str).split(',')]
+    cached = '--cached' in sys.argv
+    site = site_from_args()
+    server = site.serve()
+    workdir = tempfile.mkdtemp(prefix='crawler-bench-')
+
+    print(f"🧪 Fixture site: {len(site.pages)} pages, {len(site.redirects)} redirects at {server.base_url}")
+    print(f"   latency {site.latency * 1000:.0f}ms ±{site.jitter * 1000:.0f}ms, error rate {site.error_rate:.0%}, "
+          f"gzip {'on' if site.gzip else 'off'}, ETags {'on' if site.etags else 'off'}")
+    print(f"   crawl delay {'as in production' if '--polite' in sys.argv else 'off'}, "
+          f"{os.cpu_count() or 1} CPUs")
+    print()
+    print(f"{'Concurrency':>11} {'Run':>5} {'Pages':>7} {'Pages/s':>9} {'Wall s':>8} {'CPU s':>7} "
+          f"{'CPU ms/page':>12} {'Peak RSS':>10} {'304s':>6} {'Errors':>7}")
+    print("-" * 88)
+
+    rows = []
+    try:
+        for level in levels:
+            env = dict(os.environ)
+            env['CRAWL_CONCURRENCY'] = str(level)
+            env['CRAWL_PER_HOST'] = str(level)
+            if '--polite' not in sys.argv:
+                env['CRAWL_DELAY'] = '0'
+                env['CRAWL_DELAY_MIN'] = '0'
+            cache_path = os.path.join(workdir, f"cache-{level}.db") if cached else None
+            runs = ('cold', 'warm') if cached else ('-',)
+            for run in runs:
+                command = [sys.executable, os.path.abspath(__file__), '--run', server.base_url]
+                if cache_path:
+                    command.append(cache_path)
+                result, cpu, peak = measure(command, env)
+                if result is None:
+                    continue
+                pages, elapsed = result['pages'], result['elapsed']
+                rate = pages / elapsed if elapsed > 0 else 0.0
+                cpu_cell = f"{cpu:.2f}" if cpu is not None else 'n/a'
+                per_page = f"{cpu / pages * 1000:.1f}" if cpu is not None and pages else 'n/a'
+                memory = f"{peak / 1024:.0f} MB" if peak is not None else 'n/a'
+                print(f"{level:>11} {run:>5} {pages:>7} {rate:>9.1f} {elapsed:>8.2f} {cpu_cell:>7} "
+                      f"{per_page:>12} {memory:>10} {result['not_modified']:>6} {result['errors']:>7}")
+                rows.append([datetime.now().isoformat(timespec='seconds'), level, run, pages,
+                             round(rate, 1), round(elapsed, 2), round(cpu, 2) if cpu is not None else '',
+                             peak or '', result['not_modified'], result['errors'], result['bytes'],
+                             len(site.pages), round(site.latency * 1000), site.error_rate])
+    finally:
+        server.shutdown()
+
+    if not rows:
+        print("❌ No run finished")
+        return
+    new_file = not os.path.exists(RESULTS_FILE)
+    with open(RESULTS_FILE, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(['Time', 'Concurrency', 'Run', 'Pages', 'Pages/s', 'Wall s', 'CPU s', 'Peak RSS KB',
+                             '304s', 'Errors', 'Bytes', 'Site Pages', 'Latency ms', 'Error Rate'])
+        writer.writerows(rows)
+
+    print()
+    print("CPU time includes the parse workers; peak RSS is the largest single process.")
+    print(f"💾 Results appended to: {RESULTS_FILE}")
+
+
+if __name__ == '__main__':
+    try:
+        if '--run' in sys.argv:
+            index = sys.argv.index('--run')
+            run_level(*sys.argv[index + 1:index + 3])
+        else:
+            main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrupted")
@@ -0,0 +1,152 @@
+"""
+HTML Extractor Benchmark
+========================
+Compares the html_extract.py backends on a corpus of saved pages:
+pages per second, peak memory and whether each backend agrees with the
+original BeautifulSoup extraction (title, description, H1, word count).
+
+Each backend runs in its own Python process, so the peak RSS of one does
+not hide behind another's. The corpus is parsed PASSES times after being
+loaded, and memory is reported as peak RSS growth over the loaded corpus.
+
+Usage:
+    python benchmark_extractors.py --save      # download sitemap pages into page-corpus/
+    python benchmark_extractors.py             # benchmark every installed backend
+    python benchmark_extractors.py my-pages/   # benchmark another folder of .html files
+"""
+
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from urllib.request import Request, urlopen
+
+from html_extract import BACKENDS, available_backends
+from text_metrics import WordCount, analyze
+
+CORPUS_DIR = 'page-corpus'
+PASSES = 3
+REFERENCE_BACKEND = 'bs4'
+
+
+def save_corpus(corpus_dir=CORPUS_DIR, filename='sitemap-urls.txt'):
+    """Download every sitemap URL into corpus_dir as .html files"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        urls = [line.strip() for line in f if line.strip()]
+    os.makedirs(corpus_dir, exist_ok=True)
+    saved = 0
+    for url in urls:
+        name = hashlib.sha256(url.encode('utf-8')).hexdigest()[:16] + '.html'
+        try:
+            with urlopen(Request(url, headers={'User-Agent': 'ProURLMonitor-SEOAudit/1.0'}), timeout=10) as response:
+                body = response.read()
+        except Exception as e:
+            print(f"❌ {url} - {e}")
+            continue
+        with open(os.path.join(corpus_dir, name), 'wb') as f:
+            f.write(body)
+        saved += 1
+    print(f"💾 Saved {saved}/{len(urls)} pages to {corpus_dir}/")
+
+
+def load_corpus(corpus_dir):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, '*.html'))):
+        with open(path, 'rb') as f:
+            pages.append(f.read().decode('utf-8', errors='replace'))
+    return pages
+
+
+def peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_backend(name, corpus_dir):
+    """Child process: time one backend and print its numbers as JSON"""
+    extract = BACKENDS[name]
+    pages = load_corpus(corpus_dir)
+    baseline = peak_rss_kb()
+
+    fields = [None] * len(pages)
+    started = time.perf_counter()
+    for _ in range(PASSES):
+        for index, html in enumerate(pages):
+            try:
+                page = extract(html)
+                word_count = analyze(page['text'], [WordCount()])['word_count']
+                fields[index] = [page['meta_title'], page['meta_description'], page['h1'], word_count]
+            except Exception as e:
+                fields[index] = ['error', str(e)]
+    elapsed = time.perf_counter() - started
+
+    peak = peak_rss_kb()
+    print(json.dumps({
+        'rate': len(pages) * PASSES / elapsed if elapsed > 0 else 0.0,
+        'memory_kb': peak - baseline if peak is not None else None,
+        'fields': fields,
+    }))
+
+
+def main():
+    print("=" * 80)
+    print("⏱️  HTML EXTRACTOR BENCHMARK")
+    print("=" * 80)
+    print()
+
+    corpus_dir = next((arg for arg in sys.argv[1:] if not arg.startswith('--')), CORPUS_DIR)
+    page_count = len(glob.glob(os.path.join(corpus_dir, '*.html')))
+    if not page_count:
+        print(f"❌ No .html files in {corpus_dir}/ - run with --save first")
+        return
+
+    print(f"📂 {page_count} pages from {corpus_dir}/, {PASSES} passes per backend")
+    print()
+
+    results = {}
+    for name in available_backends():
+        output = subprocess.run(
+            [sys.executable, __file__, '--run', name, corpus_dir],
+            capture_output=True, text=True,
+        )
+        if output.returncode != 0:
+            print(f"⚠️  {name} failed: {output.stderr.strip().splitlines()[-1:]}")
+            continue
+        results[name] = json.loads(output.stdout)
+
+    reference = results.get(REFERENCE_BACKEND)
+    print(f"{'Backend':<14} {'pages/sec':>12} {'peak memory':>14} {'agrees with bs4':>18}")
+    print("-" * 80)
+    for name, result in sorted(results.items(), key=lambda item: -item[1]['rate']):
+        memory = f"{result['memory_kb'] / 1024:.1f} MB" if result['memory_kb'] is not None else 'n/a'
+        if reference:
+            same = sum(1 for a, b in zip(result['fields'], reference['fields']) if a == b)
+            agreement = f"{same}/{len(reference['fields'])}"
+        else:
+            agreement = 'n/a'
+        print(f"{name:<14} {result['rate']:>12.1f} {memory:>14} {agreement:>18}")
+
+    print()
+    print("Peak memory is RSS growth while parsing, on top of the loaded corpus.")
+    print("Set HTML_EXTRACTOR=<backend> to make seo_audit.py use a specific one.")
+
+
+if __name__ == '__main__':
+    try:
+        if '--run' in sys.argv:
+            index = sys.argv.index('--run')
+            run_backend(sys.argv[index + 1], sys.argv[index + 2])
+        elif '--save' in sys.argv:
+            save_corpus()
+        else:
+            main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Benchmark interrupted")
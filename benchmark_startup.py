@@ -0,0 +1,163 @@
+"""
+Indexing API Startup Benchmark
+==============================
+Measures time-to-first-request for the indexing scripts.
+
+A local stand-in for indexing.googleapis.com is started and each script
+is launched with INDEXING_API_ENDPOINT pointing at it. The clock runs from
+process start until the stand-in receives the first API call, then the
+script is stopped. Three setups are compared:
+
+  legacy  - the old per-script startup: build('indexing', 'v3') plus
+            Credentials.from_service_account_file, fresh token every run
+  cold    - indexing_client with an empty cache (first run on a machine)
+  warm    - indexing_client with cached discovery document and token
+
+If service-account.json exists, real tokens are minted against Google's
+OAuth endpoint, so the token cache shows up in the numbers. Without it the
+scripts run with anonymous credentials against the stand-in only.
+test_api_connection.py needs service-account.json and is reported as n/a
+without it.
+
+Usage:
+    python benchmark_startup.py
+"""
+
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SCRIPTS = ['indexing_api.py', 'check_google_status.py', 'test_api_connection.py']
+REPEATS = 3
+FIRST_REQUEST_TIMEOUT = 60
+
+# The startup path every script used before indexing_client.py
+LEGACY_SNIPPET = '''
+import os
+from google.oauth2 import service_account
+from googleapiclient.discovery import build
+endpoint = os.environ['INDEXING_API_ENDPOINT']
+if os.path.exists('service-account.json'):
+    credentials = service_account.Credentials.from_service_account_file(
+        'service-account.json', scopes=['https://www.googleapis.com/auth/indexing'])
+else:
+    from google.auth.credentials import AnonymousCredentials
+    credentials = AnonymousCredentials()
+service = build('indexing', 'v3', credentials=credentials, client_options={'api_endpoint': endpoint})
+service.urlNotifications().getMetadata(url='https://www.prourlmonitor.com/').execute()
+'''
+
+first_request = threading.Event()
+first_request_time = None
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers every Indexing API call with a canned notification"""
+
+    def _respond(self):
+        global first_request_time
+        if not first_request.is_set():
+            first_request_time = time.perf_counter()
+            first_request.set()
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        body = json.dumps({
+            'urlNotificationMetadata': {
+                'url': 'https://www.prourlmonitor.com/',
+                'latestUpdate': {'type': 'URL_UPDATED', 'notifyTime': '2026-01-01T00:00:00Z'},
+            }
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+def time_to_first_request(command, env):
+    """Seconds from process start to the first API call, or None"""
+    first_request.clear()
+    started = time.perf_counter()
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while not first_request.wait(0.01):
+            # Script exited (e.g. missing dependency) or hung before calling the API
+            if process.poll() is not None or time.perf_counter() - started > FIRST_REQUEST_TIMEOUT:
+                return None
+        return first_request_time - started
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main():
+    print("=" * 80)
+    print("⏱️  INDEXING API STARTUP BENCHMARK (time to first request)")
+    print("=" * 80)
+    print()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    workdir = tempfile.mkdtemp(prefix='indexing-bench-')
+    cache_dir = os.path.join(workdir, 'cache')
+    ledger_file = os.path.join(workdir, 'ledger.db')
+
+    env = dict(os.environ)
+    env['INDEXING_API_ENDPOINT'] = f"http://127.0.0.1:{server.server_address[1]}/"
+    env['INDEXING_CACHE_DIR'] = cache_dir
+    env['SUBMISSION_LEDGER'] = ledger_file
+
+    def run(command, setup):
+        timings = []
+        for _ in range(REPEATS):
+            # Fresh ledger so nothing is skipped as "recently submitted"
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(ledger_file + suffix):
+                    os.remove(ledger_file + suffix)
+            if setup == 'cold':
+                shutil.rmtree(cache_dir, ignore_errors=True)
+            elapsed = time_to_first_request(command, env)
+            if elapsed is None:
+                return None
+            timings.append(elapsed)
+        return statistics.median(timings)
+
+    print(f"{'Script':<28} {'legacy':>10} {'cold':>10} {'warm':>10} {'speedup':>10}")
+    print("-" * 80)
+
+    try:
+        legacy = run([sys.executable, '-c', LEGACY_SNIPPET], 'legacy')
+        for script in SCRIPTS:
+            command = [sys.executable, script]
+            cold = run(command, 'cold')
+            warm = run(command, 'warm')
+            cells = [f"{value * 1000:.0f}ms" if value else 'n/a' for value in (legacy, cold, warm)]
+            speedup = f"{legacy / warm:.1f}x" if legacy and warm else 'n/a'
+            print(f"{script:<28} {cells[0]:>10} {cells[1]:>10} {cells[2]:>10} {speedup:>10}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    print(f"Median of {REPEATS} runs. 'legacy' is the old build()/from_service_account_file startup.")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Benchmark interrupted")
@@ -0,0 +1,112 @@
+"""
+Page Change Detection
+=====================
+Fingerprints each live page so resubmits only include pages whose content
+actually changed.
+
+A fingerprint is a SHA-256 of the normalized title, meta description, H1
+and main-content text that seo_audit.extract_page pulls out of the HTML.
+Whitespace and case are normalized, so re-deploys that only reshuffle
+markup, scripts or build hashes do not count as changes.
+
+Fingerprints are stored per URL in the submission ledger database and are
+only updated after Google accepted the notification, so a failed submit
+is retried on the next run.
+
+Usage:
+    from change_detection import FingerprintStore, detect_changes
+
+    store = FingerprintStore()
+    changed, unchanged, errors = detect_changes(urls, store)
+"""
+
+import hashlib
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from seo_audit import extract_page
+from submission_ledger import LEDGER_FILE
+
+# Pages fetched in parallel while fingerprinting
+FETCH_WORKERS = 8
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    url TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def normalize(text):
+    """Collapse whitespace and lowercase"""
+    return ' '.join((text or '').split()).lower()
+
+
+def fingerprint_html(html):
+    """Stable content fingerprint of a rendered page"""
+    page = extract_page(html)
+    parts = [normalize(page[key]) for key in ('meta_title', 'meta_description', 'h1', 'text')]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def fetch_fingerprint(url):
+    """Fetch url and return (url, fingerprint, error)"""
+    try:
+        response = requests.get(url, timeout=10)
+        response.raise_for_status()
+        return url, fingerprint_html(response.text), None
+    except Exception as e:
+        return url, None, str(e)
+
+
+class FingerprintStore:
+    """Last submitted fingerprint per URL"""
+
+    def __init__(self, path=LEDGER_FILE):
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript(SCHEMA)
+
+    def get_all(self):
+        return dict(self.conn.execute('SELECT url, fingerprint FROM fingerprints'))
+
+    def save(self, fingerprints):
+        """Store {url: fingerprint} as the submitted state"""
+        now = time.time()
+        self.conn.executemany(
+            'INSERT INTO fingerprints (url, fingerprint, updated_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(url) DO UPDATE SET fingerprint = excluded.fingerprint, '
+            'updated_at = excluded.updated_at',
+            [(url, fp, now) for url, fp in fingerprints.items()],
+        )
+        self.conn.commit()
+
+
+def detect_changes(urls, store, workers=FETCH_WORKERS):
+    """
+    Fingerprint every URL and compare with the stored state.
+
+    Returns (changed, unchanged, errors):
+      changed   - {url: new_fingerprint} for new or modified pages
+      unchanged - list of URLs whose fingerprint did not move
+      errors    - list of (url, error) for pages that could not be fetched
+    """
+    known = store.get_all()
+    changed = {}
+    unchanged = []
+    errors = []
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for url, fp, error in executor.map(fetch_fingerprint, urls):
+            if error:
+                errors.append((url, error))
+            elif known.get(url) == fp:
+                unchanged.append(url)
+            else:
+                changed[url] = fp
+
+    return changed, unchanged, errors
@@ -1,47 +1,65 @@
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-import json
-
-credentials = service_account.Credentials.from_service_account_file(
-    'service-account.json',
-    scopes=['https://www.googleapis.com/auth/indexing']
-)
-
-service = build('indexing', 'v3', credentials=credentials)
-
-# Check a few random URLs to see their status
-test_urls = [
-    'https://www.prourlmonitor.com/',
-    'https://www.prourlmonitor.com/tools/seo-audit',
-    'https://www.prourlmonitor.com/tools/ai-content-detector',
-    'https://www.prourlmonitor.com/tools/binary-converter',
-    'https://www.prourlmonitor.com/tools/meta-generator'
-]
-
-print('Checking submission status for sample URLs...')
-print('='*80)
-
-for url in test_urls:
-    try:
-        request = service.urlNotifications().getMetadata(url=url)
-        response = request.execute()
-        print(f'\nURL: {url}')
-        print(f'Status: SUBMITTED')
-        latest = response.get('latestUpdate', {})
-        notify_type = latest.get('type', 'N/A')
-        notify_time = latest.get('notifyTime', 'N/A')
-        print(f'Type: {notify_type}')
-        print(f'Notify Time: {notify_time}')
-    except Exception as e:
-        print(f'\nURL: {url}')
-        print(f'Status: NOT SUBMITTED')
-        error_msg = str(e)
-        print(f'Error: {error_msg}')
+"""
+Check Google Indexing API Status for All URLs
+=============================================
+Sweeps every sitemap URL (sitemap_discovery.py) with getMetadata (concurrently, with a
+cached result per URL) and shows which URLs Google never received.
+
+Usage:
+    python check_google_status.py
+    python check_google_status.py --refresh    # ignore cached answers
+"""
+
+import csv
+import sys
+from indexing_client import load_urls
+from metadata_sweep import sweep_metadata, SUBMITTED, NEVER_RECEIVED, ERROR
+
+REPORT_FILE = 'indexing-status.csv'
+
+
+def main():
+    urls = load_urls()
+    if not urls:
+        return
+
+    print(f'Checking submission status for {len(urls)} URLs...')
+    print('='*80)
+
+    rows = sweep_metadata(urls, use_cache='--refresh' not in sys.argv)
+
+    # Never received first, then oldest update first
+    order = {NEVER_RECEIVED: 0, ERROR: 1, SUBMITTED: 2}
+    rows.sort(key=lambda r: (order[r['status']], r['latest_update'] or '', r['url']))
+
+    print(f"\n{'Status':<15} {'Latest update':<22} {'Latest remove':<22} URL")
     print('-'*80)
+    for row in rows:
+        print(f"{row['status']:<15} {(row['latest_update'] or '-')[:20]:<22} "
+              f"{(row['latest_remove'] or '-')[:20]:<22} {row['url']}")
+
+    with open(REPORT_FILE, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['URL', 'Status', 'Latest Update', 'Latest Remove', 'Error'])
+        for row in rows:
+            writer.writerow([row['url'], row['status'], row['latest_update'] or '',
+                             row['latest_remove'] or '', row['error'] or ''])
 
-print('\n\nKEY FINDINGS:')
-print('='*80)
-print('If URLs show "SUBMITTED" - Google received them via API')
-print('If URLs show "NOT SUBMITTED" - They were never sent to Google')
-print('\nNote: Search Console shows old data (Dec 23)')
-print('This means Google hasnt crawled site recently or data is stale')
+    counts = {status: sum(1 for r in rows if r['status'] == status) for status in order}
+    print('\n\nKEY FINDINGS:')
+    print('='*80)
+    print(f'SUBMITTED:      {counts[SUBMITTED]} - Google received them via API')
+    print(f'NEVER RECEIVED: {counts[NEVER_RECEIVED]} - They were never sent to Google')
+    if counts[ERROR]:
+        print(f'ERROR:          {counts[ERROR]} - Could not check (see {REPORT_FILE})')
+    print(f'\nFull table saved to: {REPORT_FILE}')
+    print('\nNote: Search Console shows old data (Dec 23)')
+    print('This means Google hasnt crawled site recently or data is stale')
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print('\n\nInterrupted')
+    except Exception as e:
+        print(f'\n\nError: {e}')
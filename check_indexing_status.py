@@ -8,6 +8,7 @@ import requests
 from bs4 import BeautifulSoup
 import time
 from urllib.parse import quote_plus
+import sitemap_discovery
 
 def check_google_index(url):
     """Check if a URL is indexed in Google using site: search"""
@@ -35,14 +36,8 @@ def check_google_index(url):
         return None
 
 def load_urls(filename='sitemap-urls.txt'):
-    """Load URLs from text file"""
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            urls = [line.strip() for line in f if line.strip()]
-        return urls
-    except FileNotFoundError:
-        print(f"❌ Error: {filename} not found!")
-        return []
+    """Load URLs from robots.txt / sitemap discovery, falling back to a text file"""
+    return sitemap_discovery.load_urls(filename)
 
 def check_indexing_status():
     """Check indexing status for all URLs"""
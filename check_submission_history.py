@@ -5,6 +5,7 @@ Check When URLs Were Last Submitted
 
 import os
 from datetime import datetime
+from submission_ledger import LEDGER_FILE, SubmissionLedger
 
 print("=" * 80)
 print("📅 CHECKING INDEXING SUBMISSION HISTORY")
@@ -35,6 +36,25 @@ for filename in files_to_check:
 
 print("=" * 80)
 print()
+
+# Submission ledger written by the indexing scripts
+if os.path.exists(LEDGER_FILE):
+    ledger = SubmissionLedger()
+    summary = ledger.summary()
+    print("📒 Submission ledger:")
+    print("-" * 80)
+    print(f"   Total publish calls: {summary['total']} ({summary['success']} ok, {summary['failed']} failed)")
+    print(f"   Unique URLs submitted: {summary['unique_urls']}")
+    if summary['last_submitted']:
+        last = datetime.fromtimestamp(summary['last_submitted'])
+        print(f"   Last submission: {last.strftime('%d %B %Y, %I:%M %p')}")
+    print(f"   Quota used today: {summary['quota_used_today']}")
+    for account, used in ledger.usage_by_account().items():
+        print(f"      {account or '(default)'}: {used}")
+    print()
+    print("=" * 80)
+    print()
+
 print("❓ MAIN QUESTION: Kab last time indexing_api.py run ki thi?")
 print()
 print("Agar 29 December (5 days ago) ko run ki thi aur API working hai,")
@@ -0,0 +1,401 @@
+"""
+SEO Audit Crawl Engine
+======================
+Fetches many pages concurrently for seo_audit.py.
+
+A single asyncio event loop drives every request over one pooled
+keep-alive session (aiohttp, or httpx when aiohttp is not installed):
+  - at most CRAWL_CONCURRENCY requests in flight overall
+  - at most CRAWL_PER_HOST connections to any one host
+  - an adaptive delay between request starts on each host: it shrinks
+    while the host answers quickly and backs off on slow answers,
+    timeouts, 429 and 503 (honouring Retry-After)
+
+Each page produces the same result dict as seo_audit.check_page.
+Parsing is CPU-bound, so it runs as a separate stage in a process pool
+(PARSE_WORKERS, one per core by default). Raw body bytes reach it through
+a bounded queue, so a slow parse stage holds back fetching instead of
+piling up pages in memory. With a PageCache, requests are conditional
+and a 304 reuses the cached record.
+
+Every fetched page's result carries a 'timing' dict (DNS, connect, TLS,
+TTFB, download, bytes; see request_timing.py).
+
+Without aiohttp or httpx the pages are checked one by one with
+check_page, as before.
+
+Usage:
+    from crawl_engine import crawl_pages
+
+    results = crawl_pages(urls, on_result=report)
+"""
+
+import asyncio
+import importlib.util
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from indexability import header_value
+from request_timing import AiohttpTrace, aiohttp_trace_config, fetch_timing, httpx_trace, new_timing
+from seo_audit import NOT_MODIFIED_WITHOUT_RECORD, audit_html, check_page, error_result
+from url_resolver import redirect_hops
+
+CRAWL_CONCURRENCY = int(os.environ.get('CRAWL_CONCURRENCY', '32'))
+CRAWL_PER_HOST = int(os.environ.get('CRAWL_PER_HOST', '8'))
+REQUEST_TIMEOUT = 10
+USER_AGENT = 'ProURLMonitor-SEOAudit/1.0 (+https://www.prourlmonitor.com)'
+
+# Delay between request starts on one host, adapted while crawling
+# (benchmark_crawler.py sets both to 0 against the local fixture site)
+CRAWL_DELAY = float(os.environ.get('CRAWL_DELAY', '0.5'))
+CRAWL_DELAY_MIN = float(os.environ.get('CRAWL_DELAY_MIN', '0.05'))
+CRAWL_DELAY_MAX = 30.0
+# Answers slower than this mean the host is struggling
+SLOW_RESPONSE_SECONDS = 2.0
+
+# Parse stage: one process per core, fed through a bounded queue of bodies
+PARSE_WORKERS = int(os.environ.get('PARSE_WORKERS', str(os.cpu_count() or 1)))
+PARSE_QUEUE_SIZE = int(os.environ.get('PARSE_QUEUE_SIZE', '64'))
+
+# Timeouts, connection errors, 429 and 503 are tried again
+MAX_RETRIES = 2
+THROTTLE_STATUSES = (429, 503)
+
+
+def async_http_available():
+    """True if aiohttp or httpx is installed"""
+    return any(importlib.util.find_spec(name) for name in ('aiohttp', 'httpx'))
+
+
+class HostThrottle:
+    """Connection limit and adaptive crawl delay for one host"""
+
+    def __init__(self, per_host, delay=CRAWL_DELAY):
+        self.slots = asyncio.Semaphore(per_host)
+        self.delay = delay
+        self.next_start = 0.0
+
+    async def wait(self):
+        """Sleep until this host may receive the next request"""
+        now = time.monotonic()
+        start = max(now, self.next_start)
+        self.next_start = start + self.delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def answered(self, seconds):
+        if seconds > SLOW_RESPONSE_SECONDS:
+            self.delay = min(CRAWL_DELAY_MAX, self.delay * 1.5)
+        else:
+            self.delay = max(CRAWL_DELAY_MIN, self.delay * 0.9)
+
+    def throttled(self, retry_after=None):
+        """Host refused or timed out: back off before the next request"""
+        self.delay = min(CRAWL_DELAY_MAX, max(self.delay * 2, CRAWL_DELAY))
+        self.next_start = max(self.next_start, time.monotonic() + max(self.delay, retry_after or 0))
+
+
+def get_retry_after(headers):
+    """Retry-After in seconds, if given as a number"""
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+def decode_body(body, charset):
+    try:
+        return body.decode(charset or 'utf-8', errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+
+class AiohttpSession:
+    """Keep-alive aiohttp session -> (status, reason, headers, body, charset, redirect hops, timing)"""
+
+    def __init__(self, concurrency, per_host):
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            headers={'User-Agent': USER_AGENT},
+            trace_configs=[aiohttp_trace_config()],
+        )
+        self.errors = (aiohttp.ClientError, asyncio.TimeoutError)
+        # Malformed URLs: failing again will not help
+        self.url_errors = (aiohttp.InvalidURL, ValueError)
+
+    async def get(self, url, headers=None):
+        trace = AiohttpTrace(new_timing())
+        timing = trace.timing
+        started = time.perf_counter()
+        async with self.session.get(url, headers=headers, trace_request_ctx=trace) as response:
+            first_byte = time.perf_counter()
+            body = await response.read()
+            # The wait for a free connection is ours, not the server's
+            fetch_timing(timing, started + trace.queued, first_byte, time.perf_counter(), len(body))
+            return (response.status, response.reason, response.headers, body, response.charset,
+                    redirect_hops(response.history, response.url), timing)
+
+    async def close(self):
+        await self.session.close()
+
+
+class HttpxSession:
+    """Keep-alive httpx client -> (status, reason, headers, body, charset, redirect hops, timing)"""
+
+    def __init__(self, concurrency, per_host):
+        import httpx
+
+        # httpx has no per-host limit; HostThrottle.slots enforces it.
+        # max_connections matches the in-flight limit, so a request never
+        # waits for a pooled connection and ttfb starts with the request.
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            timeout=REQUEST_TIMEOUT,
+            follow_redirects=True,
+            headers={'User-Agent': USER_AGENT},
+        )
+        self.errors = (httpx.HTTPError, asyncio.TimeoutError)
+        # Malformed URLs: failing again will not help
+        self.url_errors = (httpx.InvalidURL, ValueError)
+
+    async def get(self, url, headers=None):
+        timing = new_timing()
+        started = time.perf_counter()
+        async with self.client.stream('GET', url, headers=headers,
+                                      extensions={'trace': httpx_trace(timing)}) as response:
+            first_byte = time.perf_counter()
+            body = await response.aread()
+            fetch_timing(timing, started, first_byte, time.perf_counter(), len(body))
+        return (response.status_code, response.reason_phrase, response.headers, body,
+                response.charset_encoding, redirect_hops(response.history, response.url), timing)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def open_session(concurrency, per_host):
+    """aiohttp session if installed, else httpx"""
+    if importlib.util.find_spec('aiohttp'):
+        return AiohttpSession(concurrency, per_host)
+    return HttpxSession(concurrency, per_host)
+
+
+def parse_page(url, body, charset, links=False, x_robots_tag=None, redirects=()):
+    """Parse stage: raw body bytes -> audit result dict (runs in a worker process)"""
+    return audit_html(url, decode_body(body, charset), links, x_robots_tag, redirects)
+
+
+def open_parse_pool(workers):
+    """Process pool for the parse stage (0 workers: one thread in this process)"""
+    if workers > 0:
+        try:
+            return ProcessPoolExecutor(max_workers=workers)
+        except (OSError, NotImplementedError):
+            pass
+    return ThreadPoolExecutor(max_workers=max(1, workers))
+
+
+async def crawl(urls, concurrency=CRAWL_CONCURRENCY, per_host=CRAWL_PER_HOST, on_result=None,
+                cache=None, stats=None, parse_workers=PARSE_WORKERS, collect=True, links=False,
+                expand=None):
+    """
+    Audit every URL concurrently; returns result dicts in URL order
+    (None with collect=False, when on_result consumes them as they come).
+
+    Fetching and parsing are separate stages joined by a bounded queue:
+    fetch coroutines put raw body bytes on the queue and parse tasks hand
+    them to a pool of parse_workers processes. When parsing falls behind,
+    the full queue holds back the fetchers, so memory stays bounded.
+
+    on_result(index, total, result) is called as each page finishes.
+    If given, stats is filled with 'fetched', 'not_modified' and 'bytes'.
+    Pages that answered get their fetch's 'timing'.
+    With links, each result also lists the page's internal links.
+
+    expand(result) may return more URLs to audit in the same crawl (links
+    found on the page); they are fetched as soon as they are returned.
+    Once every page so far is done, expand(None) is asked for a last batch
+    and the crawl ends when it returns none. on_result's total is then
+    the number of URLs known so far.
+    """
+    stats = stats if stats is not None else {}
+    stats.update(fetched=0, not_modified=0, bytes=0)
+    session = open_session(concurrency, per_host)
+    pool = open_parse_pool(parse_workers)
+    in_flight = asyncio.Semaphore(concurrency)
+    parse_queue = asyncio.Queue(maxsize=PARSE_QUEUE_SIZE)
+    hosts = {}
+    loop = asyncio.get_running_loop()
+    crawler = asyncio.current_task()
+    failure = []
+    given, urls = list(urls), []
+    results = [] if collect else None
+    fetchers = []
+    idle = asyncio.Event()
+    done = 0
+
+    def schedule(new_urls):
+        for url in new_urls:
+            urls.append(url)
+            if collect:
+                results.append(None)
+            fetchers.append(asyncio.ensure_future(fetch(len(urls) - 1, url)))
+
+    def finish(index, result):
+        nonlocal done
+        if collect:
+            results[index] = result
+        done += 1
+        if on_result:
+            on_result(done, len(urls), result)
+        if expand:
+            schedule(expand(result))
+        if done == len(urls):
+            idle.set()
+
+    def fail(error):
+        # on_result, expand or the cache failed (e.g. disk full): stop the
+        # whole crawl rather than leave it waiting for pages nobody finishes
+        failure.append(error)
+        crawler.cancel()
+
+    async def fetch(index, url):
+        try:
+            result = await fetch_page(index, url)
+            # Pages handed to the parse stage are finished there
+            if result is not None:
+                finish(index, result)
+        except Exception as e:
+            fail(e)
+
+    async def fetch_page(index, url):
+        """Result dict for a page that is done, None once its body is queued for parsing"""
+        try:
+            host = urlparse(url).netloc
+        except ValueError as e:
+            return error_result(url, f"❌ Failed to fetch: {e}")
+        if host not in hosts:
+            hosts[host] = HostThrottle(per_host)
+        throttle = hosts[host]
+        conditional = cache is not None
+        for attempt in range(MAX_RETRIES + 1):
+            async with throttle.slots:
+                await throttle.wait()
+                async with in_flight:
+                    started = time.monotonic()
+                    try:
+                        status, reason, headers, body, charset, redirects, timing = await session.get(
+                            url, cache.conditional_headers(url) if conditional else None
+                        )
+                    except session.url_errors as e:
+                        # A malformed URL fails its page, not the crawl
+                        return error_result(url, f"❌ Failed to fetch: {str(e) or type(e).__name__}")
+                    except session.errors as e:
+                        throttle.throttled()
+                        if attempt < MAX_RETRIES:
+                            continue
+                        return error_result(url, f"❌ Failed to fetch: {str(e) or type(e).__name__}")
+            if status in THROTTLE_STATUSES and attempt < MAX_RETRIES:
+                throttle.throttled(get_retry_after(headers))
+                continue
+            throttle.answered(time.monotonic() - started)
+            stats['bytes'] += len(body)
+            if status == 304:
+                cached = cache.get(url) if cache else None
+                if cached:
+                    stats['not_modified'] += 1
+                    cached['timing'] = timing
+                    return cached
+                if conditional and attempt < MAX_RETRIES:
+                    # No usable record behind the validators: fetch the whole page
+                    conditional = False
+                    continue
+                return error_result(url, NOT_MODIFIED_WITHOUT_RECORD)
+            if status >= 400:
+                return error_result(url, f"❌ Failed to fetch: {status} Error: {reason} for url: {url}")
+            stats['fetched'] += 1
+            # Waits here while the parse stage is behind
+            await parse_queue.put((index, url, body, charset, headers, redirects, timing))
+            return None
+
+    async def parse():
+        while True:
+            item = await parse_queue.get()
+            if item is None:
+                return
+            index, url, body, charset, headers, redirects, timing = item
+            try:
+                try:
+                    result = await loop.run_in_executor(pool, parse_page, url, body, charset, links,
+                                                        header_value(headers), redirects)
+                except Exception as e:
+                    result = error_result(url, f"❌ Error: {str(e)}")
+                if cache:
+                    cache.put(url, headers, result)
+                result['timing'] = timing
+                finish(index, result)
+            except Exception as e:
+                fail(e)
+                return
+
+    # Enough parse tasks to keep every worker busy while the next body is sent over
+    parsers = [asyncio.create_task(parse()) for _ in range(max(1, parse_workers) * 2)]
+    try:
+        more = given
+        while True:
+            schedule(more)
+            if done < len(urls):
+                idle.clear()
+                await idle.wait()
+            more = list(expand(None)) if expand else []
+            if not more:
+                break
+        for _ in parsers:
+            await parse_queue.put(None)
+        await asyncio.gather(*parsers)
+        return results
+    except asyncio.CancelledError:
+        if failure:
+            raise failure[0]
+        raise
+    finally:
+        for task in fetchers + parsers:
+            task.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+        await session.close()
+
+
+def crawl_pages(urls, concurrency=CRAWL_CONCURRENCY, per_host=CRAWL_PER_HOST, on_result=None,
+                cache=None, stats=None, parse_workers=PARSE_WORKERS, collect=True, links=False,
+                expand=None):
+    """Audit every URL; returns result dicts in URL order (None with collect=False)"""
+    if async_http_available():
+        return asyncio.run(crawl(urls, concurrency, per_host, on_result, cache, stats,
+                                 parse_workers, collect, links, expand))
+
+    # No async HTTP client installed - one page at a time, as before
+    urls = list(urls)
+    results = [] if collect else None
+    index = 0
+    while True:
+        while index < len(urls):
+            result = check_page(urls[index], cache, links)
+            index += 1
+            if collect:
+                results.append(result)
+            if on_result:
+                on_result(index, len(urls), result)
+            if expand:
+                urls.extend(expand(result))
+            if index < len(urls):
+                time.sleep(CRAWL_DELAY)
+        more = list(expand(None)) if expand else []
+        if not more:
+            return results
+        urls.extend(more)
@@ -0,0 +1,358 @@
+"""
+Fixture Site
+============
+A local stand-in for www.prourlmonitor.com, so the crawler can be run and
+benchmarked without hitting production.
+
+Serves a synthetic site shaped like the real one: a homepage, the seven
+tool categories, N tool pages named after pages/tools/*.js and a few blog
+posts. Pages follow the Next.js output of pages/tools/*.js - <Head> title,
+description and canonical, a nav header, a <section> with the H1, tool
+copy and "related tools" links, a footer and a __NEXT_DATA__ blob - with
+word counts, title lengths and text spread so the audit finds the usual
+issues (short pages, near-duplicates, the odd noindex).
+
+Like the real site it has robots.txt, a sitemap index and child sitemaps
+(gzipped .xml.gz with gzip on). Configurable:
+
+  --pages N           tool pages (default 500)
+  --latency MS        added to every response (default 20), --jitter MS
+  --error-rate F      share of requests answered 500 / 503 (default 0)
+  --redirect-rate F   share of tool pages listed under an old URL that
+                      redirects, a third of them through a 2-hop chain
+  --no-gzip           plain bodies even for Accept-Encoding: gzip
+  --no-etags          no ETag / Last-Modified, so never 304
+  --seed N            same site for the same seed
+
+Everything but the errors and the latency jitter is deterministic.
+
+Usage:
+    python fixture_site.py --pages 2000 --latency 50      # http://127.0.0.1:8800
+    SITE_URL=http://127.0.0.1:8800 CRAWL_DELAY=0 python seo_audit.py
+
+    from fixture_site import FixtureSite
+    server = FixtureSite(pages=200).serve()               # background thread, free port
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from email.utils import formatdate
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURE_PORT = 8800
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages', 'tools')
+
+CATEGORIES = ('seo', 'domain', 'network', 'text', 'code', 'converters', 'ai')
+# URLs per child sitemap
+SITEMAP_CHUNK = 1000
+# Rendered pages kept in memory (body, gzip body, ETag)
+RENDER_CACHE = 2048
+
+# Shares of tool pages
+BLOG_SHARE = 0.05
+DUPLICATE_SHARE = 0.05
+NOINDEX_SHARE = 0.02
+
+WORDS = (
+    'url', 'seo', 'tool', 'free', 'online', 'check', 'website', 'page', 'link', 'backlink', 'domain',
+    'search', 'google', 'rank', 'ranking', 'keyword', 'content', 'meta', 'title', 'description', 'index',
+    'crawl', 'sitemap', 'speed', 'mobile', 'traffic', 'report', 'result', 'analysis', 'generator',
+    'converter', 'text', 'code', 'network', 'monitor', 'status', 'redirect', 'header', 'server',
+    'response', 'quality', 'score', 'instant', 'simple', 'fast', 'accurate', 'bulk', 'single', 'mode',
+    'copy', 'paste', 'enter', 'click', 'button', 'results', 'users', 'visitors', 'engine', 'optimize',
+    'improve', 'better', 'helps', 'shows', 'finds', 'every', 'your', 'the', 'and', 'with', 'for', 'this',
+    'that', 'you', 'can', 'our', 'from', 'into', 'more', 'when', 'how', 'what', 'why', 'use', 'get',
+)
+TEMPLATE_BOILERPLATE = (
+    'How to use this tool. Enter your URL in the box above and click the button to see instant results. '
+    'Our free online tools help you improve your website and rank better in search engines. '
+)
+
+PAGE_HEAD = (
+    '<!DOCTYPE html><html lang="en"><head><meta charSet="utf-8"/>'
+    '<meta name="viewport" content="width=device-width, initial-scale=1"/>'
+    '<title>{title}</title><meta name="description" content="{description}"/>'
+    '<link rel="canonical" href="{canonical}"/>{robots}'
+    '<link rel="preload" href="/_next/static/css/app.css" as="style"/></head>'
+)
+PAGE_NAV = (
+    '<body><div id="__next"><header class="bg-white shadow"><nav class="max-w-7xl mx-auto px-4">'
+    '<a href="/">ProURLMonitor</a>{categories}<a href="/blog">Blog</a><a href="/login">Login</a>'
+    '</nav></header>'
+)
+PAGE_FOOTER = (
+    '<footer class="bg-gray-900 text-white"><a href="/about">About</a><a href="/privacy">Privacy</a>'
+    '<a href="/terms">Terms</a><p>© 2026 ProURLMonitor</p></footer></div>'
+    '<script id="__NEXT_DATA__" type="application/json">{data}</script>'
+    '<script src="/_next/static/chunks/main.js" async=""></script></body></html>'
+)
+
+
+def tool_slugs(count, tools_dir=TOOLS_DIR):
+    """count page slugs: the real tool pages first, then numbered variants of them"""
+    names = sorted(os.path.basename(path)[:-3] for path in glob.glob(os.path.join(tools_dir, '*.js'))
+                   if not os.path.basename(path).startswith('['))
+    names = names or ['tool']
+    return [names[i] if i < len(names) else f"{names[i % len(names)]}-{i // len(names) + 1}" for i in range(count)]
+
+
+def sentence(rng, words=None):
+    words = words or rng.randint(8, 20)
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+
+class FixtureSite:
+    """The synthetic site: routes, page rendering and the HTTP server"""
+
+    def __init__(self, pages=500, latency=20, jitter=5, error_rate=0.0, redirect_rate=0.0,
+                 gzip_bodies=True, etags=True, seed=1):
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.error_rate = error_rate
+        self.gzip = gzip_bodies
+        self.etags = etags
+        self.seed = seed
+        self.errors = random.Random(seed)
+        self.errors_lock = threading.Lock()
+        self.modified = formatdate(time.time() - 86400, usegmt=True)
+
+        rng = random.Random(seed)
+        self.pages = {'/': ('home', 0)}
+        for category in CATEGORIES:
+            self.pages[f'/tools/category/{category}'] = ('category', category)
+        self.tools = []
+        for index, slug in enumerate(tool_slugs(pages)):
+            path = f'/blog/{slug}' if rng.random() < BLOG_SHARE else f'/tools/{slug}'
+            self.pages[path] = ('tool', index)
+            self.tools.append(path)
+        # Sitemap entries; some tool pages are listed under an old URL
+        self.redirects = {}
+        self.sitemap = []
+        for path in self.pages:
+            listed = path
+            if path in self.tools and rng.random() < redirect_rate:
+                listed = path + '/'
+                self.redirects[listed] = path
+                if rng.random() < 1 / 3:
+                    old = '/old' + path
+                    self.redirects[old] = listed
+                    listed = old
+            self.sitemap.append(listed)
+        self.render = lru_cache(maxsize=RENDER_CACHE)(self._render)
+
+    # Pages
+
+    def _render(self, path):
+        """(body, gzip body or None, ETag) for a page path"""
+        kind, key = self.pages[path]
+        rng = random.Random(f"{self.seed}:{path}")
+        if kind == 'tool':
+            # Near-duplicates reuse another page's copy
+            source = self.tools[key - 1] if key and rng.random() < DUPLICATE_SHARE else path
+            copy = random.Random(f"{self.seed}:{source}")
+            name = path.rstrip('/').rsplit('/', 1)[-1].replace('-', ' ').title()
+            title = f"{name} - {sentence(rng, rng.randint(2, 9))[:-1]}"
+            description = ' '.join(sentence(rng) for _ in range(rng.randint(1, 3)))[:rng.randint(60, 200)]
+            words = int(copy.lognormvariate(6.8, 0.5))
+            paragraphs = []
+            while words > 0:
+                size = copy.randint(3, 6)
+                paragraphs.append(' '.join(sentence(copy) for _ in range(size)))
+                words -= size * 14
+            related = [self.tools[rng.randrange(len(self.tools))] for _ in range(5)]
+            category = CATEGORIES[key % len(CATEGORIES)]
+            body = (f'<p class="text-gray-600 mb-8">{TEMPLATE_BOILERPLATE}</p>'
+                    + ''.join(f'<p class="text-gray-700 leading-relaxed mb-4">{p}</p>' for p in paragraphs)
+                    + f'<a href="/tools/category/{category}">More {category} tools</a>'
+                    + '<h2>Related tools</h2><ul>'
+                    + ''.join(f'<li><a href="{link}">{link.rsplit("/", 1)[-1]}</a></li>' for link in related)
+                    + '</ul>')
+            noindex = rng.random() < NOINDEX_SHARE
+        elif kind == 'category':
+            name = f"{key.upper() if key in ('seo', 'ai') else key.title()} Tools"
+            title = f"{name} - Free Online {name} | ProURLMonitor"
+            description = f"Browse every free {name.lower()} on ProURLMonitor. {sentence(rng)} {sentence(rng)}"
+            members = [path for index, path in enumerate(self.tools) if index % len(CATEGORIES)
+                       == CATEGORIES.index(key)]
+            body = (f'<p>{sentence(rng)} {sentence(rng)}</p><ul>'
+                    + ''.join(f'<li><a href="{link}">{link.rsplit("/", 1)[-1]}</a></li>' for link in members)
+                    + '</ul>')
+            noindex = False
+        else:
+            name = 'ProURLMonitor'
+            title = 'ProURLMonitor - Free SEO Tools, URL Monitoring and Website Analysis'
+            description = 'Free online SEO tools: backlink checker, meta tag analyzer, domain tools, ' \
+                          'network tools and more. Monitor your URLs and improve your rankings.'
+            body = ''.join(f'<p><a href="/tools/category/{category}">{category} tools</a> {sentence(rng)}</p>'
+                           for category in CATEGORIES)
+            noindex = False
+
+        head = PAGE_HEAD.format(title=title, description=description, canonical=path,
+                                robots='<meta name="robots" content="noindex"/>' if noindex else '')
+        nav = PAGE_NAV.format(categories=''.join(f'<a href="/tools/category/{c}">{c}</a>' for c in CATEGORIES))
+        main = (f'<main><section class="max-w-4xl mx-auto px-4 py-12">'
+                f'<h1 class="text-4xl font-bold mb-6">{name}</h1>{body}</section></main>')
+        # Next.js ships the page props again as JSON
+        data = json.dumps({'props': {'pageProps': {'title': title, 'description': description}},
+                           'page': path, 'buildId': f"fixture-{self.seed}",
+                           'chunks': [hashlib.blake2b(f"{path}{i}".encode(), digest_size=16).hexdigest()
+                                      for i in range(rng.randint(20, 120))]})
+        html = (head + nav + main + PAGE_FOOTER.format(data=data)).encode('utf-8')
+        etag = f'"{hashlib.blake2b(html, digest_size=8).hexdigest()}"'
+        return html, gzip.compress(html, 6) if self.gzip else None, etag
+
+    def robots_txt(self, base):
+        return f"User-agent: *\nAllow: /\nDisallow: /api/\n\nSitemap: {base}/sitemap.xml\n".encode('utf-8')
+
+    def sitemap_index(self, base):
+        extension = '.xml.gz' if self.gzip else '.xml'
+        entries = ''.join(f"<sitemap><loc>{base}/sitemaps/{number}{extension}</loc></sitemap>"
+                          for number in range((len(self.sitemap) + SITEMAP_CHUNK - 1) // SITEMAP_CHUNK))
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f"{entries}</sitemapindex>").encode('utf-8')
+
+    def child_sitemap(self, base, number):
+        chunk = self.sitemap[number * SITEMAP_CHUNK:(number + 1) * SITEMAP_CHUNK]
+        if not chunk:
+            return None
+        entries = ''.join(f"<url><loc>{base}{path}</loc><lastmod>2026-01-01</lastmod></url>" for path in chunk)
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f"{entries}</urlset>").encode('utf-8')
+
+    # Serving
+
+    def failure(self):
+        """500 / 503 for error_rate of the requests, else None"""
+        if not self.error_rate:
+            return None
+        with self.errors_lock:
+            roll = self.errors.random()
+        if roll >= self.error_rate:
+            return None
+        return 503 if roll < self.error_rate / 2 else 500
+
+    def delay(self):
+        with self.errors_lock:
+            seconds = self.errors.gauss(self.latency, self.jitter) if self.jitter else self.latency
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def serve(self, port=0, host='127.0.0.1'):
+        """Start serving in a background thread; returns the server (.base_url, .shutdown())"""
+        server = ThreadingHTTPServer((host, port), FixtureHandler)
+        server.daemon_threads = True
+        server.site = self
+        server.base_url = f"http://{host}:{server.server_address[1]}"
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    # Keep-alive, as production is served
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        site = self.server.site
+        site.delay()
+        base = f"http://{self.headers.get('Host') or 'localhost'}"
+        path = self.path.split('?', 1)[0]
+        status = site.failure()
+        if status:
+            return self.send_body(status, b'<html><body>Server error</body></html>', 'text/html',
+                                  extra={'Retry-After': '1'} if status == 503 else None)
+        if path in site.redirects:
+            return self.send_body(301, b'', 'text/html', extra={'Location': base + site.redirects[path]})
+        if path == '/robots.txt':
+            return self.send_body(200, site.robots_txt(base), 'text/plain')
+        if path == '/sitemap.xml':
+            return self.send_body(200, site.sitemap_index(base), 'application/xml')
+        if path.startswith('/sitemaps/'):
+            name = path.rsplit('/', 1)[-1]
+            number = name.split('.', 1)[0]
+            sitemap = site.child_sitemap(base, int(number)) if number.isdigit() else None
+            if sitemap is None:
+                return self.send_body(404, b'Not found', 'text/plain')
+            if name.endswith('.gz'):
+                return self.send_body(200, gzip.compress(sitemap), 'application/gzip')
+            return self.send_body(200, sitemap, 'application/xml')
+        if path not in site.pages:
+            return self.send_body(404, b'<html><body><h1>404</h1></body></html>', 'text/html')
+
+        body, compressed, etag = site.render(path)
+        headers = {}
+        if site.etags:
+            headers = {'ETag': etag, 'Last-Modified': site.modified}
+            if self.headers.get('If-None-Match') == etag:
+                return self.send_body(304, b'', None, extra=headers)
+        if compressed and 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+            body = compressed
+            headers['Content-Encoding'] = 'gzip'
+            headers['Vary'] = 'Accept-Encoding'
+        self.send_body(200, body, 'text/html; charset=utf-8', extra=headers)
+
+    def send_body(self, status, body, content_type, extra=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        for name, value in (extra or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def option(name, default, kind=float):
+    """Value after --name on the command line, or default"""
+    if name in sys.argv:
+        return kind(sys.argv[sys.argv.index(name) + 1])
+    return default
+
+
+def site_from_args():
+    """FixtureSite configured from the command-line options above"""
+    return FixtureSite(
+        pages=option('--pages', 500, int),
+        latency=option('--latency', 20),
+        jitter=option('--jitter', 5),
+        error_rate=option('--error-rate', 0.0),
+        redirect_rate=option('--redirect-rate', 0.0),
+        gzip_bodies='--no-gzip' not in sys.argv,
+        etags='--no-etags' not in sys.argv,
+        seed=option('--seed', 1, int),
+    )
+
+
+def main():
+    site = site_from_args()
+    server = site.serve(option('--port', FIXTURE_PORT, int), option('--host', '127.0.0.1', str))
+    print(f"🧪 Fixture site: {len(site.pages)} pages, {len(site.redirects)} redirects at {server.base_url}")
+    print(f"   SITE_URL={server.base_url} CRAWL_DELAY=0 python seo_audit.py")
+    sys.stdout.flush()
+    try:
+        while True:
+            time.sleep(3600)
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Fixture site stopped")
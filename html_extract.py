@@ -0,0 +1,348 @@
+"""
+HTML Extraction Backends
+========================
+Pulls the SEO fields out of a page: meta title, meta description, first
+H1, meta robots (robots and googlebot tags, joined), the <link
+rel="canonical"> href and the main-content text. Word counts and the other
+content metrics are taken from that text by text_metrics.py.
+
+Main content is the first <main> (or <body>) with script, style, nav,
+header and footer removed - the same rules seo_audit.py always used. A
+document without a <body> tag has an implied one, as in browsers: its
+text outside <head> counts. Script and style text never counts, not even
+inside the H1. Every backend gives the same fields for the same page.
+
+With links=True the href of every followable <a> (anywhere on the page,
+navigation included; rel="nofollow" skipped) is returned as well.
+
+Backends, fastest first:
+  selectolax   - lexbor C parser, CSS lookups on the parsed tree
+  lxml         - libxml2 parser feeding PageHandler events; no tree is built
+  html.parser  - the standard library parser feeding the same PageHandler
+  bs4          - BeautifulSoup tree with decompose()/get_text() (the original)
+
+'auto' picks selectolax, then lxml, then bs4. Set HTML_EXTRACTOR to force
+one. benchmark_extractors.py compares them on saved pages.
+
+Usage:
+    from html_extract import extract_page
+
+    page = extract_page(html)
+    print(page['meta_title'], page['text'])
+"""
+
+import importlib.util
+import os
+from html.parser import HTMLParser
+
+HTML_EXTRACTOR = os.environ.get('HTML_EXTRACTOR', 'auto')
+
+# Text that is never content, wherever it is
+HIDDEN_TAGS = ('script', 'style')
+# Stripped before main-content text is taken
+EXCLUDED_TAGS = HIDDEN_TAGS + ('nav', 'header', 'footer')
+# Not part of an implied <body>
+HEAD_TAGS = ('head', 'title')
+VOID_TAGS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr',
+))
+AUTO_ORDER = ('selectolax', 'lxml', 'bs4')
+# <meta name=...> tags holding robots directives for Google
+ROBOTS_META_NAMES = ('robots', 'googlebot')
+
+
+def page_fields(meta_title, meta_description, h1, text, links=None, robots=None, canonical=None):
+    fields = {
+        'meta_title': meta_title,
+        'meta_description': meta_description,
+        'h1': h1,
+        'meta_robots': ', '.join(robots) if robots else None,
+        'canonical': canonical.strip() if canonical else None,
+        'text': text,
+    }
+    if links is not None:
+        fields['links'] = links
+    return fields
+
+
+def followed_href(attrib):
+    """href of an <a> that search engines follow, else None"""
+    rel = attrib.get('rel') or ''
+    if not isinstance(rel, str):
+        # BeautifulSoup splits rel into a list
+        rel = ' '.join(rel)
+    if 'nofollow' in rel.lower():
+        return None
+    return attrib.get('href')
+
+
+def is_canonical(attrib):
+    """True for <link rel="canonical"> attributes"""
+    rel = attrib.get('rel') or ''
+    if not isinstance(rel, str):
+        rel = ' '.join(rel)
+    return 'canonical' in rel.lower().split()
+
+
+class PageHandler:
+    """
+    Collects the SEO fields from parser events in a single pass.
+
+    Implements the lxml parser-target interface (start/end/data/close);
+    StreamingParser adapts the standard library parser to it.
+    """
+
+    def __init__(self, links=False):
+        self.links = [] if links else None
+        self.robots = []
+        self.canonical = None
+        self.title = None
+        self.description = None
+        self.h1 = None
+        self.title_parts = None
+        self.h1_parts = None
+        self.h1_depth = 0
+        self.hidden_depth = 0
+        self.skip_depth = 0
+        self.main_depth = 0
+        self.main_done = False
+        self.main_parts = None
+        self.body_parts = None
+        self.body_depth = 0
+        # Text outside <head>, for documents without a <body> tag
+        self.implied_body_parts = []
+        self.head_depth = 0
+
+    def start(self, tag, attrib):
+        tag = tag.lower()
+        if tag in VOID_TAGS:
+            if tag == 'meta':
+                name = attrib.get('name')
+                if self.description is None and name == 'description':
+                    self.description = (attrib.get('content') or '').strip()
+                elif (name or '').lower() in ROBOTS_META_NAMES and attrib.get('content'):
+                    self.robots.append(attrib.get('content'))
+            elif tag == 'link' and self.canonical is None and is_canonical(attrib):
+                self.canonical = attrib.get('href')
+            return
+        if tag == 'a' and self.links is not None:
+            href = followed_href(attrib)
+            if href:
+                self.links.append(href)
+        if tag == 'title' and self.title is None and self.title_parts is None:
+            self.title_parts = []
+        elif tag == 'h1' and self.h1 is None:
+            self.h1_depth += 1
+            if self.h1_parts is None:
+                self.h1_parts = []
+        if tag in HIDDEN_TAGS:
+            self.hidden_depth += 1
+        if tag in HEAD_TAGS:
+            self.head_depth += 1
+        if tag in EXCLUDED_TAGS:
+            self.skip_depth += 1
+        elif tag == 'main' and not self.main_done and not self.skip_depth:
+            self.main_depth += 1
+            if self.main_parts is None:
+                self.main_parts = []
+        elif tag == 'body':
+            self.body_depth += 1
+            if self.body_parts is None:
+                self.body_parts = []
+
+    def end(self, tag):
+        tag = tag.lower()
+        if tag == 'title' and self.title_parts is not None and self.title is None:
+            self.title = ''.join(self.title_parts).strip()
+        elif tag == 'h1' and self.h1_depth:
+            self.h1_depth -= 1
+            if not self.h1_depth:
+                self.h1 = ''.join(self.h1_parts).strip()
+        if tag in HIDDEN_TAGS:
+            self.hidden_depth = max(0, self.hidden_depth - 1)
+        if tag in HEAD_TAGS:
+            self.head_depth = max(0, self.head_depth - 1)
+        if tag in EXCLUDED_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag == 'main' and self.main_depth:
+            self.main_depth -= 1
+            self.main_done = not self.main_depth
+        elif tag == 'body' and self.body_depth:
+            self.body_depth -= 1
+
+    def data(self, text):
+        if self.title_parts is not None and self.title is None:
+            self.title_parts.append(text)
+        if self.h1_depth and not self.hidden_depth:
+            self.h1_parts.append(text)
+        if self.skip_depth:
+            return
+        if self.main_depth:
+            self.main_parts.append(text)
+        if self.body_depth:
+            self.body_parts.append(text)
+        elif not self.head_depth:
+            self.implied_body_parts.append(text)
+
+    def close(self):
+        if self.h1 is None and self.h1_parts is not None:
+            self.h1 = ''.join(self.h1_parts).strip()
+        if self.main_parts is not None:
+            text = ''.join(self.main_parts)
+        elif self.body_parts is not None:
+            text = ''.join(self.body_parts)
+        else:
+            text = ''.join(self.implied_body_parts)
+        return page_fields(self.title or None, self.description, self.h1 or None, text, self.links,
+                           self.robots, self.canonical)
+
+
+class StreamingParser(HTMLParser):
+    """Standard library parser forwarding events to a PageHandler"""
+
+    def __init__(self, handler):
+        super().__init__(convert_charrefs=True)
+        self.handler = handler
+
+    def handle_starttag(self, tag, attrs):
+        self.handler.start(tag, {name: value for name, value in attrs})
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handler.end(tag)
+
+    def handle_endtag(self, tag):
+        self.handler.end(tag)
+
+    def handle_data(self, data):
+        self.handler.data(data)
+
+
+def extract_stdlib(html, links=False):
+    parser = StreamingParser(PageHandler(links))
+    parser.feed(html)
+    parser.close()
+    return parser.handler.close()
+
+
+def extract_lxml(html, links=False):
+    from lxml import etree
+
+    if not html.strip():
+        return PageHandler(links).close()
+    # lxml refuses str input that carries an encoding declaration
+    parser = etree.HTMLParser(target=PageHandler(links), encoding='utf-8')
+    return etree.fromstring(html.encode('utf-8'), parser)
+
+
+def extract_selectolax(html, links=False):
+    try:
+        from selectolax.lexbor import LexborHTMLParser as Parser
+    except ImportError:
+        from selectolax.parser import HTMLParser as Parser
+
+    tree = Parser(html)
+    # Script text would otherwise end up in the H1
+    tree.strip_tags(list(HIDDEN_TAGS))
+    title_tag = tree.css_first('title')
+    meta_desc_tag = tree.css_first('meta[name="description"]')
+    h1_tag = tree.css_first('h1')
+    meta_title = title_tag.text().strip() if title_tag else None
+    meta_description = (meta_desc_tag.attributes.get('content') or '').strip() if meta_desc_tag else None
+    h1_text = h1_tag.text().strip() if h1_tag else None
+    hrefs = None
+    if links:
+        hrefs = [href for href in (followed_href(a.attributes) for a in tree.css('a[href]')) if href]
+
+    robots = [tag.attributes.get('content') for tag in tree.css('meta[name]')
+              if (tag.attributes.get('name') or '').lower() in ROBOTS_META_NAMES and tag.attributes.get('content')]
+    canonical = next((tag.attributes.get('href') for tag in tree.css('link[rel]') if is_canonical(tag.attributes)),
+                     None)
+
+    tree.strip_tags(list(EXCLUDED_TAGS))
+    main_content = tree.css_first('main') or tree.body
+    text = main_content.text() if main_content else ''
+    return page_fields(meta_title or None, meta_description, h1_text or None, text, hrefs, robots, canonical)
+
+
+def extract_bs4(html, links=False):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(list(HIDDEN_TAGS)):
+        tag.decompose()
+
+    # Check meta title
+    title_tag = soup.find('title')
+    meta_title = title_tag.string.strip() if title_tag else None
+
+    # Check meta description
+    meta_desc_tag = soup.find('meta', attrs={'name': 'description'})
+    meta_description = meta_desc_tag.get('content', '').strip() if meta_desc_tag else None
+
+    # Check H1
+    h1_tag = soup.find('h1')
+    h1_text = h1_tag.get_text().strip() if h1_tag else None
+
+    robots = [tag['content'] for tag in soup.find_all('meta', attrs={'name': True, 'content': True})
+              if tag['name'].lower() in ROBOTS_META_NAMES]
+    canonical_tag = soup.find('link', rel='canonical')
+    canonical = canonical_tag.get('href') if canonical_tag else None
+
+    # Links, before navigation is stripped
+    hrefs = None
+    if links:
+        hrefs = [href for href in (followed_href(a.attrs) for a in soup.find_all('a', href=True)) if href]
+
+    # Count content words (excluding header, footer, nav)
+    # Remove script and style elements
+    for script in soup(list(EXCLUDED_TAGS)):
+        script.decompose()
+
+    # Get text from main content
+    main_content = soup.find('main') or soup.find('body')
+    if not main_content:
+        # No <body> tag: everything outside <head> is the implied body
+        for tag in soup(list(HEAD_TAGS)):
+            tag.decompose()
+        main_content = soup
+    text = main_content.get_text()
+
+    return page_fields(meta_title, meta_description, h1_text, text, hrefs, robots, canonical)
+
+
+BACKENDS = {
+    'selectolax': extract_selectolax,
+    'lxml': extract_lxml,
+    'html.parser': extract_stdlib,
+    'bs4': extract_bs4,
+}
+BACKEND_MODULES = {'selectolax': 'selectolax', 'lxml': 'lxml', 'html.parser': 'html', 'bs4': 'bs4'}
+
+
+def available_backends():
+    """Installed backends, fastest first"""
+    return [name for name in BACKENDS if importlib.util.find_spec(BACKEND_MODULES[name])]
+
+
+def get_extractor(name=HTML_EXTRACTOR):
+    """Extraction function for a backend name, or the best installed one for 'auto'"""
+    if name != 'auto':
+        return BACKENDS[name]
+    installed = available_backends()
+    for candidate in AUTO_ORDER:
+        if candidate in installed:
+            return BACKENDS[candidate]
+    return extract_stdlib
+
+
+_extractor = None
+
+
+def extract_page(html, links=False):
+    """Pull title, meta description, H1, canonical, main-content text (and links) out of HTML"""
+    global _extractor
+    if _extractor is None:
+        _extractor = get_extractor()
+    return _extractor(html, links)
@@ -0,0 +1,209 @@
+"""
+Indexability Checker
+====================
+Decides for every URL whether Google may crawl and index it:
+  - robots.txt: fetched once per host and compiled into a matcher that
+    follows Google's rules (the googlebot group, else *; longest matching
+    pattern wins, Allow wins ties; * and $ wildcards)
+  - meta robots / googlebot tags and the X-Robots-Tag header: read from
+    the responses the audit already downloads, no extra requests
+
+A robots.txt that answers 4xx allows everything. One that answers 5xx or
+cannot be reached blocks everything, as it does for Googlebot.
+
+seo_audit.py classifies every sitemap URL at the end of an audit and
+writes indexability.csv; noindex pages also get an audit issue.
+indexing_diagnosis.py runs the robots.txt check on its own.
+
+Usage:
+    from indexability import RobotsCache, classify
+
+    robots = RobotsCache()
+    for url, indexable, reason in classify(urls, robots, noindex={}):
+        ...
+"""
+
+import csv
+import re
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+INDEXABILITY_FILE = 'indexability.csv'
+
+USER_AGENT = 'ProURLMonitor-SEOAudit/1.0'
+# robots.txt group and X-Robots-Tag prefix for Google's crawler
+CRAWLER = 'googlebot'
+ROBOTS_TIMEOUT = 10
+
+INDEXABLE = 'Indexable'
+NOINDEX_META = 'noindex (meta robots)'
+NOINDEX_HEADER = 'noindex (X-Robots-Tag)'
+# Audit issue for noindex pages, followed by NOINDEX_META / NOINDEX_HEADER
+NOINDEX_ISSUE = '❌ Not indexable: '
+
+# Directives written as "name: value"
+VALUE_DIRECTIVES = ('unavailable_after', 'max-snippet', 'max-image-preview', 'max-video-preview')
+
+ROBOTS_LINE = re.compile(r'^\s*([A-Za-z-]+)\s*:\s*(.*?)\s*$')
+# scheme://host and path?query of a URL (urlsplit is the bottleneck on big sites)
+URL_PARTS = re.compile(r'([^:/?#]+://[^/?#]*)([^#]*)')
+
+
+class RobotsRules:
+    """Compiled Allow/Disallow rules of one robots.txt group"""
+
+    def __init__(self, rules, blocked_reason=None):
+        # Longest pattern first; Allow before Disallow of the same length.
+        # All rules become one alternation, and the regex engine returns the
+        # first alternative that matches, so a path is checked in one call.
+        self.rules = sorted(rules, key=lambda rule: (-len(rule[1]), not rule[0]))
+        alternatives = []
+        for index, (allow, pattern) in enumerate(self.rules):
+            anchored = pattern.endswith('$')
+            body = pattern[:-1] if anchored else pattern
+            regex = '.*'.join(re.escape(part) for part in body.split('*')) + ('$' if anchored else '')
+            alternatives.append(f'(?P<r{index}>{regex})')
+        self.matcher = re.compile('|'.join(alternatives), re.DOTALL).match if alternatives else None
+        # Every path is blocked (robots.txt unreachable)
+        self.blocked_reason = blocked_reason
+
+    @classmethod
+    def parse(cls, text, crawler=CRAWLER):
+        """Rules for crawler: its own groups if any, else the * groups"""
+        groups = {}
+        agents = []
+        in_rules = False
+        for line in text.splitlines():
+            match = ROBOTS_LINE.match(line.split('#', 1)[0])
+            if not match:
+                continue
+            field, value = match.group(1).lower(), match.group(2)
+            if field == 'user-agent':
+                if in_rules:
+                    agents, in_rules = [], False
+                agents.append(value.lower())
+            elif field in ('allow', 'disallow'):
+                in_rules = True
+                if value:
+                    for agent in agents:
+                        groups.setdefault(agent, []).append((field == 'allow', value))
+                else:
+                    for agent in agents:
+                        groups.setdefault(agent, [])
+        rules = groups[crawler] if crawler in groups else groups.get('*', [])
+        return cls(rules)
+
+    def check(self, path):
+        """(allowed, matching rule or None) for a path with its query string"""
+        if self.blocked_reason:
+            return False, self.blocked_reason
+        match = self.matcher(path) if self.matcher else None
+        if match is None:
+            return True, None
+        allow, pattern = self.rules[int(match.lastgroup[1:])]
+        return allow, f"{'Allow' if allow else 'Disallow'}: {pattern}"
+
+
+def fetch_robots(origin):
+    """RobotsRules for scheme://host, fetched from its /robots.txt"""
+    try:
+        request = Request(origin + '/robots.txt', headers={'User-Agent': USER_AGENT})
+        with urlopen(request, timeout=ROBOTS_TIMEOUT) as response:
+            return RobotsRules.parse(response.read().decode('utf-8', errors='replace'))
+    except HTTPError as e:
+        if 400 <= e.code < 500:
+            return RobotsRules([])
+        return RobotsRules([], blocked_reason=f"robots.txt answered {e.code}")
+    except Exception as e:
+        return RobotsRules([], blocked_reason=f"robots.txt unreachable ({e})")
+
+
+class RobotsCache:
+    """One compiled robots.txt per host, fetched on first use"""
+
+    def __init__(self, fetch=fetch_robots):
+        self.fetch = fetch
+        self.hosts = {}
+
+    def check(self, url):
+        origin, path = URL_PARTS.match(url).groups()
+        origin = origin.lower()
+        rules = self.hosts.get(origin)
+        if rules is None:
+            rules = self.hosts[origin] = self.fetch(origin)
+        return rules.check(path if path.startswith('/') else '/' + path)
+
+
+def directives(value, crawler=CRAWLER):
+    """Lower-case robots directives that apply to crawler from a meta content / X-Robots-Tag value"""
+    found = set()
+    agent = None
+    for part in (value or '').lower().split(','):
+        # "otherbot: noindex, nofollow" applies to otherbot only, up to the next agent
+        name, colon, rest = part.partition(':')
+        name = name.strip()
+        if colon and name not in VALUE_DIRECTIVES and ' ' not in name:
+            agent, part = name, rest
+        if agent in (None, crawler):
+            found.add(part.strip())
+    return found
+
+
+def is_noindex(value):
+    found = directives(value)
+    return 'noindex' in found or 'none' in found
+
+
+def noindex_source(meta_robots, x_robots_tag):
+    """NOINDEX_META / NOINDEX_HEADER if the page asks not to be indexed, else None"""
+    if is_noindex(meta_robots):
+        return NOINDEX_META
+    if is_noindex(x_robots_tag):
+        return NOINDEX_HEADER
+    return None
+
+
+def noindex_from_issues(issues):
+    """noindex source recorded in an audit result's issues, or None"""
+    for issue in issues:
+        if issue.startswith(NOINDEX_ISSUE):
+            return issue[len(NOINDEX_ISSUE):]
+    return None
+
+
+def header_value(headers, name='X-Robots-Tag'):
+    """All values of a response header joined with commas (aiohttp, httpx or requests), or None"""
+    getall = getattr(headers, 'getall', None)
+    if getall:
+        return ', '.join(getall(name, [])) or None
+    return headers.get(name)
+
+
+def classify(urls, robots, noindex=None):
+    """
+    Yield (url, indexable, reason) for every URL in one pass.
+
+    noindex maps audited URLs to their noindex source (NOINDEX_META /
+    NOINDEX_HEADER).
+    """
+    noindex = noindex or {}
+    for url in urls:
+        allowed, rule = robots.check(url)
+        if not allowed:
+            yield url, False, f"Blocked by robots.txt ({rule})"
+        elif url in noindex:
+            yield url, False, noindex[url]
+        else:
+            yield url, True, INDEXABLE
+
+
+def write_verdicts(verdicts, path=INDEXABILITY_FILE):
+    """Write classify() output; returns {reason: count}"""
+    counts = {}
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['URL', 'Indexable', 'Reason'])
+        for url, indexable, reason in verdicts:
+            writer.writerow([url, 'yes' if indexable else 'no', reason])
+            counts[reason] = counts.get(reason, 0) + 1
+    return counts
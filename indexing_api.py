@@ -16,84 +16,37 @@ Setup Instructions:
    - Settings > Users and permissions
    - Add service account email with "Owner" permission
 6. Save JSON file as 'service-account.json' in same folder
+   (or, for more than 200 URLs a day, put one JSON key per Google Cloud
+   project in a 'service-accounts/' folder - URLs are shared out across
+   them and each project's daily quota is tracked separately)
 7. Install required packages: pip install google-auth google-auth-oauthlib google-auth-httplib2 google-api-python-client
 
 Usage:
     python indexing_api.py
-"""
-
-import json
-import time
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+    python indexing_api.py --batch    # up to 100 URLs per HTTP request
+    python indexing_api.py --force    # resubmit URLs the ledger says were sent recently
+    python indexing_api.py --no-resolve    # submit sitemap URLs without following
+                                           # redirects / canonicals first
 
-# Configuration
-SERVICE_ACCOUNT_FILE = 'service-account.json'  # Your JSON key file
-SCOPES = ['https://www.googleapis.com/auth/indexing']
+Only final canonical URLs are submitted: redirects are followed and the
+canonical link read first (see url_resolver.py), so redirecting and
+duplicate URLs do not use up the daily quota.
 
-# Load URLs from file
-def load_urls(filename='sitemap-urls.txt'):
-    """Load URLs from text file"""
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            urls = [line.strip() for line in f if line.strip()]
-        return urls
-    except FileNotFoundError:
-        print(f"❌ Error: {filename} not found!")
-        return []
+URLs are submitted highest priority first (see submission_scheduler.py);
+python submission_scheduler.py prints the multi-day plan.
 
-# Authenticate with Google
-def get_indexing_service():
-    """Create authenticated indexing service"""
-    try:
-        credentials = service_account.Credentials.from_service_account_file(
-            SERVICE_ACCOUNT_FILE, 
-            scopes=SCOPES
-        )
-        service = build('indexing', 'v3', credentials=credentials)
-        return service
-    except FileNotFoundError:
-        print(f"❌ Error: {SERVICE_ACCOUNT_FILE} not found!")
-        print("Please download JSON key from Google Cloud Console")
-        return None
-    except Exception as e:
-        print(f"❌ Authentication error: {e}")
-        return None
-
-# Send indexing request
-def submit_url_for_indexing(service, url, notification_type='URL_UPDATED'):
-    """
-    Submit URL for indexing
-    notification_type: 'URL_UPDATED' or 'URL_DELETED'
-    """
-    try:
-        body = {
-            'url': url,
-            'type': notification_type
-        }
-        
-        response = service.urlNotifications().publish(body=body).execute()
-        return True, response
-    
-    except HttpError as e:
-        error_details = json.loads(e.content.decode('utf-8'))
-        error_message = error_details.get('error', {}).get('message', str(e))
-        return False, error_message
-    
-    except Exception as e:
-        return False, str(e)
+Local testing:
+    Set INDEXING_API_ENDPOINT (e.g. http://localhost:8080/) to send all
+    requests, including batches, to a local stand-in server instead of
+    indexing.googleapis.com.
+"""
 
-# Get URL status
-def get_url_status(service, url):
-    """Check indexing status of URL"""
-    try:
-        response = service.urlNotifications().getMetadata(url=url).execute()
-        return True, response
-    except HttpError as e:
-        return False, str(e)
-    except Exception as e:
-        return False, str(e)
+import sys
+from indexing_client import AccountPool, SERVICE_ACCOUNT_FILE, load_urls, print_account_usage, print_metrics
+from submission_engine import print_throughput
+from submission_ledger import SubmissionLedger
+from submission_scheduler import prioritize
+from url_resolver import submission_urls
 
 # Main execution
 def main():
@@ -103,7 +56,7 @@ def main():
     print()
     
     # Load URLs
-    print("📂 Loading URLs from sitemap-urls.txt...")
+    print("📂 Discovering URLs from robots.txt and sitemaps...")
     urls = load_urls()
     
     if not urls:
@@ -113,43 +66,52 @@ def main():
     print(f"✅ Loaded {len(urls)} URLs")
     print()
     
+    # Final canonical URLs only (--no-resolve submits the sitemap URLs as listed)
+    if '--no-resolve' not in sys.argv:
+        urls = submission_urls(urls)
+    
+    # Highest-value URLs first, so the daily quota goes to them
+    ledger = SubmissionLedger()
+    urls = prioritize(urls, ledger)
+    
     # Authenticate
     print("🔐 Authenticating with Google...")
-    service = get_indexing_service()
-    
-    if not service:
+    client = AccountPool(ledger=ledger)
+    try:
+        client.connect()
+    except FileNotFoundError:
+        print(f"❌ Error: {SERVICE_ACCOUNT_FILE} not found!")
+        print("Please download JSON key from Google Cloud Console")
+        return
+    except Exception as e:
+        print(f"❌ Authentication error: {e}")
         return
     
-    print("✅ Authentication successful!")
+    for name, error in client.errors.items():
+        print(f"⚠️  Skipping {name}: {error}")
+    print(f"✅ Authentication successful! ({len(client.clients)} service account(s))")
     print()
     
     # Submit URLs
     print("📤 Submitting URLs for indexing...")
     print("-" * 60)
     
-    success_count = 0
-    failed_count = 0
-    failed_urls = []
-    
-    for index, url in enumerate(urls, 1):
-        print(f"\n[{index}/{len(urls)}] Processing: {url}")
-        
-        success, result = submit_url_for_indexing(service, url)
-        
+    def report(index, total, url, success, result):
         if success:
-            success_count += 1
-            print(f"✅ Success!")
+            print(f"[{index}/{total}] ✅ {url}")
             # Uncomment to see full response:
             # print(f"   Response: {result}")
         else:
-            failed_count += 1
-            failed_urls.append((url, result))
-            print(f"❌ Failed: {result}")
-        
-        # Rate limiting: Google allows 200 requests per day
-        # Add delay to avoid hitting rate limits too quickly
-        if index < len(urls):
-            time.sleep(0.5)  # 0.5 second delay between requests
+            print(f"[{index}/{total}] ❌ {url} - {result}")
+    
+    # Requests run concurrently, paced by a token bucket (600/min, 200/day)
+    # Ledger skips URLs notified recently (--force resubmits them anyway)
+    window_hours = 0 if '--force' in sys.argv else None
+    stats = client.submit(urls, batch='--batch' in sys.argv, on_result=report,
+                          window_hours=window_hours)
+    success_count = stats['success']
+    failed_count = stats['failed']
+    failed_urls = stats['failed_urls']
     
     # Summary
     print()
@@ -159,6 +121,9 @@ def main():
     print(f"Total URLs: {len(urls)}")
     print(f"✅ Successfully submitted: {success_count}")
     print(f"❌ Failed: {failed_count}")
+    print_throughput(stats)
+    print_account_usage(stats)
+    print_metrics(client.metrics)
     
     if failed_urls:
         print()
@@ -171,7 +136,7 @@ def main():
     # Daily quota info
     print()
     print("ℹ️  Google Indexing API Limits:")
-    print("   - 200 requests per day")
+    print("   - 200 requests per day (per service account project)")
     print("   - 600 requests per minute")
     print()
     
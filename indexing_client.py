@@ -0,0 +1,693 @@
+"""
+Indexing API Client Library
+===========================
+The one place that talks to the Google Indexing API. Every indexing script
+(indexing_api.py, reindex_urls.py, resubmit_all_optimized.py,
+submit_new_category_urls.py, test_api_connection.py,
+check_google_status.py) is a thin command-line front-end over it.
+
+It owns:
+  - authentication: service account credentials with the access token
+    persisted until it expires
+  - a pool of service accounts, each with its own daily quota
+  - fast start: a cached discovery document and lazy googleapiclient /
+    google-auth imports
+  - a pool of keep-alive authorized HTTP connections
+  - rate limiting, retries and checkpoints (via submission_engine.py)
+  - per-operation metrics: calls, errors by class, latency
+
+Usage:
+    from indexing_client import IndexingClient
+
+    client = IndexingClient(ledger=SubmissionLedger())
+    stats = client.submit(urls, batch=True)
+    print_metrics(client.metrics)
+
+    # Every key file in service-accounts/, sharing out the daily quota
+    client = AccountPool(ledger=SubmissionLedger())
+    stats = client.submit(urls)
+    print_account_usage(stats)
+"""
+
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import sitemap_discovery
+from submission_engine import (
+    CHECKPOINT_FILE, MAX_WORKERS, REQUESTS_PER_DAY, TRANSIENT, Checkpoint, classify_error,
+    submit_urls,
+)
+
+# Configuration
+SERVICE_ACCOUNT_FILE = 'service-account.json'
+# One key file per Google Cloud project; each project has its own daily quota
+SERVICE_ACCOUNTS_DIR = os.environ.get('SERVICE_ACCOUNTS_DIR', 'service-accounts')
+SCOPES = ['https://www.googleapis.com/auth/indexing']
+INDEXING_API_ENDPOINT = os.environ.get('INDEXING_API_ENDPOINT')  # Optional local stand-in
+
+CACHE_DIR = os.environ.get('INDEXING_CACHE_DIR', '.indexing-cache')
+DISCOVERY_CACHE = os.path.join(CACHE_DIR, 'indexing-v3-discovery.json')
+TOKEN_CACHE = os.path.join(CACHE_DIR, 'indexing-tokens.json')
+DISCOVERY_URL = 'https://indexing.googleapis.com/$discovery/rest?version=v3'
+
+HTTP_TIMEOUT = 30
+# Refresh tokens this long before Google says they expire
+TOKEN_EXPIRY_MARGIN = timedelta(minutes=5)
+
+# Batch mode: Google accepts up to 100 calls per batch request
+BATCH_SIZE = 100
+# submission_engine already retries failed items with backoff, so direct
+# batch calls do not retry by default
+BATCH_RETRIES = 0
+
+_lock = threading.Lock()
+_local = threading.local()
+_discovery_document = None
+_credentials = {}
+
+
+# Category pages created recently (submit_new_category_urls.py; the
+# scheduler ranks them first)
+NEW_CATEGORY_URLS = [
+    'https://www.prourlmonitor.com/tools/category/seo',
+    'https://www.prourlmonitor.com/tools/category/domain',
+    'https://www.prourlmonitor.com/tools/category/network',
+    'https://www.prourlmonitor.com/tools/category/text',
+    'https://www.prourlmonitor.com/tools/category/code',
+    'https://www.prourlmonitor.com/tools/category/converters',
+    'https://www.prourlmonitor.com/tools/category/ai',
+]
+
+
+# Load URLs from the live sitemaps (sitemap-urls.txt when none are found)
+def load_urls(filename='sitemap-urls.txt'):
+    """Load URLs from robots.txt / sitemap discovery, falling back to a text file"""
+    return sitemap_discovery.load_urls(filename)
+
+
+def _write_cache(path, data, mode=0o666):
+    """Atomically write JSON to the cache directory; the file is created with mode (less umask)"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    # A fresh file, so a leftover from a crashed run cannot keep wider permissions
+    try:
+        os.remove(tmp_path)
+    except FileNotFoundError:
+        pass
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+    with open(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def load_discovery_document():
+    """Indexing v3 discovery document from memory, disk cache, bundled copy or network"""
+    global _discovery_document
+    if _discovery_document is not None:
+        return _discovery_document
+
+    with _lock:
+        if _discovery_document is not None:
+            return _discovery_document
+
+        document = None
+        if os.path.exists(DISCOVERY_CACHE):
+            with open(DISCOVERY_CACHE, 'r', encoding='utf-8') as f:
+                document = f.read()
+        else:
+            try:
+                # googleapiclient 2.x ships static discovery documents
+                from googleapiclient.discovery_cache import get_static_doc
+                document = get_static_doc('indexing', 'v3')
+            except ImportError:
+                document = None
+            if document is None:
+                import httplib2
+                response, content = httplib2.Http(timeout=HTTP_TIMEOUT).request(DISCOVERY_URL)
+                if response.status != 200:
+                    raise RuntimeError(f"Could not download discovery document (HTTP {response.status})")
+                document = content.decode('utf-8')
+            _write_cache(DISCOVERY_CACHE, json.loads(document))
+
+        _discovery_document = document
+        return document
+
+
+def find_service_account_files():
+    """Key files in SERVICE_ACCOUNTS_DIR, or just SERVICE_ACCOUNT_FILE"""
+    files = sorted(glob.glob(os.path.join(SERVICE_ACCOUNTS_DIR, '*.json')))
+    return files or [SERVICE_ACCOUNT_FILE]
+
+
+def get_account_name(service_account_file):
+    """client_email of a key file (file name if it cannot be read)"""
+    try:
+        with open(service_account_file, 'r', encoding='utf-8') as f:
+            return json.load(f)['client_email']
+    except (OSError, ValueError, KeyError):
+        return os.path.basename(service_account_file)
+
+
+def _read_token_cache():
+    """{client_email: {'token', 'expiry'}} saved by earlier runs"""
+    try:
+        with open(TOKEN_CACHE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _load_cached_token(credentials):
+    """Restore a still-valid access token saved by an earlier run"""
+    cached = _read_token_cache().get(getattr(credentials, 'service_account_email', None))
+    if not cached:
+        return
+    expiry = datetime.fromisoformat(cached['expiry'])
+    # google-auth compares against naive UTC datetimes
+    if expiry - TOKEN_EXPIRY_MARGIN > datetime.utcnow():
+        credentials.token = cached['token']
+        credentials.expiry = expiry
+
+
+def _save_token(credentials):
+    if not credentials.token or not credentials.expiry:
+        return
+    tokens = _read_token_cache()
+    tokens[credentials.service_account_email] = {
+        'token': credentials.token,
+        'expiry': credentials.expiry.replace(tzinfo=None).isoformat(),
+    }
+    # Bearer tokens: readable by the owner only, from the moment the file exists
+    _write_cache(TOKEN_CACHE, tokens, mode=0o600)
+
+
+def get_credentials(service_account_file=SERVICE_ACCOUNT_FILE):
+    """Service account credentials with a cached access token when available"""
+    with _lock:
+        if service_account_file in _credentials:
+            return _credentials[service_account_file]
+
+        if INDEXING_API_ENDPOINT and not os.path.exists(service_account_file):
+            # Local stand-in server does not check credentials
+            from google.auth.credentials import AnonymousCredentials
+            credentials = AnonymousCredentials()
+        else:
+            from google.oauth2 import service_account
+            credentials = service_account.Credentials.from_service_account_file(
+                service_account_file,
+                scopes=SCOPES
+            )
+            _load_cached_token(credentials)
+
+        _credentials[service_account_file] = credentials
+        return credentials
+
+
+def make_http(credentials):
+    """New keep-alive HTTP connection authorized with credentials"""
+    import httplib2
+    import google_auth_httplib2
+
+    http = google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+    if hasattr(credentials, 'refresh') and not credentials.valid:
+        with _lock:
+            if not credentials.valid:
+                credentials.refresh(google_auth_httplib2.Request(http.http))
+                _save_token(credentials)
+    return http
+
+
+def build_service(credentials=None):
+    """Build an indexing service on its own connection from the cached discovery document"""
+    from googleapiclient.discovery import build_from_document
+
+    client_options = {'api_endpoint': INDEXING_API_ENDPOINT} if INDEXING_API_ENDPOINT else None
+    return build_from_document(
+        load_discovery_document(),
+        http=make_http(credentials or get_credentials()),
+        client_options=client_options,
+    )
+
+
+def get_indexing_service():
+    """Authenticated indexing service, one per thread"""
+    service = getattr(_local, 'service', None)
+    if service is None:
+        service = build_service()
+        _local.service = service
+    return service
+
+
+# Error message that remembers its HTTP status
+class ApiError(str):
+    """Error message string carrying the HTTP status code as .code"""
+    code = None
+
+
+# Extract readable message from API error
+def get_error_message(error):
+    """Return the 'error.message' field of an HttpError body, or str(error)"""
+    try:
+        error_details = json.loads(error.content.decode('utf-8'))
+        message = ApiError(error_details.get('error', {}).get('message', str(error)))
+    except (ValueError, AttributeError):
+        message = ApiError(str(error))
+    message.code = getattr(getattr(error, 'resp', None), 'status', None)
+    return message
+
+
+def get_exception_message(error):
+    """Message for a failure without an HTTP response; a failed token refresh counts as a 401"""
+    message = ApiError(str(error))
+    try:
+        from google.auth.exceptions import RefreshError
+    except ImportError:
+        return message
+    if isinstance(error, RefreshError):
+        message.code = 401
+    return message
+
+
+# Send indexing request
+def submit_url_for_indexing(service, url, notification_type='URL_UPDATED'):
+    """
+    Submit URL for indexing
+    notification_type: 'URL_UPDATED' or 'URL_DELETED'
+    """
+    from googleapiclient.errors import HttpError
+    try:
+        body = {
+            'url': url,
+            'type': notification_type
+        }
+
+        response = service.urlNotifications().publish(body=body).execute()
+        return True, response
+
+    except HttpError as e:
+        return False, get_error_message(e)
+
+    except Exception as e:
+        return False, get_exception_message(e)
+
+
+# Batch URL submission
+def get_batch_uri():
+    """Batch endpoint matching the configured API endpoint"""
+    base = INDEXING_API_ENDPOINT or 'https://indexing.googleapis.com/'
+    return base.rstrip('/') + '/batch'
+
+
+def submit_urls_batch(service, urls, notification_type='URL_UPDATED',
+                      batch_size=BATCH_SIZE, retries=BATCH_RETRIES):
+    """
+    Submit URLs using batch HTTP requests (up to batch_size per round trip)
+
+    Returns {url: (success, result)} with the same tuples as
+    submit_url_for_indexing. Only sub-requests that failed with a
+    transient error are sent again, up to `retries` more times.
+    """
+    from googleapiclient.errors import HttpError
+    from googleapiclient.http import BatchHttpRequest
+
+    outcomes = {}
+    pending = list(dict.fromkeys(urls))
+
+    for attempt in range(retries + 1):
+        retry = []
+
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+
+            def callback(request_id, response, exception):
+                url = chunk[int(request_id)]
+                if exception is None:
+                    outcomes[url] = (True, response)
+                    return
+                if isinstance(exception, HttpError):
+                    outcomes[url] = (False, get_error_message(exception))
+                else:
+                    outcomes[url] = (False, get_exception_message(exception))
+                if classify_error(outcomes[url][1]) == TRANSIENT:
+                    retry.append(url)
+
+            batch = BatchHttpRequest(callback=callback, batch_uri=get_batch_uri())
+            for index, url in enumerate(chunk):
+                body = {'url': url, 'type': notification_type}
+                batch.add(service.urlNotifications().publish(body=body), request_id=str(index))
+
+            try:
+                batch.execute()
+            except Exception as e:
+                # Whole round trip failed - retryable unless the token could not be refreshed
+                for url in chunk:
+                    if url not in outcomes or not outcomes[url][0]:
+                        outcomes[url] = (False, get_exception_message(e))
+                        if classify_error(outcomes[url][1]) == TRANSIENT and url not in retry:
+                            retry.append(url)
+
+        if not retry or attempt == retries:
+            break
+        pending = retry
+        time.sleep(2 ** attempt)
+
+    return {url: outcomes[url] for url in urls if url in outcomes}
+
+
+# Get URL status
+def get_url_status(service, url):
+    """Check indexing status of URL"""
+    from googleapiclient.errors import HttpError
+    try:
+        response = service.urlNotifications().getMetadata(url=url).execute()
+        return True, response
+    except HttpError as e:
+        return False, get_error_message(e)
+    except Exception as e:
+        return False, get_exception_message(e)
+
+
+class ConnectionPool:
+    """
+    Up to `size` indexing services, each on its own keep-alive connection.
+
+    httplib2 connections are not thread-safe, so a service is checked out
+    by one thread at a time and returned to the pool afterwards.
+    """
+
+    def __init__(self, size, factory):
+        self.size = size
+        self.factory = factory
+        self.idle = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        service = None
+        try:
+            service = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                create = self.created < self.size
+                if create:
+                    self.created += 1
+            if create:
+                try:
+                    service = self.factory()
+                except Exception:
+                    with self.lock:
+                        self.created -= 1
+                    raise
+            else:
+                service = self.idle.get()
+        try:
+            yield service
+        finally:
+            self.idle.put(service)
+
+
+class Metrics:
+    """Thread-safe call counters and latencies per operation"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.operations = {}
+
+    def record(self, operation, success, result, seconds):
+        with self.lock:
+            op = self.operations.setdefault(operation, {
+                'calls': 0, 'ok': 0, 'failed': 0, 'errors': {}, 'latencies': [],
+            })
+            op['calls'] += 1
+            op['latencies'].append(seconds)
+            if success:
+                op['ok'] += 1
+            else:
+                op['failed'] += 1
+                kind = classify_error(result)
+                op['errors'][kind] = op['errors'].get(kind, 0) + 1
+
+    def summary(self):
+        """{operation: counts plus avg/p50/p95/max latency in ms}"""
+        summary = {}
+        with self.lock:
+            for name, op in self.operations.items():
+                latencies = sorted(op['latencies'])
+                pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+                summary[name] = {
+                    'calls': op['calls'],
+                    'ok': op['ok'],
+                    'failed': op['failed'],
+                    'errors': dict(op['errors']),
+                    'avg_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+                    'p50_ms': pick(0.50) if latencies else 0.0,
+                    'p95_ms': pick(0.95) if latencies else 0.0,
+                    'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+                }
+        return summary
+
+
+def print_metrics(metrics):
+    """Print per-operation API metrics"""
+    for name, op in metrics.summary().items():
+        errors = ', '.join(f"{kind}: {count}" for kind, count in sorted(op['errors'].items()))
+        print(f"📈 {name}: {op['calls']} calls ({op['ok']} ok, {op['failed']} failed) | "
+              f"avg {op['avg_ms']:.0f}ms, p50 {op['p50_ms']:.0f}ms, p95 {op['p95_ms']:.0f}ms, "
+              f"max {op['max_ms']:.0f}ms" + (f" | {errors}" if errors else ''))
+
+
+class IndexingClient:
+    """
+    Authenticated, pooled, rate-limited Indexing API client.
+
+    publish(), publish_batch() and get_metadata() are single calls on a
+    pooled connection. submit() runs a whole list of URLs through the
+    submission engine (token bucket, retries, checkpoint and, with a
+    ledger, skip window and shared daily quota).
+    """
+
+    def __init__(self, service_account_file=SERVICE_ACCOUNT_FILE, pool_size=MAX_WORKERS, ledger=None,
+                 metrics=None):
+        self.service_account_file = service_account_file
+        self.ledger = ledger
+        self.metrics = metrics or Metrics()
+        self.pool = ConnectionPool(
+            pool_size, lambda: build_service(get_credentials(service_account_file))
+        )
+
+    def connect(self):
+        """Authenticate and open the first connection; raises on failure"""
+        with self.pool.connection():
+            pass
+
+    def _timed(self, operation, call):
+        started = time.perf_counter()
+        with self.pool.connection() as service:
+            success, result = call(service)
+        self.metrics.record(operation, success, result, time.perf_counter() - started)
+        return success, result
+
+    def publish(self, url, notification_type='URL_UPDATED'):
+        """Send one URL notification -> (success, result)"""
+        return self._timed(
+            'publish', lambda service: submit_url_for_indexing(service, url, notification_type)
+        )
+
+    def publish_batch(self, urls, notification_type='URL_UPDATED'):
+        """Send up to BATCH_SIZE notifications in one round trip -> {url: (success, result)}"""
+        started = time.perf_counter()
+        with self.pool.connection() as service:
+            outcomes = submit_urls_batch(service, urls, notification_type)
+        elapsed = time.perf_counter() - started
+        self.metrics.record('batch', bool(outcomes), 'No responses in batch', elapsed)
+        for success, result in outcomes.values():
+            self.metrics.record('publish', success, result, elapsed / max(1, len(urls)))
+        return outcomes
+
+    def get_metadata(self, url):
+        """getMetadata for one URL -> (success, result)"""
+        return self._timed('get_metadata', lambda service: get_url_status(service, url))
+
+    def submit(self, urls, notification_type='URL_UPDATED', batch=False, on_result=None,
+               window_hours=None, checkpoint_file=CHECKPOINT_FILE, **options):
+        """Submit many URLs concurrently; returns submission_engine stats"""
+        batch_fn = None
+        if batch:
+            batch_fn = lambda client, chunk: client.publish_batch(chunk, notification_type)
+        return submit_urls(
+            urls,
+            lambda: self,
+            lambda client, url: client.publish(url, notification_type),
+            max_workers=self.pool.size,
+            on_result=on_result,
+            batch_fn=batch_fn,
+            ledger=self.ledger,
+            notification_type=notification_type,
+            window_hours=window_hours,
+            checkpoint_file=checkpoint_file,
+            **options
+        )
+
+
+class AccountPool:
+    """
+    Several service accounts used as one client.
+
+    Each account belongs to its own Google Cloud project, so each has its
+    own daily publish quota, counted separately in the ledger. submit()
+    gives every account a shard of the URLs as large as its remaining
+    quota; URLs an account could not send (Google reported its quota
+    exhausted, or its credentials were rejected) fail over to the next
+    account. Accounts are drained one after another and each account's
+    shard runs concurrently on its own connection pool.
+    """
+
+    def __init__(self, service_account_files=None, pool_size=MAX_WORKERS, ledger=None,
+                 per_day=REQUESTS_PER_DAY):
+        self.ledger = ledger
+        self.per_day = per_day
+        self.metrics = Metrics()
+        self.clients = {}
+        for service_account_file in service_account_files or find_service_account_files():
+            name = get_account_name(service_account_file)
+            self.clients[name] = IndexingClient(
+                service_account_file, pool_size,
+                ledger.account(name) if ledger is not None else None,
+                self.metrics,
+            )
+        self.sent = dict.fromkeys(self.clients, 0)
+        self.errors = {}
+
+    def connect(self):
+        """
+        Authenticate every account. Accounts that fail are left out of the
+        pool (see .errors); raises the first error if none connect.
+        """
+        first_error = None
+        for name, client in list(self.clients.items()):
+            try:
+                client.connect()
+            except Exception as e:
+                self.errors[name] = e
+                first_error = first_error or e
+                del self.clients[name]
+        if not self.clients:
+            raise first_error
+
+    def remaining(self, name):
+        """Publishes the account can still make today"""
+        if self.ledger is not None:
+            return self.ledger.quota_remaining(self.per_day, account=name)
+        return max(0, self.per_day - self.sent[name])
+
+    def usage(self):
+        """{account: {'sent', 'used', 'limit'}} - sent this run, used today"""
+        return {
+            name: {
+                'sent': self.sent[name],
+                'used': self.per_day - self.remaining(name),
+                'limit': self.per_day,
+            }
+            for name in self.clients
+        }
+
+    def submit(self, urls, notification_type='URL_UPDATED', batch=False, on_result=None,
+               window_hours=None, checkpoint_file=CHECKPOINT_FILE, **options):
+        """
+        Shard URLs across the accounts; returns submission_engine stats
+        for the whole run plus per-account usage under 'accounts'.
+        """
+        checkpoint = Checkpoint(checkpoint_file, urls, notification_type)
+        resumed = [url for url in urls if url in checkpoint.done]
+        urls = [url for url in urls if url not in checkpoint.done]
+
+        skipped = []
+        if self.ledger is not None:
+            if window_hours is None:
+                urls, skipped = self.ledger.filter_recent(urls, notification_type=notification_type)
+            else:
+                urls, skipped = self.ledger.filter_recent(urls, window_hours, notification_type)
+
+        done = 0
+
+        def report(index, total, url, success, result):
+            nonlocal done
+            done += 1
+            if success or classify_error(result) != TRANSIENT:
+                checkpoint.mark_done(url)
+            if on_result:
+                on_result(done, len(urls), url, success, result)
+
+        pending = list(urls)
+        runs = []
+        started = time.monotonic()
+        try:
+            for name, client in self.clients.items():
+                if not pending:
+                    break
+                shard_size = self.remaining(name)
+                if shard_size <= 0:
+                    continue
+                shard, pending = pending[:shard_size], pending[shard_size:]
+                # Skip window and checkpoint are handled here, for the whole run
+                stats = client.submit(shard, notification_type, batch, report, window_hours=0,
+                                      checkpoint_file=None, per_day=self.per_day, **options)
+                self.sent[name] += stats['success'] + stats['failed']
+                # Whatever this account could not send goes to the next one
+                pending = stats['deferred'] + pending
+                runs.append(stats)
+        except KeyboardInterrupt:
+            if checkpoint_file:
+                print(f"\n💾 Progress saved to {checkpoint_file} - rerun the same command to resume")
+            raise
+        finally:
+            checkpoint.save()
+
+        error_classes = {}
+        for stats in runs:
+            for kind, count in stats['error_classes'].items():
+                error_classes[kind] = error_classes.get(kind, 0) + count
+        if not pending and error_classes.get(TRANSIENT, 0) == 0:
+            checkpoint.clear()
+
+        results = [row for stats in runs for row in stats['results']]
+        success_count = sum(stats['success'] for stats in runs)
+        failed_count = sum(stats['failed'] for stats in runs)
+        elapsed = time.monotonic() - started
+        stop_reason = None
+        if pending:
+            last_reason = runs[-1]['stop_reason'] if runs else None
+            stop_reason = last_reason or 'Daily quota exhausted on every account'
+
+        return {
+            'results': results,
+            'total': len(urls),
+            'success': success_count,
+            'failed': failed_count,
+            'failed_urls': [(url, result) for url, success, result in results if not success],
+            'deferred': pending,
+            'skipped': skipped,
+            'resumed': resumed,
+            'error_classes': error_classes,
+            'retries': sum(stats['retries'] for stats in runs),
+            'stop_reason': stop_reason,
+            'elapsed': elapsed,
+            'rate': (success_count + failed_count) / elapsed if elapsed > 0 else 0.0,
+            'http_requests': sum(stats['http_requests'] for stats in runs),
+            'peak_in_flight': max((stats['peak_in_flight'] for stats in runs), default=0),
+            'accounts': self.usage(),
+        }
+
+
+def print_account_usage(stats):
+    """Print per-account quota usage for an AccountPool run"""
+    for name, usage in stats.get('accounts', {}).items():
+        print(f"👤 {name}: {usage['sent']} sent this run, "
+              f"{usage['used']}/{usage['limit']} of today's quota used")
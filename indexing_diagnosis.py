@@ -4,8 +4,8 @@ Google Indexing Diagnosis Tool
 Comprehensive check for why URLs are not getting indexed
 
 This script checks for common indexing issues:
-1. Robots.txt blocking
-2. Meta robots noindex tags
+1. Robots.txt blocking (checked for every URL)
+2. Meta robots noindex tags and X-Robots-Tag headers (from the last seo_audit.py report)
 3. Sitemap accessibility
 4. Page response codes
 5. Content quality issues
@@ -14,17 +14,14 @@ This script checks for common indexing issues:
 
 import json
 import os
+import indexability
+import link_graph
+import sitemap_discovery
 from urllib.parse import urljoin, urlparse
 
 def load_urls(filename='sitemap-urls.txt'):
-    """Load URLs from text file"""
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            urls = [line.strip() for line in f if line.strip()]
-        return urls
-    except FileNotFoundError:
-        print(f"❌ Error: {filename} not found!")
-        return []
+    """Load URLs from robots.txt / sitemap discovery, falling back to a text file"""
+    return sitemap_discovery.load_urls(filename)
 
 def check_indexing_setup():
     """Check basic indexing setup"""
@@ -71,6 +68,37 @@ def check_indexing_setup():
     
     print()
     
+    # robots.txt checked against every URL; noindex from the last audit report
+    robots_blocked = [
+        (url, reason) for url, indexable, reason in indexability.classify(urls, indexability.RobotsCache())
+        if not indexable
+    ]
+    robots_measured = f"Checked {len(urls)} URLs: {len(robots_blocked)} blocked by robots.txt"
+    for url, reason in robots_blocked[:5]:
+        robots_measured += f"\n      {url} - {reason}"
+    from audit_report import REPORT_FILE, read_report
+    if os.path.exists(REPORT_FILE):
+        noindex_urls = [result['url'] for result in read_report(REPORT_FILE)
+                        if indexability.noindex_from_issues(result['issues'])]
+        noindex_measured = f"Last audit ({REPORT_FILE}): {len(noindex_urls)} pages with noindex"
+        for url in noindex_urls[:5]:
+            noindex_measured += f"\n      {url}"
+    else:
+        noindex_measured = "Not measured yet - run: python seo_audit.py"
+    
+    # Internal linking as measured by `python seo_audit.py --links`
+    link_rows = link_graph.load_rows()
+    if link_rows:
+        links_summary = link_graph.summarize(link_rows)
+        links_measured = (
+            f"Measured: {len(links_summary['orphans'])} orphan pages, "
+            f"{len(links_summary['deep'])} deeper than {link_graph.DEEP_CLICK_DEPTH} clicks, "
+            f"{len(links_summary['weak'])} with {link_graph.WEAK_INLINKS} inlink or fewer "
+            f"(see {link_graph.LINK_GRAPH_FILE})"
+        )
+    else:
+        links_measured = "Not measured yet - run: python seo_audit.py --links"
+    
     # Common indexing issues
     print("🔍 COMMON INDEXING ISSUES TO CHECK:")
     print("-" * 80)
@@ -112,6 +140,7 @@ def check_indexing_setup():
             "issue": "Robots.txt Blocking Crawlers",
             "severity": "🟡 HIGH",
             "description": "Your robots.txt might be blocking Google from crawling pages",
+            "measured": robots_measured,
             "solution": """
             Check your robots.txt file:
             1. Visit: https://www.prourlmonitor.com/robots.txt
@@ -126,6 +155,7 @@ def check_indexing_setup():
             "issue": "Meta Robots Noindex Tags",
             "severity": "🟡 HIGH",  
             "description": "Pages might have <meta name='robots' content='noindex'> tags",
+            "measured": noindex_measured,
             "solution": """
             Check your page source code:
             1. View page source
@@ -160,11 +190,13 @@ def check_indexing_setup():
             "issue": "Missing Internal Links",
             "severity": "🟠 MEDIUM",
             "description": "Pages need internal links from other pages",
+            "measured": links_measured,
             "solution": """
             1. Link to new pages from homepage
             2. Add 'Related Tools' section on each page
             3. Create navigation menu with all important pages
             4. Add breadcrumbs
+            5. Fix orphan pages first (no path from the homepage at all)
             """
         },
         {
@@ -175,6 +207,8 @@ def check_indexing_setup():
             1. Check if you've exceeded 200 requests/day
             2. Wait 24 hours and retry
             3. Submit in batches of 50-100 URLs per day
+            4. Or add more service accounts (one per Google Cloud project)
+               to service-accounts/ - indexing_api.py shares URLs across them
             """
         },
         {
@@ -193,6 +227,8 @@ def check_indexing_setup():
     for i, issue_data in enumerate(issues, 1):
         print(f"\n{i}. {issue_data['severity']} {issue_data['issue']}")
         print(f"   {issue_data['description']}")
+        if issue_data.get('measured'):
+            print(f"   📏 {issue_data['measured']}")
         
         solution = issue_data['solution']
         if '{email}' in solution:
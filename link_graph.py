@@ -0,0 +1,325 @@
+"""
+Internal Link Graph
+===================
+Measures how well pages are linked internally: the "Missing Internal
+Links" cause in indexing_diagnosis.py.
+
+`python seo_audit.py --links` extracts every followable <a href> while
+parsing and crawls the site breadth-first from the homepage in a single
+run of the usual crawl engine: each page's new links join the running
+crawl as soon as the page is parsed. The frontier is deduplicated with a
+set of 64-bit URL hashes (a Bloom filter once a site is expected to
+exceed BLOOM_THRESHOLD URLs). Sitemap pages the crawl
+never reaches are audited afterwards; they are the orphans.
+
+Pages are keyed by the URL they end up at: a URL that redirects (a
+sitemap URL with a trailing slash, an old path) is an alias of its final
+page, so its links and inlinks count for that page.
+
+From the adjacency lists the graph gives, per page:
+  - inlinks: how many other pages link to it
+  - click depth: fewest clicks from the homepage (none if unreachable)
+  - orphans: sitemap pages with no path from the homepage
+
+Results are written to link-graph.csv.
+
+Usage:
+    python seo_audit.py --links
+"""
+
+import csv
+import hashlib
+import math
+import os
+from array import array
+from collections import deque
+from urllib.parse import urldefrag, urljoin, urlsplit, urlunsplit
+
+LINK_GRAPH_FILE = 'link-graph.csv'
+
+# Pages fetched outside the sitemap, at most
+LINK_CRAWL_LIMIT = int(os.environ.get('LINK_CRAWL_LIMIT', '5000'))
+
+# Past this many expected URLs the frontier uses a Bloom filter
+BLOOM_THRESHOLD = 1_000_000
+BLOOM_ERROR_RATE = 0.001
+
+# More clicks than this from the homepage is too deep
+DEEP_CLICK_DEPTH = 3
+# Pages with this many inlinks or fewer are weakly linked
+WEAK_INLINKS = 1
+
+# Links to files that are not pages
+SKIP_EXTENSIONS = (
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico', '.css', '.js', '.json', '.xml',
+    '.txt', '.zip', '.mp4', '.mp3', '.woff', '.woff2',
+)
+
+
+def normalize_url(url):
+    """URL without fragment, with lower-case scheme and host and a path"""
+    parts = urlsplit(urldefrag(url)[0])
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', parts.query, ''))
+
+
+def internal_links(page_url, hrefs):
+    """Normalized same-host page URLs an <a href> list points to (no self-links)"""
+    page = normalize_url(page_url)
+    host = urlsplit(page).netloc
+    links = {}
+    for href in hrefs:
+        url = normalize_url(urljoin(page_url, href.strip()))
+        parts = urlsplit(url)
+        if (parts.scheme in ('http', 'https') and parts.netloc == host and url != page
+                and not parts.path.lower().endswith(SKIP_EXTENSIONS)):
+            links[url] = None
+    return list(links)
+
+
+def url_hash(url):
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class SeenSet:
+    """URLs already queued, kept as 64-bit hashes"""
+
+    def __init__(self):
+        self.hashes = set()
+
+    def add(self, url):
+        """Remember url; True if it was new"""
+        key = url_hash(url)
+        if key in self.hashes:
+            return False
+        self.hashes.add(key)
+        return True
+
+    def __contains__(self, url):
+        return url_hash(url) in self.hashes
+
+
+class BloomFilter:
+    """
+    Fixed-size seen-set for very large sites.
+
+    Never forgets a URL, but may wrongly claim to have seen one with
+    probability error_rate; such a page is simply not crawled.
+    """
+
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, url):
+        digest = hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, url):
+        """Remember url; True if it was new"""
+        new = False
+        for position in self.positions(url):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                new = True
+        return new
+
+    def __contains__(self, url):
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self.positions(url))
+
+
+def seen_set(expected):
+    """Hash set, or a Bloom filter when expected URLs pass BLOOM_THRESHOLD"""
+    return BloomFilter(expected) if expected > BLOOM_THRESHOLD else SeenSet()
+
+
+class LinkGraph:
+    """Pages as integer ids with an array of outlink ids per crawled page"""
+
+    def __init__(self):
+        self.ids = {}
+        self.urls = []
+        self.links = []
+        # Redirecting URL -> URL it ends up at
+        self.aliases = {}
+
+    def node(self, url):
+        node = self.ids.get(url)
+        if node is None:
+            node = self.ids[url] = len(self.urls)
+            self.urls.append(url)
+            self.links.append(None)
+        return node
+
+    def resolve(self, url):
+        """URL a page ends up at after its redirects"""
+        seen = set()
+        while url in self.aliases and url not in seen:
+            seen.add(url)
+            url = self.aliases[url]
+        return url
+
+    def add_page(self, url, links, final_url=None):
+        """Outlinks of a page fetched as url that ended up at final_url (after redirects)"""
+        if final_url and final_url != url:
+            self.aliases[url] = final_url
+            url = final_url
+        source = self.node(url)
+        self.links[source] = array('I', {self.node(link) for link in links} - {source})
+
+    def crawled(self, url):
+        node = self.ids.get(self.resolve(url))
+        return node is not None and self.links[node] is not None
+
+    def outlinks(self, url):
+        node = self.ids.get(self.resolve(url))
+        return [self.urls[target] for target in self.links[node] or ()] if node is not None else []
+
+    def resolved_ids(self):
+        """Node id each node stands for: its own, or its final page's for an alias"""
+        resolved = array('I', range(len(self.urls)))
+        for url, final_url in self.aliases.items():
+            node = self.ids.get(url)
+            if node is not None:
+                resolved[node] = self.ids.get(self.resolve(final_url), node)
+        return resolved
+
+    def inlink_counts(self, resolved=None):
+        resolved = resolved if resolved is not None else self.resolved_ids()
+        counts = array('I', [0]) * len(self.urls)
+        for source, targets in enumerate(self.links):
+            # A page linking to its own redirecting alias does not count
+            for target in {resolved[target] for target in targets or ()} - {source}:
+                counts[target] += 1
+        return counts
+
+    def click_depths(self, start_url, resolved=None):
+        """Fewest clicks from start_url per node (-1: unreachable; aliases count as their final page)"""
+        resolved = resolved if resolved is not None else self.resolved_ids()
+        depths = array('i', [-1]) * len(self.urls)
+        start = self.ids.get(self.resolve(start_url))
+        if start is None:
+            return depths
+        depths[start] = 0
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for target in self.links[node] or ():
+                target = resolved[target]
+                if depths[target] < 0:
+                    depths[target] = depths[node] + 1
+                    queue.append(target)
+        return depths
+
+    def rows(self, sitemap_urls, start_url):
+        """
+        [(url, in_sitemap, click_depth or None, inlinks, outlinks)] for
+        crawled and sitemap pages, by final URL: a redirecting sitemap URL
+        puts its final page in the sitemap and gets no row of its own.
+        """
+        sitemap = {self.resolve(normalize_url(url)) for url in sitemap_urls}
+        for url in sitemap:
+            self.node(url)
+        resolved = self.resolved_ids()
+        inlinks = self.inlink_counts(resolved)
+        depths = self.click_depths(normalize_url(start_url), resolved)
+        return [
+            (url, url in sitemap, depths[node] if depths[node] >= 0 else None, inlinks[node],
+             len(self.links[node] or ()))
+            for node, url in enumerate(self.urls)
+            if url not in self.aliases and (url in sitemap or self.links[node] is not None)
+        ]
+
+
+def summarize(rows):
+    """Orphan, deep, weakly linked and off-sitemap pages from LinkGraph.rows()"""
+    return {
+        'pages': len(rows),
+        'reachable': sum(1 for url, in_sitemap, depth, inlinks, outlinks in rows if depth is not None),
+        'orphans': [url for url, in_sitemap, depth, inlinks, outlinks in rows if in_sitemap and depth is None],
+        'deep': [url for url, in_sitemap, depth, inlinks, outlinks in rows
+                 if depth is not None and depth > DEEP_CLICK_DEPTH],
+        'weak': [url for url, in_sitemap, depth, inlinks, outlinks in rows
+                 if in_sitemap and inlinks <= WEAK_INLINKS],
+        'not_in_sitemap': [url for url, in_sitemap, depth, inlinks, outlinks in rows if not in_sitemap],
+    }
+
+
+def write_rows(rows, path=LINK_GRAPH_FILE):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['URL', 'In Sitemap', 'Click Depth', 'Inlinks', 'Outlinks'])
+        # Shallowest first, unreachable pages last
+        for url, in_sitemap, depth, inlinks, outlinks in sorted(
+                rows, key=lambda row: (row[2] is None, row[2] or 0, row[0])):
+            writer.writerow([url, 'yes' if in_sitemap else 'no', '' if depth is None else depth, inlinks, outlinks])
+
+
+def load_rows(path=LINK_GRAPH_FILE):
+    """Rows saved by write_rows, or [] if the file does not exist"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        return [
+            (row['URL'], row['In Sitemap'] == 'yes', int(row['Click Depth']) if row['Click Depth'] else None,
+             int(row['Inlinks']), int(row['Outlinks']))
+            for row in csv.DictReader(f)
+        ]
+
+
+def crawl_site(start_url, sitemap_urls, on_result=None, cache=None, stats=None, limit=LINK_CRAWL_LIMIT):
+    """
+    Audit the site breadth-first from start_url, then any sitemap pages
+    the crawl did not reach. Returns the LinkGraph.
+
+    Everything runs in one crawl: links found on a page are fetched as
+    soon as it is parsed, in the order they were found, instead of one
+    click level at a time. Click depths come from the finished graph.
+
+    Sitemap pages are fetched under their sitemap URL; on_result(index,
+    total, result) is called for every page, in or outside the sitemap.
+    """
+    from crawl_engine import crawl_pages
+
+    sitemap = {normalize_url(url): url for url in sitemap_urls}
+    graph = LinkGraph()
+    seen = seen_set(2 * len(sitemap) + limit)
+    orphans_queued = False
+    extra = 0
+
+    def collect(index, total, result):
+        redirects = result.get('redirects')
+        final_url = normalize_url(redirects[-1]) if redirects else None
+        graph.add_page(normalize_url(result['url']), result.get('links', ()), final_url)
+        if final_url:
+            # Links to the final page need no second fetch
+            seen.add(final_url)
+        if on_result:
+            on_result(index, max(len(sitemap), total), result)
+
+    def expand(result):
+        """Unseen links of a finished page; at the end, the orphans"""
+        nonlocal extra, orphans_queued
+        if result is None:
+            if orphans_queued:
+                return []
+            # Orphans still get their audit
+            orphans_queued = True
+            return [sitemap[url] for url in sitemap if not graph.crawled(url)]
+        new = []
+        for link in graph.outlinks(normalize_url(result['url'])):
+            if link not in sitemap and extra >= limit:
+                continue
+            if seen.add(link):
+                new.append(sitemap.get(link, link))
+                extra += link not in sitemap
+        return new
+
+    start = normalize_url(start_url)
+    seen.add(start)
+    crawl_pages([sitemap.get(start, start)], on_result=collect, cache=cache, stats=stats, collect=False,
+                links=True, expand=expand)
+    return graph
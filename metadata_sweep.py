@@ -0,0 +1,136 @@
+"""
+Indexing API Metadata Sweep
+===========================
+Calls urlNotifications().getMetadata for many URLs at once.
+
+Requests run on a small thread pool and are paced below the getMetadata
+limit (180 requests per minute). Answers are cached per URL in the
+submission ledger database for METADATA_CACHE_TTL_HOURS, so repeated
+sweeps only ask Google about URLs whose cached entry expired.
+
+A 404 from getMetadata means Google never received a notification for
+that URL.
+
+Usage:
+    from metadata_sweep import sweep_metadata
+
+    rows = sweep_metadata(urls)
+"""
+
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from indexing_client import IndexingClient
+from submission_engine import TokenBucket
+from submission_ledger import LEDGER_FILE
+
+# getMetadata quota: 180 requests per minute
+METADATA_REQUESTS_PER_MINUTE = 180
+METADATA_WORKERS = 8
+METADATA_CACHE_TTL_HOURS = float(os.environ.get('METADATA_CACHE_TTL_HOURS', '6'))
+
+# Row status values
+SUBMITTED = 'SUBMITTED'
+NEVER_RECEIVED = 'NEVER RECEIVED'
+ERROR = 'ERROR'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata_cache (
+    url TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    latest_update TEXT,
+    latest_remove TEXT,
+    error TEXT
+);
+"""
+
+
+class MetadataCache:
+    """getMetadata answers per URL with a TTL"""
+
+    def __init__(self, path=LEDGER_FILE, ttl_hours=METADATA_CACHE_TTL_HOURS):
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript(SCHEMA)
+        self.ttl = ttl_hours * 3600
+
+    def get_fresh(self, urls):
+        """{url: row} for cached entries younger than the TTL"""
+        cutoff = time.time() - self.ttl
+        fresh = {}
+        for row in self.conn.execute(
+            'SELECT url, fetched_at, status, latest_update, latest_remove, error '
+            'FROM metadata_cache WHERE fetched_at >= ?', (cutoff,)
+        ):
+            fresh[row[0]] = dict(zip(
+                ('url', 'fetched_at', 'status', 'latest_update', 'latest_remove', 'error'), row
+            ))
+        wanted = set(urls)
+        return {url: row for url, row in fresh.items() if url in wanted}
+
+    def save(self, rows):
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO metadata_cache '
+            '(url, fetched_at, status, latest_update, latest_remove, error) '
+            'VALUES (:url, :fetched_at, :status, :latest_update, :latest_remove, :error)',
+            rows,
+        )
+        self.conn.commit()
+
+
+def parse_metadata(url, success, result):
+    """Turn a get_url_status outcome into a compact row"""
+    row = {
+        'url': url,
+        'fetched_at': time.time(),
+        'status': SUBMITTED,
+        'latest_update': None,
+        'latest_remove': None,
+        'error': None,
+    }
+    if success:
+        row['latest_update'] = (result.get('latestUpdate') or {}).get('notifyTime')
+        row['latest_remove'] = (result.get('latestRemove') or {}).get('notifyTime')
+    elif getattr(result, 'code', None) == 404:
+        row['status'] = NEVER_RECEIVED
+    else:
+        row['status'] = ERROR
+        row['error'] = str(result)
+    return row
+
+
+def sweep_metadata(urls, workers=METADATA_WORKERS, use_cache=True, on_row=None, client=None):
+    """
+    getMetadata for every URL, reusing cached answers within the TTL.
+
+    Returns rows in the same order as urls. on_row(row, cached) is called
+    for each row as it becomes available.
+    """
+    client = client or IndexingClient(pool_size=workers)
+    cache = MetadataCache()
+    cached = cache.get_fresh(urls) if use_cache else {}
+    for url in urls:
+        if url in cached and on_row:
+            on_row(cached[url], True)
+
+    to_fetch = [url for url in dict.fromkeys(urls) if url not in cached]
+    bucket = TokenBucket(per_minute=METADATA_REQUESTS_PER_MINUTE, per_day=None)
+
+    def fetch(url):
+        bucket.acquire()
+        success, result = client.get_metadata(url)
+        return parse_metadata(url, success, result)
+
+    fetched = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for row in executor.map(fetch, to_fetch):
+            fetched[row['url']] = row
+            if on_row:
+                on_row(row, False)
+
+    # Errors are not cached so the next sweep asks again
+    cache.save([row for row in fetched.values() if row['status'] != ERROR])
+    rows = {**cached, **fetched}
+    return [rows[url] for url in urls if url in rows]
@@ -0,0 +1,243 @@
+"""
+Near-Duplicate Content Detection
+================================
+Finds pages whose main text is nearly the same ("Duplicate content
+detected" is one reason URLs drop out of the index), without comparing
+every pair of pages.
+
+Each audited page gets a MinHash signature of its 5-word shingles. It is
+computed in the parse stage, in the same pass over the text as the other
+content metrics (MinHash is a text_metrics accumulator), with
+one-permutation hashing: every shingle is hashed into one of
+SIGNATURE_SIZE bins, and empty bins borrow from their next filled
+neighbour. The fraction of equal bins between two
+signatures estimates the Jaccard similarity of the pages' shingle sets.
+
+Signatures are cut into LSH_BANDS bands. Pages that share a whole band
+land in the same bucket and become candidates; only candidates are
+compared, and near-duplicates are joined into clusters with union-find.
+Each page is compared with at most the BUCKET_PEERS pages that entered
+its bucket just before it (bucket order is the order the pages were
+audited), so a band shared by thousands of pages (boilerplate) keeps the
+work linear in the number of pages. Chains of such comparisons still join
+a whole group, but two pages far apart in a large bucket may never be
+compared directly.
+
+Every clustered page is reported with its best match: the highest
+similarity to a page it was compared with and joined to, so always at
+least the threshold. Pages joined through a chain can be less alike than
+that to the rest of their cluster.
+
+seo_audit.py reports the clusters at the end of every audit and writes
+them to near-duplicates.csv.
+
+Usage:
+    python near_duplicates.py                          # from seo-audit-report.jsonl
+    python near_duplicates.py --threshold 0.9
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from array import array
+from collections import deque
+
+from text_metrics import analyze
+
+DUPLICATES_FILE = 'near-duplicates.csv'
+
+SHINGLE_WORDS = 5
+SIGNATURE_SIZE = 64
+# 16 bands of 4 bins: pages ~50% similar or more become candidates
+LSH_BANDS = 16
+# Earlier bucket members each page is compared with
+BUCKET_PEERS = 20
+
+# Estimated Jaccard similarity at which two pages count as near-duplicates
+DUPLICATE_THRESHOLD = 0.8
+
+VALUE_BITS = 58
+EMPTY = (1 << 64) - 1
+
+
+class MinHash:
+    """
+    text_metrics accumulator: the signature of the text's shingles as
+    'minhash', or None for texts shorter than one shingle.
+    """
+
+    def __init__(self):
+        self.window = deque(maxlen=SHINGLE_WORDS)
+        self.bins = [EMPTY] * SIGNATURE_SIZE
+        self.shingles = 0
+
+    def word(self, word):
+        window = self.window
+        window.append(word)
+        if len(window) < SHINGLE_WORDS:
+            return
+        # Repeated shingles hash to the same value, so they need no set
+        self.shingles += 1
+        value = int.from_bytes(hashlib.blake2b(' '.join(window).encode('utf-8'), digest_size=8).digest(), 'big')
+        slot, value = value % SIGNATURE_SIZE, value >> (64 - VALUE_BITS)
+        if value < self.bins[slot]:
+            self.bins[slot] = value
+
+    def sentence_end(self):
+        # Shingles run across sentences
+        pass
+
+    def result(self):
+        if not self.shingles:
+            return {'minhash': None}
+        # Empty bins take the next filled bin's value, tagged with the distance
+        bins = self.bins
+        signature = list(bins)
+        for slot in range(SIGNATURE_SIZE):
+            if bins[slot] != EMPTY:
+                continue
+            for step in range(1, SIGNATURE_SIZE):
+                borrowed = bins[(slot + step) % SIGNATURE_SIZE]
+                if borrowed != EMPTY:
+                    signature[slot] = (step << VALUE_BITS) | borrowed
+                    break
+        return {'minhash': signature}
+
+
+def minhash_signature(text):
+    """SIGNATURE_SIZE bin minimums for the text's shingles, or None for very short texts"""
+    return analyze(text, [MinHash()])['minhash']
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def find_clusters(signatures, threshold=DUPLICATE_THRESHOLD):
+    """
+    Near-duplicate clusters from {url: signature}.
+
+    Returns [[(url, best-match similarity), ...], ...], largest cluster
+    first.
+    """
+    urls = list(signatures)
+    rows = [signatures[url] for url in urls]
+    parent = array('I', range(len(urls)))
+    best = array('d', [0.0]) * len(urls)
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    # Band keys are slices of the packed signature bytes
+    packed = [array('Q', signature).tobytes() for signature in rows]
+    band_bytes = SIGNATURE_SIZE // LSH_BANDS * 8
+    for start in range(0, SIGNATURE_SIZE * 8, band_bytes):
+        buckets = {}
+        for node, key in enumerate(packed):
+            key = key[start:start + band_bytes]
+            if key in buckets:
+                buckets[key].append(node)
+            else:
+                buckets[key] = [node]
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            for position in range(1, len(members)):
+                node = members[position]
+                for peer in members[max(0, position - BUCKET_PEERS):position]:
+                    root, peer_root = find(node), find(peer)
+                    if root == peer_root:
+                        continue
+                    score = similarity(rows[node], rows[peer])
+                    if score >= threshold:
+                        parent[root] = peer_root
+                        best[node] = max(best[node], score)
+                        best[peer] = max(best[peer], score)
+
+    groups = {}
+    for node in range(len(urls)):
+        groups.setdefault(find(node), []).append(node)
+    clusters = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        members.sort(key=lambda node: urls[node])
+        clusters.append([(urls[node], best[node]) for node in members])
+    clusters.sort(key=lambda cluster: (-len(cluster), cluster[0][0]))
+    return clusters
+
+
+def write_clusters(clusters, path=DUPLICATES_FILE):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Cluster', 'Size', 'URL', 'Best Match Similarity'])
+        for number, cluster in enumerate(clusters, 1):
+            for url, score in cluster:
+                writer.writerow([number, len(cluster), url, f"{score:.2f}"])
+
+
+def print_clusters(clusters, limit=10):
+    print(f"📑 Near-duplicate clusters: {len(clusters)} "
+          f"({sum(len(cluster) for cluster in clusters)} pages)")
+    for number, cluster in enumerate(clusters[:limit], 1):
+        print(f"   Cluster {number} ({len(cluster)} pages):")
+        for url, score in cluster[:5]:
+            print(f"      {score:>4.0%}  {url}")
+        if len(cluster) > 5:
+            print(f"      ... and {len(cluster) - 5} more")
+
+
+def load_signatures(path):
+    """{url: signature} from a JSONL report written by seo_audit.py --jsonl"""
+    signatures = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if result.get('minhash'):
+                signatures[result['url']] = array('Q', result['minhash'])
+    return signatures
+
+
+def main():
+    print("=" * 80)
+    print("📑 NEAR-DUPLICATE CONTENT")
+    print("=" * 80)
+    print()
+
+    from audit_report import JSONL_FILE
+
+    path = next((arg for arg in sys.argv[1:] if arg.endswith('.jsonl')), JSONL_FILE)
+    threshold = DUPLICATE_THRESHOLD
+    if '--threshold' in sys.argv:
+        threshold = float(sys.argv[sys.argv.index('--threshold') + 1])
+    if not os.path.exists(path):
+        print(f"❌ {path} not found - run: python seo_audit.py --jsonl")
+        return
+
+    signatures = load_signatures(path)
+    started = time.perf_counter()
+    clusters = find_clusters(signatures, threshold)
+    print(f"🔍 {len(signatures)} pages compared in {time.perf_counter() - started:.2f}s "
+          f"(similarity >= {threshold:.0%})")
+    print()
+    print_clusters(clusters)
+    write_clusters(clusters)
+    print()
+    print(f"💾 Clusters saved to: {DUPLICATES_FILE}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrupted")
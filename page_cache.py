@@ -0,0 +1,109 @@
+"""
+SEO Audit Page Cache
+====================
+Remembers the validators (ETag / Last-Modified) and the audit record of
+every page seo_audit.py checked, in a small SQLite database.
+
+The next audit sends If-None-Match / If-Modified-Since. When the server
+answers 304 Not Modified, the stored record is reused as-is: the page is
+neither downloaded nor parsed again. Records written by an older version
+of the audit rules (AUDIT_VERSION) are ignored.
+
+Usage:
+    from page_cache import PageCache
+
+    cache = PageCache()
+    headers = cache.conditional_headers(url)
+    ...
+    cache.put(url, response.headers, result)   # after a 200
+    result = cache.get(url)                    # after a 304
+    cache.flush()
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+from seo_audit import AUDIT_VERSION
+
+SEO_AUDIT_CACHE = os.environ.get('SEO_AUDIT_CACHE', 'seo-audit-cache.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    version INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    record TEXT NOT NULL
+);
+"""
+
+
+class PageCache:
+    """Validators and audit records per URL, loaded up front, written in bulk"""
+
+    def __init__(self, path=SEO_AUDIT_CACHE, version=AUDIT_VERSION, required=()):
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript(SCHEMA)
+        self.version = version
+        # Records missing any of these keys (e.g. 'links') are fetched again
+        self.required = required
+        self.entries = {
+            url: (etag, last_modified, record)
+            for url, etag, last_modified, record in self.conn.execute(
+                'SELECT url, etag, last_modified, record FROM pages WHERE version = ?', (version,)
+            )
+        }
+        self.pending = []
+
+    def usable(self, url):
+        """(etag, last_modified, record dict) for a cached URL with every required key, else None"""
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        etag, last_modified, record = entry
+        record = json.loads(record)
+        if self.required and not all(key in record for key in self.required):
+            return None
+        return etag, last_modified, record
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since for a cached URL, else {}"""
+        entry = self.usable(url)
+        if entry is None:
+            return {}
+        etag, last_modified, record = entry
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def get(self, url):
+        """Cached audit record for url (after a 304), or None"""
+        entry = self.usable(url)
+        return entry[2] if entry else None
+
+    def put(self, url, headers, record):
+        """Remember a freshly audited page if the server gave validators"""
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if record['status'] != 'success' or not (etag or last_modified):
+            return
+        data = json.dumps(record)
+        self.entries[url] = (etag, last_modified, data)
+        self.pending.append((url, etag, last_modified, self.version, time.time(), data))
+
+    def flush(self):
+        if not self.pending:
+            return
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO pages (url, etag, last_modified, version, fetched_at, record) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            self.pending,
+        )
+        self.conn.commit()
+        self.pending = []
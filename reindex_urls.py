@@ -4,53 +4,12 @@ Re-Index Missing URLs
 This script will re-submit all URLs to Google Indexing API
 """
 
-import json
-import time
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-
-SERVICE_ACCOUNT_FILE = 'service-account.json'
-SCOPES = ['https://www.googleapis.com/auth/indexing']
-
-def load_urls(filename='sitemap-urls.txt'):
-    """Load URLs from text file"""
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            urls = [line.strip() for line in f if line.strip()]
-        return urls
-    except FileNotFoundError:
-        print(f"❌ Error: {filename} not found!")
-        return []
-
-def get_indexing_service():
-    """Create authenticated indexing service"""
-    try:
-        credentials = service_account.Credentials.from_service_account_file(
-            SERVICE_ACCOUNT_FILE, 
-            scopes=SCOPES
-        )
-        service = build('indexing', 'v3', credentials=credentials)
-        return service
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        return None
-
-def submit_url(service, url):
-    """Submit URL for indexing"""
-    try:
-        body = {
-            'url': url,
-            'type': 'URL_UPDATED'
-        }
-        response = service.urlNotifications().publish(body=body).execute()
-        return True, response
-    except HttpError as e:
-        error_details = json.loads(e.content.decode('utf-8'))
-        error_message = error_details.get('error', {}).get('message', str(e))
-        return False, error_message
-    except Exception as e:
-        return False, str(e)
+import sys
+from indexing_client import AccountPool, load_urls, print_account_usage, print_metrics
+from submission_engine import print_throughput
+from submission_ledger import SubmissionLedger
+from submission_scheduler import prioritize
+from url_resolver import submission_urls
 
 def main():
     print("=" * 80)
@@ -71,12 +30,23 @@ def main():
     if not urls:
         return
     
-    print(f"✅ Loaded {len(urls)} URLs from sitemap-urls.txt")
+    print(f"✅ Loaded {len(urls)} URLs from the sitemaps")
     print()
     
-    # Get service
-    service = get_indexing_service()
-    if not service:
+    # Final canonical URLs only (--no-resolve submits the sitemap URLs as listed)
+    if '--no-resolve' not in sys.argv:
+        urls = submission_urls(urls)
+    
+    # Highest-value URLs first, so the daily quota goes to them
+    ledger = SubmissionLedger()
+    urls = prioritize(urls, ledger)
+    
+    # Connect
+    client = AccountPool(ledger=ledger)
+    try:
+        client.connect()
+    except Exception as e:
+        print(f"❌ Error: {e}")
         return
     
     print("✅ Connected to Google Indexing API")
@@ -84,28 +54,22 @@ def main():
     print("📤 Starting submission process...")
     print("-" * 80)
     
-    success_count = 0
-    failed_count = 0
-    failed_urls = []
-    
-    for index, url in enumerate(urls, 1):
+    def report(index, total, url, success, result):
         # Progress indicator
-        percentage = (index / len(urls)) * 100
-        print(f"\n[{index}/{len(urls)}] ({percentage:.1f}%) {url}")
-        
-        success, result = submit_url(service, url)
-        
+        percentage = (index / total) * 100
         if success:
-            success_count += 1
-            print(f"   ✅ Submitted successfully")
+            print(f"[{index}/{total}] ({percentage:.1f}%) ✅ {url}")
         else:
-            failed_count += 1
-            failed_urls.append((url, result))
-            print(f"   ❌ Failed: {result}")
-        
-        # Rate limiting (0.5 seconds between requests)
-        if index < len(urls):
-            time.sleep(0.5)
+            print(f"[{index}/{total}] ({percentage:.1f}%) ❌ {url} - {result}")
+    
+    # --batch sends up to 100 URLs per HTTP request
+    # Ledger skips URLs notified recently (--force resubmits them anyway)
+    window_hours = 0 if '--force' in sys.argv else None
+    stats = client.submit(urls, batch='--batch' in sys.argv, on_result=report,
+                          window_hours=window_hours)
+    success_count = stats['success']
+    failed_count = stats['failed']
+    failed_urls = stats['failed_urls']
     
     # Summary
     print()
@@ -116,6 +80,9 @@ def main():
     print(f"Total URLs processed: {len(urls)}")
     print(f"✅ Successfully submitted: {success_count}")
     print(f"❌ Failed: {failed_count}")
+    print_throughput(stats)
+    print_account_usage(stats)
+    print_metrics(client.metrics)
     print()
     
     if failed_urls:
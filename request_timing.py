@@ -0,0 +1,287 @@
+"""
+Request Timing
+==============
+Where the time of every audit fetch goes, and which routes are slow.
+
+Each fetch records, in milliseconds:
+  dns       - host name lookup
+  connect   - TCP connection
+  tls       - TLS handshake
+  ttfb      - request start to the first response byte (includes the
+              three above and any redirects, like curl's starttransfer,
+              but not time spent waiting for a free pooled connection)
+  download  - first byte to the end of the body
+and the body size in bytes. dns / connect / tls are empty when a pooled
+keep-alive connection was reused.
+
+Not every client can tell every phase apart:
+  aiohttp   dns, connect, ttfb, download; aiohttp has no TLS events, so
+            connect is TCP plus the TLS handshake and tls stays empty
+  httpx     connect, tls, ttfb, download; httpx has no DNS events, so
+            connect includes the lookup and dns stays empty
+  requests  ttfb and download only
+
+Timings are added to the audit report as columns and aggregated per URL
+pattern (category/*, tools/*, blog/*, ...) into HDR-style histograms:
+fixed arrays of log-linear buckets that keep every value within ~1.6%,
+so p50 / p95 / p99 need no stored samples, however many pages there are.
+
+Usage:
+    stats = TimingStats()
+    stats.add(result['url'], result['timing'])
+    stats.print_summary()
+"""
+
+import math
+import re
+import time
+from array import array
+
+# Phases in report order; bytes is stored alongside them
+PHASES = ('dns', 'connect', 'tls', 'ttfb', 'download')
+# Phases shown in the summary, with their column labels
+SUMMARY_PHASES = (('ttfb', 'TTFB'), ('download', 'Download'))
+PERCENTILES = (50, 95, 99)
+
+# Longest duration a histogram tells apart; slower fetches count as this
+HISTOGRAM_MAX_SECONDS = 3600
+
+# First matching route wins; other URLs are grouped by first path segment
+URL_PATTERNS = (
+    ('category/*', re.compile(r'/category/')),
+    ('tools/*', re.compile(r'^/tools/')),
+    ('blog/*', re.compile(r'^/blog/')),
+)
+URL_PATH = re.compile(r'^[^:/?#]+://[^/?#]*([^?#]*)')
+
+
+def url_pattern(url):
+    """Route a URL is grouped under, e.g. 'tools/*'"""
+    match = URL_PATH.match(url)
+    path = (match.group(1) if match else url) or '/'
+    for name, pattern in URL_PATTERNS:
+        if pattern.search(path):
+            return name
+    segment = path.strip('/').split('/', 1)[0]
+    return f"{segment}/*" if segment else '/'
+
+
+def milliseconds(seconds):
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def new_timing():
+    """Empty per-fetch timing dict"""
+    timing = dict.fromkeys(PHASES)
+    timing['bytes'] = 0
+    return timing
+
+
+def add_phase(timing, phase, seconds):
+    """Add to a phase (a redirected fetch may connect more than once)"""
+    timing[phase] = round((timing[phase] or 0) + seconds * 1000, 1)
+
+
+def fetch_timing(timing, started, first_byte, finished, size):
+    """Fill ttfb / download / bytes from perf_counter() readings"""
+    timing['ttfb'] = milliseconds(first_byte - started)
+    timing['download'] = milliseconds(finished - first_byte)
+    timing['bytes'] = size
+    return timing
+
+
+class LatencyHistogram:
+    """
+    Durations counted in HDR-style buckets.
+
+    Values are whole microseconds. Below SUB_BUCKETS every value has its
+    own bucket; above, each power of two is split into SUB_BUCKETS / 2
+    equal buckets, so a bucket is never wider than 1/64 of its values.
+    """
+
+    SUB_BITS = 7
+    SUB_BUCKETS = 1 << SUB_BITS
+    HALF = SUB_BUCKETS // 2
+
+    def __init__(self, max_seconds=HISTOGRAM_MAX_SECONDS):
+        self.highest = int(max_seconds * 1_000_000)
+        self.counts = array('Q', [0]) * (self.index(self.highest) + 1)
+        self.total = 0
+        self.max = 0
+
+    @classmethod
+    def index(cls, value):
+        if value < cls.SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - cls.SUB_BITS
+        return cls.SUB_BUCKETS + (shift - 1) * cls.HALF + (value >> shift) - cls.HALF
+
+    @classmethod
+    def bucket_value(cls, index):
+        """Middle of a bucket, in microseconds"""
+        if index < cls.SUB_BUCKETS:
+            return index
+        shift, offset = divmod(index - cls.SUB_BUCKETS, cls.HALF)
+        shift += 1
+        return ((offset + cls.HALF) << shift) + (1 << shift) // 2
+
+    def record(self, ms):
+        value = min(max(0, int(ms * 1000)), self.highest)
+        self.counts[self.index(value)] += 1
+        self.total += 1
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent):
+        """Duration in ms that percent of the recorded values do not exceed, or None"""
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(percent / 100 * self.total))
+        if rank >= self.total:
+            return self.max / 1000
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bucket_value(index), self.max) / 1000
+        return self.max / 1000
+
+
+class TimingStats:
+    """Histograms per URL pattern and phase, plus bytes per pattern"""
+
+    def __init__(self):
+        self.patterns = {}
+        self.bytes = {}
+
+    def add(self, url, timing):
+        if not timing:
+            return
+        pattern = url_pattern(url)
+        histograms = self.patterns.get(pattern)
+        if histograms is None:
+            histograms = self.patterns[pattern] = {phase: LatencyHistogram() for phase in PHASES}
+        for phase in PHASES:
+            if timing.get(phase) is not None:
+                histograms[phase].record(timing[phase])
+        self.bytes[pattern] = self.bytes.get(pattern, 0) + (timing.get('bytes') or 0)
+
+    def overall(self):
+        """{phase: histogram} over every pattern"""
+        merged = {phase: LatencyHistogram() for phase in PHASES}
+        for histograms in self.patterns.values():
+            for phase in PHASES:
+                merged[phase].merge(histograms[phase])
+        return merged
+
+    def rows(self):
+        """[(pattern, fetches, {phase: {percentile: ms}}, bytes)], slowest p95 TTFB first, 'all' last"""
+        def row(pattern, histograms, size):
+            return (pattern, histograms['ttfb'].total,
+                    {phase: {p: histograms[phase].percentile(p) for p in PERCENTILES} for phase in PHASES},
+                    size)
+
+        rows = [row(pattern, histograms, self.bytes[pattern]) for pattern, histograms in self.patterns.items()]
+        rows.sort(key=lambda r: -(r[2]['ttfb'][95] or 0))
+        rows.append(row('all', self.overall(), sum(self.bytes.values())))
+        return rows
+
+    def print_summary(self):
+        if not self.patterns:
+            print("⏱️  No fetch timings recorded (every page came from an earlier report)")
+            return
+        labels = ''.join(f"{label + ' p' + str(p):>13}" for phase, label in SUMMARY_PHASES for p in PERCENTILES)
+        print(f"   {'Pattern':<16}{'Pages':>7}{labels}{'Avg KB':>9}")
+        for pattern, fetches, percentiles, size in self.rows():
+            cells = ''.join(f"{format_ms(percentiles[phase][p]):>13}" for phase, label in SUMMARY_PHASES
+                            for p in PERCENTILES)
+            average = size / fetches / 1024 if fetches else 0
+            print(f"   {pattern:<16}{fetches:>7}{cells}{average:>9.1f}")
+        overall = self.overall()
+        for phase in ('dns', 'connect', 'tls'):
+            histogram = overall[phase]
+            if histogram.total:
+                print(f"   {phase.upper()}: {histogram.total} new connections, "
+                      f"p50 {format_ms(histogram.percentile(50))}, p99 {format_ms(histogram.percentile(99))}")
+
+
+def format_ms(ms):
+    if ms is None:
+        return '-'
+    return f"{ms / 1000:.2f}s" if ms >= 1000 else f"{ms:.0f}ms"
+
+
+class AiohttpTrace:
+    """trace_request_ctx for aiohttp_trace_config(): a fetch's timing dict and connection waits"""
+
+    def __init__(self, timing):
+        self.timing = timing
+        # Seconds spent waiting for a free connection (not part of ttfb)
+        self.queued = 0.0
+        # DNS seconds inside the connection being created
+        self.dns = 0.0
+
+
+def aiohttp_trace_config():
+    """
+    aiohttp TraceConfig filling the AiohttpTrace passed as
+    trace_request_ctx with dns and connect times and connection waits.
+
+    aiohttp resolves the host inside connection creation, so the lookup
+    is taken out of connect; the TLS handshake cannot be, see above.
+    """
+    import aiohttp
+
+    async def dns_start(session, context, params):
+        context.dns_started = time.perf_counter()
+
+    async def dns_end(session, context, params):
+        seconds = time.perf_counter() - context.dns_started
+        add_phase(context.trace_request_ctx.timing, 'dns', seconds)
+        context.trace_request_ctx.dns += seconds
+
+    async def connect_start(session, context, params):
+        context.connect_started = time.perf_counter()
+        context.trace_request_ctx.dns = 0.0
+
+    async def connect_end(session, context, params):
+        trace = context.trace_request_ctx
+        add_phase(trace.timing, 'connect', time.perf_counter() - context.connect_started - trace.dns)
+
+    async def queued_start(session, context, params):
+        context.queued_started = time.perf_counter()
+
+    async def queued_end(session, context, params):
+        context.trace_request_ctx.queued += time.perf_counter() - context.queued_started
+
+    config = aiohttp.TraceConfig()
+    config.on_dns_resolvehost_start.append(dns_start)
+    config.on_dns_resolvehost_end.append(dns_end)
+    config.on_connection_create_start.append(connect_start)
+    config.on_connection_create_end.append(connect_end)
+    config.on_connection_queued_start.append(queued_start)
+    config.on_connection_queued_end.append(queued_end)
+    return config
+
+
+def httpx_trace(timing):
+    """httpx/httpcore trace extension filling timing with connect and tls times"""
+    phases = {'connection.connect_tcp': 'connect', 'connection.start_tls': 'tls'}
+    started = {}
+
+    async def trace(event, info):
+        name, _, stage = event.rpartition('.')
+        if name not in phases:
+            return
+        if stage == 'started':
+            started[name] = time.perf_counter()
+        elif stage == 'complete' and name in started:
+            add_phase(timing, phases[name], time.perf_counter() - started.pop(name))
+
+    return trace
@@ -1,46 +1,77 @@
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-import time
+import sys
+from indexing_client import SERVICE_ACCOUNT_FILE, AccountPool, load_urls, print_account_usage, print_metrics
+from submission_engine import print_throughput
+from submission_ledger import SubmissionLedger
+from change_detection import FingerprintStore, detect_changes
+from url_resolver import submission_targets, unique_targets
 
-# Load credentials
-credentials = service_account.Credentials.from_service_account_file(
-    'service-account.json',
-    scopes=['https://www.googleapis.com/auth/indexing']
-)
+# Read URLs
+urls = load_urls()
 
-# Build service
-service = build('indexing', 'v3', credentials=credentials)
+# Only pages whose content fingerprint moved are resubmitted
+#   --all       skip change detection and submit every URL
+#   --baseline  record current fingerprints without submitting anything
+store = FingerprintStore()
+fingerprints = {}
+if '--all' not in sys.argv:
+    print(f"Fingerprinting {len(urls)} pages to find changed content...")
+    fingerprints, unchanged, fetch_errors = detect_changes(urls, store)
+    print(f"Changed: {len(fingerprints)} | Unchanged: {len(unchanged)} | Fetch errors: {len(fetch_errors)}")
+    for url, error in fetch_errors:
+        print(f"  - {url} - Error: {error}")
+    if '--baseline' in sys.argv:
+        store.save(fingerprints)
+        print(f"Baseline saved for {len(fingerprints)} pages. Nothing submitted.")
+        sys.exit(0)
+    urls = [url for url in urls if url in fingerprints]
+    if not urls:
+        print("No content changes detected. Nothing to submit.")
+        sys.exit(0)
 
-# Read URLs
-with open('sitemap-urls.txt', 'r') as f:
-    urls = [line.strip() for line in f if line.strip()]
+# Final canonical URLs only (--no-resolve submits the sitemap URLs as listed)
+targets = {url: url for url in urls}
+if '--no-resolve' not in sys.argv:
+    targets = submission_targets(urls)
+    urls = unique_targets(targets)
+    if not urls:
+        print("No URL resolved to a page. Nothing to submit.")
+        sys.exit(0)
 
 print(f"Re-submitting {len(urls)} URLs with optimized meta tags...\n")
 print("="*80)
 
-success = 0
-failed = 0
-failed_urls = []
+def report(index, total, url, ok, result):
+    if ok:
+        print(f"[{index}/{total}] SUCCESS - {url}")
+    else:
+        print(f"[{index}/{total}] FAILED - {url} - Error: {result}")
+
+# --batch sends up to 100 URLs per HTTP request
+# Ledger skips URLs notified recently (--force resubmits them anyway).
+# A changed fingerprint is reason enough to resubmit, so no window then.
+window_hours = 0 if '--force' in sys.argv or fingerprints else None
+client = AccountPool(ledger=SubmissionLedger())
+try:
+    client.connect()
+except FileNotFoundError:
+    print(f"Error: {SERVICE_ACCOUNT_FILE} not found!")
+    print("Please download JSON key from Google Cloud Console")
+    sys.exit(1)
+except Exception as e:
+    print(f"Authentication error: {e}")
+    sys.exit(1)
+for name, error in client.errors.items():
+    print(f"Skipping {name}: {error}")
+
+stats = client.submit(urls, batch='--batch' in sys.argv, on_result=report,
+                      window_hours=window_hours)
+success = stats['success']
+failed = stats['failed']
+failed_urls = stats['failed_urls']
 
-for i, url in enumerate(urls, 1):
-    try:
-        request = service.urlNotifications().publish(
-            body={
-                'url': url,
-                'type': 'URL_UPDATED'
-            }
-        )
-        response = request.execute()
-        success += 1
-        print(f"[{i}/{len(urls)}] SUCCESS - {url}")
-        
-        # Small delay to avoid rate limiting
-        time.sleep(0.5)
-        
-    except Exception as e:
-        failed += 1
-        failed_urls.append((url, str(e)))
-        print(f"[{i}/{len(urls)}] FAILED - {url} - Error: {str(e)}")
+# Remember fingerprints only for pages Google accepted
+accepted = {url for url, ok, result in stats['results'] if ok}
+store.save({url: fingerprint for url, fingerprint in fingerprints.items() if targets.get(url) in accepted})
 
 # Summary
 print("\n" + "="*80)
@@ -50,6 +81,9 @@ print(f"Total URLs: {len(urls)}")
 print(f"Successfully submitted: {success}")
 print(f"Failed: {failed}")
 print(f"Success rate: {(success/len(urls)*100):.1f}%")
+print_throughput(stats)
+print_account_usage(stats)
+print_metrics(client.metrics)
 
 if failed_urls:
     print(f"\nFailed URLs:")
@@ -7,131 +7,196 @@ This script checks all pages for:
 2. Meta description (present and optimal length 150-160 chars)
 3. Content word count (minimum 1000 words)
 4. H1 tag presence
+5. Indexability: robots.txt, meta robots and X-Robots-Tag (indexability.py)
+6. Redirects and canonical links pointing elsewhere (url_resolver.py)
+
+Pages are fetched concurrently by crawl_engine.py (aiohttp or httpx);
+CRAWL_CONCURRENCY and CRAWL_PER_HOST tune how hard each site is hit.
+Pages that answer 304 Not Modified reuse their record from the last audit
+(page_cache.py). Pages with nearly the same main text are grouped into
+clusters (near_duplicates.py). Every fetch is timed (DNS, connect, TLS,
+TTFB, download); the report gets the timings as columns and the summary
+p50/p95/p99 per URL pattern (request_timing.py).
 
 Usage:
     python seo_audit.py
+    python seo_audit.py --refresh    # download and re-check every page
+    python seo_audit.py --incremental    # re-audit only new/changed/failing pages,
+                                         # write seo-audit-delta.csv
+    python seo_audit.py --jsonl      # also write full results to seo-audit-report.jsonl
+    python seo_audit.py --restart    # ignore the partial report of an interrupted run
+    python seo_audit.py --links      # crawl internal links from the homepage,
+                                     # write link-graph.csv (see link_graph.py)
+
+Results are written as pages finish. If a run is interrupted, the next
+run resumes from the partial report (see audit_report.py). Every run is
+also appended to seo-audit-history.db; query trends with audit_history.py.
 """
 
-import re
+import os
+import sys
 import time
-from urllib.parse import urlparse
+from array import array
+from urllib.parse import urljoin, urlparse
 import requests
-from bs4 import BeautifulSoup
+import html_extract
+import indexability
+import link_graph
+import near_duplicates
+import request_timing
+import sitemap_discovery
+import text_metrics
+from audit_report import AuditSummary, ReportWriter, FIXING_FILE, JSONL_FILE, REPORT_FILE
+from url_resolver import redirect_hops
 
-# Load URLs
-def load_urls(filename='sitemap-urls.txt'):
-    """Load URLs from text file"""
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            urls = [line.strip() for line in f if line.strip()]
-        return urls
-    except FileNotFoundError:
-        print(f"❌ Error: {filename} not found!")
-        return []
+# Bump when the audit rules change, so cached records are re-checked
+AUDIT_VERSION = 5
+# Issue for a 304 answer when no cached record can stand in for the page
+NOT_MODIFIED_WITHOUT_RECORD = "❌ Failed to fetch: 304 Not Modified with no cached record"
+
+# Load URLs from the live sitemaps (sitemap-urls.txt when none are found)
+def load_urls(filename='sitemap-urls.txt', lastmod=None):
+    """Load URLs from robots.txt / sitemap discovery, falling back to a text file"""
+    return sitemap_discovery.load_urls(filename, lastmod=lastmod)
 
 # Count words in text
 def count_words(text):
     """Count words in text content"""
-    # Remove extra whitespace and count words
-    words = re.findall(r'\b\w+\b', text)
-    return len(words)
+    return text_metrics.analyze(text, [text_metrics.WordCount()])['word_count']
+
+# Extract SEO fields from HTML
+def extract_page(html, links=False):
+    """Pull title, meta description, H1, canonical, main-content text (and links) out of HTML"""
+    # Single-pass extractor; backend set by HTML_EXTRACTOR (see html_extract.py)
+    return html_extract.extract_page(html, links)
+
+# Build the audit record for a fetched page
+def audit_html(url, html, links=False, x_robots_tag=None, redirects=()):
+    """Audit result dict for a page's HTML (with its internal links if asked)"""
+    page = extract_page(html, links)
+    # Word count, readability, top terms and the near-duplicate fingerprint
+    # all come from one pass over the main text (text_metrics.py)
+    metrics = text_metrics.analyze(page['text'], text_metrics.default_accumulators() + [near_duplicates.MinHash()])
+    # redirects lists the hops fetching url followed; the page is the last one
+    final_url = redirects[-1] if redirects else url
+    canonical = urljoin(final_url, page['canonical']) if page['canonical'] else None
+    meta_robots = page['meta_robots']
+    meta_title = page['meta_title']
+    title_length = len(meta_title) if meta_title else 0
+    meta_description = page['meta_description']
+    desc_length = len(meta_description) if meta_description else 0
+    h1_text = page['h1']
+    word_count = metrics['word_count']
+    
+    # Determine issues
+    issues = []
+    noindex = indexability.noindex_source(meta_robots, x_robots_tag)
+    if noindex:
+        issues.append(indexability.NOINDEX_ISSUE + noindex)
+    
+    if len(redirects) > 1:
+        issues.append(f"⚠️ Redirect chain ({len(redirects)} hops to {final_url})")
+    elif redirects:
+        issues.append(f"⚠️ Redirects (to {final_url})")
+    if canonical and link_graph.normalize_url(canonical) != link_graph.normalize_url(final_url):
+        issues.append(f"⚠️ Canonical points elsewhere ({canonical})")
+    
+    if not meta_title:
+        issues.append("❌ No meta title")
+    elif title_length < 30:
+        issues.append(f"⚠️ Title too short ({title_length} chars)")
+    elif title_length > 60:
+        issues.append(f"⚠️ Title too long ({title_length} chars)")
+    
+    if not meta_description:
+        issues.append("❌ No meta description")
+    elif desc_length < 120:
+        issues.append(f"⚠️ Description too short ({desc_length} chars)")
+    elif desc_length > 160:
+        issues.append(f"⚠️ Description too long ({desc_length} chars)")
+    
+    if not h1_text:
+        issues.append("❌ No H1 tag")
+    
+    if word_count < 1000:
+        issues.append(f"⚠️ Low word count ({word_count} words, need 1000+)")
+    
+    result = {
+        'url': url,
+        'meta_title': meta_title,
+        'title_length': title_length,
+        'meta_description': meta_description,
+        'desc_length': desc_length,
+        'h1': h1_text,
+        'word_count': word_count,
+        'meta_robots': meta_robots,
+        'x_robots_tag': x_robots_tag,
+        'canonical': canonical,
+        'redirects': list(redirects),
+        'issues': issues,
+        'status': 'success',
+    }
+    # Sentence, readability and top-term columns, plus the minhash
+    result.update(metrics)
+    if links:
+        result['links'] = link_graph.internal_links(final_url, page['links'])
+    return result
+
+# Audit record for a page that could not be checked
+def error_result(url, issue):
+    """Audit result dict for a failed page"""
+    return {
+        'url': url,
+        'meta_title': None,
+        'title_length': 0,
+        'meta_description': None,
+        'desc_length': 0,
+        'h1': None,
+        'word_count': 0,
+        'issues': [issue],
+        'status': 'error'
+    }
+
+def timed_get(url, headers):
+    """(requests response, timing dict) for a GET"""
+    started = time.perf_counter()
+    response = requests.get(url, timeout=10, headers=headers)
+    # requests reads the body before returning; elapsed ends at the headers
+    timing = request_timing.fetch_timing(request_timing.new_timing(), started,
+                                         started + response.elapsed.total_seconds(),
+                                         time.perf_counter(), len(response.content))
+    return response, timing
 
 # Check single page
-def check_page(url):
+def check_page(url, cache=None, links=False):
     """Check meta tags and content for a single page"""
     try:
-        # Fetch page
-        response = requests.get(url, timeout=10)
+        # Fetch page (conditional GET when we have a cached record)
+        headers = cache.conditional_headers(url) if cache else {}
+        response, timing = timed_get(url, headers)
+        if response.status_code == 304:
+            cached = cache.get(url) if cache else None
+            if cached:
+                cached['timing'] = timing
+                return cached
+            # No usable record behind the validators: fetch the whole page
+            response, timing = timed_get(url, {})
+            if response.status_code == 304:
+                return error_result(url, NOT_MODIFIED_WITHOUT_RECORD)
         response.raise_for_status()
         
         # Parse HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Check meta title
-        title_tag = soup.find('title')
-        meta_title = title_tag.string.strip() if title_tag else None
-        title_length = len(meta_title) if meta_title else 0
-        
-        # Check meta description
-        meta_desc_tag = soup.find('meta', attrs={'name': 'description'})
-        meta_description = meta_desc_tag.get('content', '').strip() if meta_desc_tag else None
-        desc_length = len(meta_description) if meta_description else 0
-        
-        # Check H1
-        h1_tag = soup.find('h1')
-        h1_text = h1_tag.get_text().strip() if h1_tag else None
-        
-        # Count content words (excluding header, footer, nav)
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "header", "footer"]):
-            script.decompose()
-        
-        # Get text from main content
-        main_content = soup.find('main') or soup.find('body')
-        if main_content:
-            text = main_content.get_text()
-            word_count = count_words(text)
-        else:
-            word_count = 0
-        
-        # Determine issues
-        issues = []
-        if not meta_title:
-            issues.append("❌ No meta title")
-        elif title_length < 30:
-            issues.append(f"⚠️ Title too short ({title_length} chars)")
-        elif title_length > 60:
-            issues.append(f"⚠️ Title too long ({title_length} chars)")
-        
-        if not meta_description:
-            issues.append("❌ No meta description")
-        elif desc_length < 120:
-            issues.append(f"⚠️ Description too short ({desc_length} chars)")
-        elif desc_length > 160:
-            issues.append(f"⚠️ Description too long ({desc_length} chars)")
-        
-        if not h1_text:
-            issues.append("❌ No H1 tag")
-        
-        if word_count < 1000:
-            issues.append(f"⚠️ Low word count ({word_count} words, need 1000+)")
-        
-        return {
-            'url': url,
-            'meta_title': meta_title,
-            'title_length': title_length,
-            'meta_description': meta_description,
-            'desc_length': desc_length,
-            'h1': h1_text,
-            'word_count': word_count,
-            'issues': issues,
-            'status': 'success'
-        }
+        result = audit_html(url, response.text, links, indexability.header_value(response.headers),
+                            redirect_hops(response.history, response.url))
+        if cache:
+            cache.put(url, response.headers, result)
+        result['timing'] = timing
+        return result
         
     except requests.exceptions.RequestException as e:
-        return {
-            'url': url,
-            'meta_title': None,
-            'title_length': 0,
-            'meta_description': None,
-            'desc_length': 0,
-            'h1': None,
-            'word_count': 0,
-            'issues': [f"❌ Failed to fetch: {str(e)}"],
-            'status': 'error'
-        }
+        return error_result(url, f"❌ Failed to fetch: {str(e)}")
     except Exception as e:
-        return {
-            'url': url,
-            'meta_title': None,
-            'title_length': 0,
-            'meta_description': None,
-            'desc_length': 0,
-            'h1': None,
-            'word_count': 0,
-            'issues': [f"❌ Error: {str(e)}"],
-            'status': 'error'
-        }
+        return error_result(url, f"❌ Error: {str(e)}")
 
 # Main execution
 def main():
@@ -141,8 +206,9 @@ def main():
     print()
     
     # Load URLs
-    print("📂 Loading URLs from sitemap-urls.txt...")
-    urls = load_urls()
+    print("📂 Discovering URLs from robots.txt and sitemaps...")
+    lastmod = {}
+    urls = load_urls(lastmod=lastmod)
     
     if not urls:
         print("❌ No URLs found!")
@@ -151,119 +217,243 @@ def main():
     print(f"✅ Loaded {len(urls)} URLs")
     print()
     
+    # Incremental mode: reuse last report's rows for pages the sitemap
+    # says have not changed, then diff against the last report
+    # Link mode needs every page's links, so nothing is reused
+    import audit_diff
+    links = '--links' in sys.argv
+    previous = audit_diff.load_report() if '--incremental' in sys.argv else {}
+    to_audit, reused = urls, {}
+    if previous and not links:
+        to_audit, reused = audit_diff.plan_incremental(
+            urls, previous, audit_diff.report_time(), lastmod
+        )
+        print(f"♻️  Incremental audit: {len(to_audit)} pages to check, "
+              f"{len(reused)} unchanged since the last report")
+        print()
+    
+    # Results stream to the report as pages finish; an interrupted run
+    # leaves partial files that the next run picks up from
+    summary = AuditSummary()
+    delta = []
+    signatures = {}
+    noindex = {}
+    timings = request_timing.TimingStats()
+    
+    # Every run is also appended to the audit history (audit_history.py)
+    from audit_history import AuditHistory
+    history = AuditHistory()
+    
+    def record(result):
+        summary.add(result)
+        history.add(result)
+        timings.add(result['url'], result.get('timing'))
+        if result.get('minhash'):
+            signatures[result['url']] = array('Q', result['minhash'])
+        source = indexability.noindex_from_issues(result['issues'])
+        if source:
+            noindex[result['url']] = source
+        if previous:
+            delta.extend(audit_diff.diff_result(previous, result))
+    
+    writer = ReportWriter(jsonl_path=JSONL_FILE if '--jsonl' in sys.argv else None,
+                          resume='--restart' not in sys.argv)
+    history.start_run(resume=writer.has_partial())
+    done = writer.open(on_resumed=record)
+    if done:
+        print(f"↩️  Resuming: {len(done)} pages already in the partial report")
+        print()
+    
     # Check each page
     print("🔍 Checking pages...")
     print("-" * 80)
     
-    results = []
-    pages_with_issues = []
-    perfect_pages = []
-    
-    for index, url in enumerate(urls, 1):
-        print(f"\n[{index}/{len(urls)}] Checking: {url}")
-        
-        result = check_page(url)
-        results.append(result)
-        
+    def report(index, total, result):
+        print(f"\n[{index}/{total}] Checked: {result['url']}")
         if result['status'] == 'success':
             print(f"   Title: {result['title_length']} chars | Description: {result['desc_length']} chars | Words: {result['word_count']}")
             
             if result['issues']:
-                pages_with_issues.append(result)
                 for issue in result['issues']:
                     print(f"   {issue}")
             else:
-                perfect_pages.append(result)
                 print("   ✅ Perfect! All SEO requirements met")
         else:
-            pages_with_issues.append(result)
             print(f"   ❌ Failed to check")
-        
-        # Rate limiting - be nice to server
-        if index < len(urls):
-            time.sleep(0.5)
+        record(result)
+        writer.write(result)
+    
+    # Pages are fetched concurrently with per-host rate limiting
+    # (crawl_engine.py)
+    from crawl_engine import crawl_pages
+    from page_cache import PageCache
+    cache = None if '--refresh' in sys.argv else PageCache(required=('links',) if links else ())
+    crawl_stats = {}
+    unsigned_reused = 0
+    complete = False
+    graph_rows = None
+    try:
+        for url, result in reused.items():
+            if url not in done:
+                # Not fetched this run, so no timings; the report has no
+                # MinHash signature, the page cache usually does
+                result = dict(result, timing=None)
+                cached = cache.get(url) if cache else None
+                if cached and cached.get('minhash'):
+                    result['minhash'] = cached['minhash']
+                elif not result.get('minhash'):
+                    unsigned_reused += 1
+                record(result)
+                writer.write(result)
+        if links:
+            # Breadth-first from the homepage; pages outside the sitemap
+            # only feed the link graph, they are not part of the report
+            sitemap = set(urls)
+            
+            def report_sitemap_page(index, total, result):
+                if result['url'] in sitemap and result['url'] not in done:
+                    report(index, total, result)
+            
+            homepage = sitemap_discovery.SITE_URL.rstrip('/') + '/'
+            graph = link_graph.crawl_site(homepage, urls, on_result=report_sitemap_page, cache=cache,
+                                          stats=crawl_stats)
+            graph_rows = graph.rows(urls, homepage)
+            link_graph.write_rows(graph_rows)
+        else:
+            crawl_pages([url for url in to_audit if url not in done], on_result=report, cache=cache,
+                        stats=crawl_stats, collect=False)
+        complete = True
+    finally:
+        if cache:
+            cache.flush()
+        writer.close(complete)
+        if complete:
+            history.finish_run()
+        else:
+            history.flush()
     
     # Generate Report
     print()
     print("=" * 80)
     print("SUMMARY REPORT")
     print("=" * 80)
-    print(f"Total Pages: {len(urls)}")
-    print(f"✅ Perfect Pages: {len(perfect_pages)}")
-    print(f"⚠️  Pages with Issues: {len(pages_with_issues)}")
+    print(f"Total Pages: {summary.total}")
+    print(f"✅ Perfect Pages: {summary.perfect}")
+    print(f"⚠️  Pages with Issues: {summary.with_issues}")
+    if crawl_stats.get('not_modified'):
+        print(f"♻️  Unchanged since last audit (304): {crawl_stats['not_modified']} pages")
+    if 'bytes' in crawl_stats:
+        print(f"📥 Downloaded: {crawl_stats['bytes'] / 1024:.0f} KB")
     print()
     
-    # Categorize issues
-    no_title = [r for r in pages_with_issues if not r['meta_title']]
-    no_description = [r for r in pages_with_issues if not r['meta_description']]
-    low_word_count = [r for r in pages_with_issues if r['word_count'] < 1000 and r['status'] == 'success']
-    no_h1 = [r for r in pages_with_issues if not r['h1'] and r['status'] == 'success']
+    # Where fetch time goes, per route (request_timing.py)
+    print("⏱️  Response times by URL pattern:")
+    timings.print_summary()
+    print()
     
     print("📊 Issue Breakdown:")
-    print(f"   ❌ Missing meta title: {len(no_title)} pages")
-    print(f"   ❌ Missing meta description: {len(no_description)} pages")
-    print(f"   ❌ No H1 tag: {len(no_h1)} pages")
-    print(f"   ⚠️  Low word count (<1000): {len(low_word_count)} pages")
+    print(f"   ❌ Missing meta title: {len(summary.no_title)} pages")
+    print(f"   ❌ Missing meta description: {len(summary.no_description)} pages")
+    print(f"   ❌ No H1 tag: {len(summary.no_h1)} pages")
+    print(f"   ⚠️  Low word count (<1000): {len(summary.low_word_count)} pages")
     print()
     
     # Detailed reports
-    if no_title:
+    if summary.no_title:
         print("=" * 80)
         print("PAGES MISSING META TITLE")
         print("=" * 80)
-        for result in no_title:
-            print(f"❌ {result['url']}")
+        for url in summary.no_title:
+            print(f"❌ {url}")
         print()
     
-    if no_description:
+    if summary.no_description:
         print("=" * 80)
         print("PAGES MISSING META DESCRIPTION")
         print("=" * 80)
-        for result in no_description:
-            print(f"❌ {result['url']}")
+        for url in summary.no_description:
+            print(f"❌ {url}")
         print()
     
-    if low_word_count:
+    if summary.low_word_count:
         print("=" * 80)
         print("PAGES WITH LOW WORD COUNT (<1000 words)")
         print("=" * 80)
-        for result in low_word_count:
-            print(f"⚠️  {result['url']} - {result['word_count']} words")
+        for url, word_count in summary.low_word_count:
+            print(f"⚠️  {url} - {word_count} words")
         print()
     
-    # Save detailed report to CSV
-    try:
-        import csv
-        with open('seo-audit-report.csv', 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['URL', 'Meta Title', 'Title Length', 'Meta Description', 'Desc Length', 'H1', 'Word Count', 'Issues'])
-            
-            for result in results:
-                writer.writerow([
-                    result['url'],
-                    result['meta_title'] or 'MISSING',
-                    result['title_length'],
-                    result['meta_description'] or 'MISSING',
-                    result['desc_length'],
-                    result['h1'] or 'MISSING',
-                    result['word_count'],
-                    ' | '.join(result['issues']) if result['issues'] else 'OK'
-                ])
-        
-        print("💾 Detailed report saved to: seo-audit-report.csv")
+    print(f"💾 Detailed report saved to: {REPORT_FILE}")
+    if summary.with_issues:
+        print(f"💾 Pages needing fixes saved to: {FIXING_FILE}")
+    if '--jsonl' in sys.argv:
+        print(f"💾 Full results saved to: {JSONL_FILE}")
+    print(f"📈 Run {history.run_id} added to audit history (python audit_history.py)")
+    
+    # robots.txt verdict for every sitemap URL, noindex from the pages
+    verdicts = indexability.classify(urls, indexability.RobotsCache(), noindex)
+    reasons = indexability.write_verdicts(verdicts)
+    print()
+    print("=" * 80)
+    print("INDEXABILITY")
+    print("=" * 80)
+    for reason, count in sorted(reasons.items(), key=lambda item: -item[1]):
+        print(f"   {'✅' if reason == indexability.INDEXABLE else '❌'} {reason}: {count} pages")
+    print(f"💾 Indexability saved to: {indexability.INDEXABILITY_FILE}")
+    
+    # Pages with (nearly) the same main text
+    clusters = near_duplicates.find_clusters(signatures)
+    # Reused pages without a signature were not compared, so these clusters
+    # are incomplete; keep the last full result instead
+    keep_previous = unsigned_reused and os.path.exists(near_duplicates.DUPLICATES_FILE)
+    if not keep_previous:
+        near_duplicates.write_clusters(clusters)
+    print()
+    print("=" * 80)
+    print("NEAR-DUPLICATE CONTENT")
+    print("=" * 80)
+    near_duplicates.print_clusters(clusters)
+    unsigned = summary.total - len(signatures)
+    if unsigned:
+        print(f"   ({unsigned} pages not compared: failed, too short or reused from an earlier report)")
+    if keep_previous:
+        print(f"💾 {unsigned_reused} reused pages had no signature - kept the previous "
+              f"{near_duplicates.DUPLICATES_FILE} (run without --incremental to refresh it)")
+    else:
+        print(f"💾 Clusters saved to: {near_duplicates.DUPLICATES_FILE}")
+    
+    # Internal linking, from the link-graph crawl
+    if graph_rows is not None:
+        links_summary = link_graph.summarize(graph_rows)
         print()
-    except Exception as e:
-        print(f"⚠️  Could not save CSV: {e}")
+        print("=" * 80)
+        print("INTERNAL LINKS")
+        print("=" * 80)
+        print(f"🔗 Pages reachable from the homepage: {links_summary['reachable']}")
+        print(f"🏝️  Orphan pages (in sitemap, no path from homepage): {len(links_summary['orphans'])}")
+        for url in links_summary['orphans'][:20]:
+            print(f"   {url}")
+        print(f"🕳️  Deeper than {link_graph.DEEP_CLICK_DEPTH} clicks: {len(links_summary['deep'])} pages")
+        print(f"⚠️  {link_graph.WEAK_INLINKS} internal link or fewer: {len(links_summary['weak'])} pages")
+        print(f"➕ Linked but not in sitemap: {len(links_summary['not_in_sitemap'])} pages")
+        print(f"💾 Link graph saved to: {link_graph.LINK_GRAPH_FILE}")
     
-    # Save problem URLs
-    if pages_with_issues:
-        with open('pages-need-fixing.txt', 'w', encoding='utf-8') as f:
-            for result in pages_with_issues:
-                f.write(f"{result['url']}\n")
-                for issue in result['issues']:
-                    f.write(f"  {issue}\n")
-                f.write("\n")
-        print("💾 Pages needing fixes saved to: pages-need-fixing.txt")
+    # What changed since the previous report
+    if previous:
+        audit_diff.write_delta(delta)
+        introduced = [row for row in delta if row[1] == 'introduced']
+        resolved = [row for row in delta if row[1] == 'resolved']
+        print()
+        print("=" * 80)
+        print("CHANGES SINCE LAST AUDIT")
+        print("=" * 80)
+        print(f"🆕 Newly introduced issues: {len(introduced)}")
+        for url, change, issue in introduced[:20]:
+            print(f"   {url} - {issue}")
+        print(f"✅ Newly resolved issues: {len(resolved)}")
+        for url, change, issue in resolved[:20]:
+            print(f"   {url} - {issue}")
+        print(f"💾 Delta report saved to: {audit_diff.DELTA_FILE}")
 
 if __name__ == '__main__':
     try:
@@ -0,0 +1,254 @@
+"""
+Sitemap Discovery
+=================
+Finds the site's URLs from what it actually serves instead of the
+hand-maintained sitemap-urls.txt.
+
+Discovery reads robots.txt, follows its Sitemap: lines (or /sitemap.xml
+when there are none) and walks sitemap indexes recursively. Child sitemaps
+are fetched concurrently by a small thread pool, and .xml.gz sitemaps (or
+gzip bodies) are decompressed on the fly.
+
+Each sitemap is parsed with an incremental iterparse straight off the
+response. Every <url> element is cleared once it has been read, and
+results go through a bounded queue, so memory stays flat however many
+URLs the sitemaps list.
+
+sitemap-urls.txt remains the fallback when discovery finds nothing (e.g.
+offline). `python sitemap_discovery.py` rewrites it from the live sitemaps.
+
+Usage:
+    from sitemap_discovery import discover, load_urls
+
+    for url, lastmod in discover():      # lastmod is a UTC datetime or None
+        ...
+
+    lastmod = {}
+    urls = load_urls(lastmod=lastmod)    # list, fills lastmod as it goes
+"""
+
+import gzip
+import hashlib
+import os
+import queue
+import re
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.request import Request, urlopen
+
+SITE_URL = os.environ.get('SITE_URL', 'https://www.prourlmonitor.com')
+URLS_FILE = 'sitemap-urls.txt'
+
+USER_AGENT = 'ProURLMonitor-SEOAudit/1.0'
+DISCOVERY_TIMEOUT = 10
+
+# Sitemaps fetched at once
+DISCOVERY_WORKERS = int(os.environ.get('DISCOVERY_WORKERS', '4'))
+# (url, lastmod) pairs buffered between the parsers and the caller
+DISCOVERY_QUEUE_SIZE = 1000
+
+SITEMAP_LINE = re.compile(r'^\s*sitemap\s*:\s*(\S+)', re.IGNORECASE | re.MULTILINE)
+
+# Queue messages from the parser threads
+_URL = 'url'
+_SITEMAP = 'sitemap'
+_DONE = 'done'
+
+
+class DiscoveryStopped(Exception):
+    """The caller stopped reading before discovery finished"""
+
+
+def parse_lastmod(value):
+    """Sitemap <lastmod> (W3C date or datetime) as a UTC datetime, or None"""
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def open_url(url):
+    return urlopen(Request(url, headers={'User-Agent': USER_AGENT}), timeout=DISCOVERY_TIMEOUT)
+
+
+def robots_sitemaps(site_url=SITE_URL):
+    """Sitemap URLs listed in robots.txt, or the default /sitemap.xml"""
+    try:
+        with open_url(site_url.rstrip('/') + '/robots.txt') as response:
+            robots = response.read().decode('utf-8', errors='replace')
+    except Exception:
+        robots = ''
+    return SITEMAP_LINE.findall(robots) or [site_url.rstrip('/') + '/sitemap.xml']
+
+
+def local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def child_text(element, name):
+    for child in element:
+        if local_name(child.tag) == name:
+            return (child.text or '').strip()
+    return None
+
+
+def parse_sitemap(stream, on_url, on_sitemap):
+    """
+    Stream a <urlset> or <sitemapindex> document.
+
+    on_url(loc, lastmod) is called for each page, on_sitemap(loc) for each
+    child sitemap. Elements are dropped as soon as they are read.
+    """
+    root = None
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = element
+            continue
+        tag = local_name(element.tag)
+        if tag not in ('url', 'sitemap'):
+            continue
+        loc = child_text(element, 'loc')
+        if loc:
+            if tag == 'url':
+                on_url(loc, parse_lastmod(child_text(element, 'lastmod')))
+            else:
+                on_sitemap(loc)
+        # Read entries are no longer referenced by the tree
+        root.clear()
+
+
+def sitemap_stream(url, response):
+    """The response body, gunzipped for .xml.gz sitemaps"""
+    if url.endswith('.gz') or response.peek(2)[:2] == b'\x1f\x8b':
+        return gzip.GzipFile(fileobj=response)
+    return response
+
+
+def url_digest(url):
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+
+
+def discover(site_url=SITE_URL, sitemaps=None, workers=DISCOVERY_WORKERS, stats=None):
+    """
+    Yield (url, lastmod) for every page in the site's sitemaps.
+
+    sitemaps defaults to the ones listed in robots.txt. Duplicate URLs are
+    yielded once. stats, if given, gets sitemaps / urls / errors counts.
+    """
+    stats = stats if stats is not None else {}
+    stats.update(sitemaps=0, urls=0, errors=0)
+    results = queue.Queue(maxsize=DISCOVERY_QUEUE_SIZE)
+    stop = threading.Event()
+
+    def put(message):
+        # Blocks while the caller is behind, gives up once it has stopped
+        while not stop.is_set():
+            try:
+                results.put(message, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        raise DiscoveryStopped()
+
+    def read(sitemap_url):
+        try:
+            with open_url(sitemap_url) as response:
+                parse_sitemap(sitemap_stream(sitemap_url, response),
+                              on_url=lambda loc, lastmod: put((_URL, loc, lastmod)),
+                              on_sitemap=lambda loc: put((_SITEMAP, loc, None)))
+        except DiscoveryStopped:
+            return
+        except Exception as e:
+            stats['errors'] += 1
+            print(f"⚠️  Could not read sitemap {sitemap_url}: {e}")
+        put((_DONE, sitemap_url, None))
+
+    seen_sitemaps = set()
+    # 128-bit URL digests keep the duplicate check small for very large
+    # sitemaps; unlike hash() they will not collide and drop a real URL
+    seen_urls = set()
+    pending = 0
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        for sitemap_url in sitemaps or robots_sitemaps(site_url):
+            if sitemap_url not in seen_sitemaps:
+                seen_sitemaps.add(sitemap_url)
+                executor.submit(read, sitemap_url)
+                pending += 1
+        while pending:
+            kind, loc, lastmod = results.get()
+            if kind == _DONE:
+                pending -= 1
+                stats['sitemaps'] += 1
+            elif kind == _SITEMAP:
+                if loc not in seen_sitemaps:
+                    seen_sitemaps.add(loc)
+                    executor.submit(read, loc)
+                    pending += 1
+            else:
+                key = url_digest(loc)
+                if key not in seen_urls:
+                    seen_urls.add(key)
+                    stats['urls'] += 1
+                    yield loc, lastmod
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def load_urls(filename=URLS_FILE, lastmod=None, site_url=SITE_URL):
+    """
+    Page URLs from the live sitemaps, or from filename if none are found.
+
+    lastmod, if given, is filled with {url: lastmod} for URLs that have one.
+    """
+    urls = []
+    for url, modified in discover(site_url):
+        urls.append(url)
+        if lastmod is not None and modified:
+            lastmod[url] = modified
+    if urls:
+        return urls
+    print(f"⚠️  No URLs found in the sitemaps of {site_url}, using {filename}")
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        print(f"❌ Error: {filename} not found!")
+        return []
+
+
+def main():
+    print("=" * 80)
+    print("🗺️  SITEMAP DISCOVERY")
+    print("=" * 80)
+    print()
+
+    site_url = sys.argv[1] if len(sys.argv) > 1 else SITE_URL
+    print(f"🔍 Following robots.txt and sitemaps of {site_url}...")
+    stats = {}
+    urls = [url for url, lastmod in discover(site_url, stats=stats)]
+    print(f"✅ {stats['urls']} URLs in {stats['sitemaps']} sitemaps"
+          + (f" ({stats['errors']} could not be read)" if stats['errors'] else ''))
+    if not urls:
+        print(f"❌ Nothing found - {URLS_FILE} left as it is")
+        return
+
+    with open(URLS_FILE, 'w', encoding='utf-8') as f:
+        for url in urls:
+            f.write(url + '\n')
+    print(f"💾 Saved to {URLS_FILE}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Discovery interrupted")
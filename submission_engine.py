@@ -0,0 +1,477 @@
+"""
+Indexing API Submission Engine
+==============================
+Concurrent, quota-aware URL submitter behind IndexingClient.submit()
+in indexing_client.py.
+
+Requests are spread over a small thread pool and paced by a token bucket
+that is configured from the Indexing API limits:
+  - 600 requests per minute
+  - 200 requests per day
+
+Usage:
+    from submission_engine import submit_urls, print_throughput
+
+    stats = submit_urls(urls, get_indexing_service, submit_url_for_indexing)
+    print_throughput(stats)
+
+    # Skip recently notified URLs and share the daily quota across runs
+    stats = submit_urls(urls, get_indexing_service, submit_url_for_indexing,
+                        ledger=SubmissionLedger())
+
+    # Batch mode: 100 notifications per HTTP round trip
+    stats = submit_urls(urls, get_indexing_service, submit_url_for_indexing,
+                        batch_fn=submit_urls_batch)
+
+Scripts normally go through IndexingClient.submit(), which wires these
+up with its connection pool and metrics.
+
+Failed requests are classified (quota, auth, permission, transient,
+permanent). Transient errors are retried with exponential backoff and
+jitter, per-minute quota errors pause all workers until the minute window
+resets, and a daily quota error stops the run. Progress is checkpointed
+to CHECKPOINT_FILE so an interrupted or crashed run resumes where it
+stopped.
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+
+from submission_ledger import quota_day
+
+# Google Indexing API limits
+REQUESTS_PER_MINUTE = 600
+REQUESTS_PER_DAY = 200
+
+# Number of requests kept in flight at once
+MAX_WORKERS = 10
+
+# URLs per HTTP round trip in batch mode (Google allows 100)
+BATCH_SIZE = 100
+
+# Retry policy for transient errors (5xx, timeouts, connection resets)
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+# Pause after a per-minute quota error (the window is one minute)
+QUOTA_PAUSE = 60
+
+CHECKPOINT_FILE = 'submission-checkpoint.json'
+
+# Error classes
+QUOTA = 'quota'
+DAILY_QUOTA = 'daily_quota'
+AUTH = 'auth'
+PERMISSION = 'permission'
+TRANSIENT = 'transient'
+PERMANENT = 'permanent'
+
+
+def classify_error(result):
+    """
+    Classify a failed (success, result) outcome.
+
+    `result` is the error message; ApiError messages from indexing_client.py
+    also carry the HTTP status as .code. Errors without a status code are
+    network failures and count as transient.
+    """
+    code = getattr(result, 'code', None)
+    message = str(result).lower()
+
+    if code == 429 or 'quota' in message or 'rate limit' in message or 'ratelimit' in message:
+        if 'per day' in message or 'daily' in message:
+            return DAILY_QUOTA
+        return QUOTA
+    if code == 401:
+        return AUTH
+    if code == 403:
+        return PERMISSION
+    if code is None or code == 408 or code >= 500:
+        return TRANSIENT
+    return PERMANENT
+
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiter.
+
+    Tokens refill continuously at per_minute / 60 per second up to `burst`.
+    The per_day budget is a hard cap: once it is spent acquire() returns
+    False instead of blocking. pause() holds every caller back until a
+    quota window has reset, and close() releases all waiters with False.
+    If top_up is given it is called when the daily budget runs out and
+    returns how many more requests may be sent (0 when none are left).
+    """
+
+    def __init__(self, per_minute=REQUESTS_PER_MINUTE, per_day=REQUESTS_PER_DAY, burst=None, top_up=None):
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1, per_minute // 10)
+        self.tokens = float(self.capacity)
+        self.daily_remaining = per_day
+        self.top_up = top_up
+        self.exhausted = False
+        self.paused_until = 0.0
+        self.closed = False
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Wait for a token. Returns False when the daily budget is used up."""
+        while True:
+            with self.lock:
+                if self.closed:
+                    return False
+                if self.daily_remaining is not None and self.daily_remaining <= 0:
+                    if self.exhausted or self.top_up is None:
+                        return False
+                    self.daily_remaining = self.top_up()
+                    if self.daily_remaining <= 0:
+                        self.exhausted = True
+                        return False
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self._refill()
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        if self.daily_remaining is not None:
+                            self.daily_remaining -= 1
+                        return True
+                    wait = (1 - self.tokens) / self.rate
+            # Short naps so close() takes effect quickly
+            time.sleep(min(wait, 0.5))
+
+    def pause(self, seconds):
+        """Stop handing out tokens for `seconds`"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+    def exhaust(self):
+        """Treat the daily budget as spent"""
+        with self.lock:
+            self.daily_remaining = 0
+            self.exhausted = True
+
+    def close(self):
+        """Refuse all further tokens (run stopped)"""
+        with self.lock:
+            self.closed = True
+
+
+class Checkpoint:
+    """
+    Progress of one submission run, saved as JSON at most once a second
+    while the run is going and again when it ends.
+
+    The checkpoint is keyed by the set of URLs and the notification type,
+    so rerunning the same command resumes (even if the URLs come back in a
+    different priority order); a different URL list starts over.
+    """
+
+    def __init__(self, path, urls, notification_type):
+        self.path = path
+        digest = hashlib.sha256('\n'.join([notification_type] + sorted(urls)).encode('utf-8'))
+        self.key = digest.hexdigest()
+        self.done = set()
+        self.saved_at = 0.0
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+                if saved.get('key') == self.key:
+                    self.done = set(saved.get('done', []))
+            except (OSError, ValueError):
+                pass
+
+    def mark_done(self, url):
+        with self.lock:
+            self.done.add(url)
+            if time.monotonic() - self.saved_at >= 1.0:
+                self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        self.saved_at = time.monotonic()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': self.key, 'done': sorted(self.done)}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def submit_urls(urls, service_factory, submit_fn, max_workers=MAX_WORKERS,
+                per_minute=REQUESTS_PER_MINUTE, per_day=REQUESTS_PER_DAY, on_result=None,
+                batch_fn=None, batch_size=BATCH_SIZE, ledger=None,
+                notification_type='URL_UPDATED', window_hours=None,
+                checkpoint_file=CHECKPOINT_FILE, max_retries=MAX_RETRIES):
+    """
+    Submit URLs concurrently through a rate-limited thread pool.
+
+    service_factory() is called once per worker thread, because the
+    googleapiclient service object (httplib2) is not thread-safe.
+    submit_fn(service, url) must return a (success, result) tuple.
+    If batch_fn is given, URLs are sent in chunks of batch_size instead and
+    batch_fn(service, urls) must return {url: (success, result)}.
+    on_result(index, total, url, success, result) is called from the
+    calling thread as each URL completes.
+
+    Every request costs one token, whether sent alone, inside a batch or
+    as a retry. Only failed items are retried, at most max_retries times.
+
+    With a SubmissionLedger, URLs notified within window_hours are skipped,
+    the daily budget is reserved from the ledger's shared quota counter
+    (so parallel runs never overspend) and every outcome is recorded.
+    The reservation leaves headroom for retries and is topped up from the
+    ledger if they need more; whatever is left is released at the end.
+
+    URLs that finished (successfully or with a permanent error) are saved
+    to checkpoint_file. The checkpoint is removed once every URL is done;
+    otherwise the next run with the same URLs skips the finished ones.
+
+    Returns a stats dict with results, counts, skipped URLs, deferred URLs
+    (not sent because of quota or an auth failure), error classes and
+    throughput.
+    """
+    checkpoint = Checkpoint(checkpoint_file, urls, notification_type)
+    resumed = [url for url in urls if url in checkpoint.done]
+    urls = [url for url in urls if url not in checkpoint.done]
+
+    skipped = []
+    top_up = None
+    if ledger is not None:
+        if window_hours is None:
+            urls, skipped = ledger.filter_recent(urls, notification_type=notification_type)
+        else:
+            urls, skipped = ledger.filter_recent(urls, window_hours, notification_type)
+        # The whole run is counted against the day it started
+        day = quota_day()
+        daily_limit = per_day
+        per_day = ledger.reserve_quota(len(urls) + max_retries * max_workers, daily_limit, day=day)
+
+        def top_up():
+            return ledger.reserve_quota(max_workers, daily_limit, day=day)
+
+    bucket = TokenBucket(per_minute=per_minute, per_day=per_day, top_up=top_up)
+    local = threading.local()
+    stopped = threading.Event()
+    stop_reason = []
+    in_flight = 0
+    peak_in_flight = 0
+    requests_sent = 0
+    retries = 0
+    counter_lock = threading.Lock()
+
+    def send(urls_to_send):
+        """One HTTP request for urls_to_send -> {url: (success, result)}"""
+        nonlocal in_flight, peak_in_flight, requests_sent
+        with counter_lock:
+            in_flight += 1
+            requests_sent += 1
+            peak_in_flight = max(peak_in_flight, in_flight)
+        try:
+            if batch_fn:
+                outcomes = batch_fn(local.service, urls_to_send)
+                return {url: outcomes.get(url, (False, 'No response in batch')) for url in urls_to_send}
+            return {url: tuple(submit_fn(local.service, url)) for url in urls_to_send}
+        finally:
+            with counter_lock:
+                in_flight -= 1
+
+    def stop(reason):
+        with counter_lock:
+            if not stop_reason:
+                stop_reason.append(reason)
+        stopped.set()
+        bucket.close()
+
+    def auth_failed(error, urls_left):
+        """Connection or token refresh failed: stop and defer urls_left, like a 401"""
+        stop(f'Authentication failed: {str(error) or type(error).__name__}')
+        return [(url, None, stop_reason[0], None) for url in urls_left]
+
+    def worker(chunk):
+        nonlocal retries
+        if not hasattr(local, 'service'):
+            try:
+                local.service = service_factory()
+            except Exception as e:
+                return auth_failed(e, chunk)
+        if local.service is None:
+            return [(url, False, 'Could not create indexing service', PERMANENT) for url in chunk]
+
+        rows = []
+        pending = list(chunk)
+        attempt = 0
+        while pending:
+            allowed = []
+            for url in pending:
+                if stopped.is_set() or not bucket.acquire():
+                    break
+                allowed.append(url)
+            reason = stop_reason[0] if stop_reason else 'Daily quota exhausted'
+            rows += [(url, None, reason, None) for url in pending[len(allowed):]]
+            if not allowed:
+                break
+
+            try:
+                outcomes = send(allowed)
+            except Exception as e:
+                # Raised while building the service or refreshing its token
+                return rows + auth_failed(e, allowed)
+            retry = []
+            for url, (success, result) in outcomes.items():
+                if success:
+                    rows.append((url, True, result, None))
+                    continue
+                kind = classify_error(result)
+                if kind == QUOTA and attempt < max_retries:
+                    # Per-minute window: hold every worker back, then retry
+                    bucket.pause(QUOTA_PAUSE)
+                    retry.append(url)
+                elif kind == QUOTA:
+                    # Still throttled after every retry: leave it for the next run
+                    rows.append((url, None, f'Rate limited after {max_retries} retries', None))
+                elif kind == DAILY_QUOTA:
+                    bucket.exhaust()
+                    rows.append((url, None, 'Daily quota exhausted', None))
+                elif kind == AUTH:
+                    # Every request would fail the same way
+                    stop(f'Authentication failed: {result}')
+                    rows.append((url, None, stop_reason[0], None))
+                elif kind == TRANSIENT and attempt < max_retries:
+                    retry.append(url)
+                else:
+                    rows.append((url, False, result, kind))
+
+            pending = retry
+            if pending:
+                with counter_lock:
+                    retries += len(pending)
+                stopped.wait(backoff_delay(attempt))
+                attempt += 1
+        return rows
+
+    if batch_fn:
+        chunks = [urls[i:i + batch_size] for i in range(0, len(urls), batch_size)]
+    else:
+        chunks = [[url] for url in urls]
+
+    results = []
+    deferred = []
+    error_classes = {}
+    success_count = 0
+    failed_count = 0
+    done = 0
+    started = time.monotonic()
+
+    def collect(rows):
+        nonlocal success_count, failed_count, done
+        for url, success, result, kind in rows:
+            if success is None:
+                deferred.append(url)
+                continue
+            done += 1
+            if success:
+                success_count += 1
+            else:
+                failed_count += 1
+                error_classes[kind] = error_classes.get(kind, 0) + 1
+            results.append((url, success, result))
+            # Transient errors that ran out of retries are tried again next run
+            if success or kind != TRANSIENT:
+                checkpoint.mark_done(url)
+            if ledger is not None:
+                ledger.record(url, notification_type, success, result)
+            if on_result:
+                on_result(done, len(urls), url, success, result)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = [executor.submit(worker, chunk) for chunk in chunks]
+    collected = set()
+    try:
+        for future in as_completed(futures):
+            collected.add(future)
+            collect(future.result())
+    except KeyboardInterrupt:
+        # Drop queued work, let in-flight requests finish and keep their results
+        stop('Interrupted')
+        executor.shutdown(wait=False, cancel_futures=True)
+        wait([f for f in futures if not f.cancelled()])
+        for future in futures:
+            if future not in collected and not future.cancelled() and future.exception() is None:
+                collect(future.result())
+        if checkpoint_file:
+            print(f"\n💾 Progress saved to {checkpoint_file} - rerun the same command to resume")
+        raise
+    finally:
+        executor.shutdown(wait=True)
+        checkpoint.save()
+        if ledger is not None:
+            # Give back quota that was reserved but never used
+            ledger.release_quota(bucket.daily_remaining, day=day)
+
+    if not deferred and error_classes.get(TRANSIENT, 0) == 0:
+        checkpoint.clear()
+
+    elapsed = time.monotonic() - started
+    sent = success_count + failed_count
+
+    return {
+        'results': results,
+        'total': len(urls),
+        'success': success_count,
+        'failed': failed_count,
+        'failed_urls': [(url, result) for url, success, result in results if not success],
+        'deferred': deferred,
+        'skipped': skipped,
+        'resumed': resumed,
+        'error_classes': error_classes,
+        'retries': retries,
+        'stop_reason': stop_reason[0] if stop_reason else None,
+        'elapsed': elapsed,
+        'rate': sent / elapsed if elapsed > 0 else 0.0,
+        'http_requests': requests_sent,
+        'peak_in_flight': peak_in_flight,
+    }
+
+
+def print_throughput(stats):
+    """Print throughput numbers for a submission run"""
+    print(f"⏱️  Sent {stats['success'] + stats['failed']} notifications in {stats['http_requests']} "
+          f"HTTP requests, {stats['elapsed']:.1f}s ({stats['rate']:.1f} URLs/s, "
+          f"peak {stats['peak_in_flight']} in flight)")
+    if stats['resumed']:
+        print(f"↩️  {len(stats['resumed'])} URLs already done in the interrupted run - resumed after them")
+    if stats['skipped']:
+        print(f"⏭️  {len(stats['skipped'])} URLs skipped - already submitted recently")
+    if stats['retries']:
+        print(f"🔁 {stats['retries']} retries after transient or rate-limit errors")
+    if stats['error_classes']:
+        breakdown = ', '.join(f"{kind}: {count}" for kind, count in sorted(stats['error_classes'].items()))
+        print(f"❌ Errors by class - {breakdown}")
+    if stats['deferred']:
+        reason = stats['stop_reason'] or 'daily quota exhausted'
+        print(f"⏸️  {len(stats['deferred'])} URLs deferred ({reason}) - rerun to continue from the checkpoint")
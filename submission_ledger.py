@@ -0,0 +1,263 @@
+"""
+Indexing API Submission Ledger
+==============================
+SQLite record of every URL notification we publish.
+
+Each publish is stored with its URL, notification type, Google's
+notifyTime, the raw response and the HTTP error code (if it failed).
+The submitters use the ledger to:
+  - skip URLs that were already notified inside a time window
+  - share the daily quota across runs and parallel processes
+
+Google resets the Indexing API quota at midnight Pacific time, so the
+quota counter is keyed by the Pacific calendar day and by service account
+(each account's project has its own quota).
+
+Usage:
+    from submission_ledger import SubmissionLedger
+
+    ledger = SubmissionLedger()
+    urls, skipped = ledger.filter_recent(urls, window_hours=72)
+
+    # Quota and records for one service account
+    account_ledger = ledger.account('indexer@project.iam.gserviceaccount.com')
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+
+LEDGER_FILE = os.environ.get('SUBMISSION_LEDGER', 'submission-ledger.db')
+
+# URLs notified within this many hours are not submitted again
+RESUBMIT_WINDOW_HOURS = int(os.environ.get('RESUBMIT_WINDOW_HOURS', '72'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    account TEXT NOT NULL DEFAULT '',
+    notification_type TEXT NOT NULL,
+    submitted_at REAL NOT NULL,
+    notify_time TEXT,
+    success INTEGER NOT NULL,
+    error_code INTEGER,
+    response TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_submissions_url_time ON submissions (url, submitted_at);
+CREATE INDEX IF NOT EXISTS idx_submissions_time ON submissions (submitted_at);
+
+CREATE TABLE IF NOT EXISTS quota (
+    day TEXT NOT NULL,
+    account TEXT NOT NULL DEFAULT '',
+    used INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, account)
+);
+"""
+
+
+def quota_day(now=None):
+    """Current Indexing API quota day (Pacific time) as YYYY-MM-DD"""
+    now = now or datetime.now(timezone.utc)
+    try:
+        from zoneinfo import ZoneInfo
+        pacific = ZoneInfo('America/Los_Angeles')
+    except Exception:
+        pacific = timezone(timedelta(hours=-8))
+    return now.astimezone(pacific).strftime('%Y-%m-%d')
+
+
+def get_notify_time(response):
+    """Pull notifyTime out of a publish response"""
+    if not isinstance(response, dict):
+        return None
+    metadata = response.get('urlNotificationMetadata', response)
+    for key in ('latestUpdate', 'latestRemove'):
+        notify_time = (metadata.get(key) or {}).get('notifyTime')
+        if notify_time:
+            return notify_time
+    return None
+
+
+class SubmissionLedger:
+    """SQLite-backed history of URL notifications and daily quota usage"""
+
+    def __init__(self, path=LEDGER_FILE):
+        self.path = path
+        # timeout lets parallel processes wait for each other's writes;
+        # submit_urls workers top up the quota from their own threads, so
+        # writes are serialized by a lock instead of check_same_thread
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def account(self, name):
+        """View of this ledger whose quota and records belong to one account"""
+        return AccountLedger(self, name)
+
+    def record(self, url, notification_type, success, result, account=''):
+        """Store the outcome of one publish call"""
+        with self.lock:
+            self.conn.execute(
+                'INSERT INTO submissions (url, account, notification_type, submitted_at, notify_time, '
+                'success, error_code, response) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    url,
+                    account,
+                    notification_type,
+                    time.time(),
+                    get_notify_time(result) if success else None,
+                    1 if success else 0,
+                    None if success else getattr(result, 'code', None),
+                    json.dumps(result) if success else str(result),
+                ),
+            )
+            self.conn.commit()
+
+    def last_submitted(self, url, notification_type='URL_UPDATED'):
+        """Unix time of the last successful notification for url, or None"""
+        row = self.conn.execute(
+            'SELECT MAX(submitted_at) FROM submissions '
+            'WHERE url = ? AND notification_type = ? AND success = 1',
+            (url, notification_type),
+        ).fetchone()
+        return row[0]
+
+    def last_submitted_all(self, notification_type='URL_UPDATED'):
+        """{url: unix time of the last successful notification}"""
+        return dict(self.conn.execute(
+            'SELECT url, MAX(submitted_at) FROM submissions '
+            'WHERE notification_type = ? AND success = 1 GROUP BY url',
+            (notification_type,),
+        ))
+
+    def filter_recent(self, urls, window_hours=RESUBMIT_WINDOW_HOURS, notification_type='URL_UPDATED'):
+        """
+        Split urls into (to_submit, skipped), where skipped URLs were
+        successfully notified within the last window_hours.
+        """
+        if window_hours <= 0:
+            return list(urls), []
+        cutoff = time.time() - window_hours * 3600
+        recent = {
+            row[0] for row in self.conn.execute(
+                'SELECT DISTINCT url FROM submissions '
+                'WHERE submitted_at >= ? AND notification_type = ? AND success = 1',
+                (cutoff, notification_type),
+            )
+        }
+        to_submit = [url for url in urls if url not in recent]
+        skipped = [url for url in urls if url in recent]
+        return to_submit, skipped
+
+    def quota_used(self, day=None, account=''):
+        """Requests counted against the account's quota for the given day"""
+        row = self.conn.execute(
+            'SELECT used FROM quota WHERE day = ? AND account = ?', (day or quota_day(), account)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def quota_remaining(self, daily_limit, account=''):
+        return max(0, daily_limit - self.quota_used(account=account))
+
+    def reserve_quota(self, count, daily_limit, account='', day=None):
+        """
+        Atomically reserve up to `count` requests from today's quota
+        (or from `day`'s).
+
+        BEGIN IMMEDIATE takes the write lock before reading, so two
+        processes reserving at the same time can never overspend.
+        Returns the number of requests granted.
+        """
+        day = day or quota_day()
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self.conn.execute(
+                    'SELECT used FROM quota WHERE day = ? AND account = ?', (day, account)
+                ).fetchone()
+                used = row[0] if row else 0
+                granted = max(0, min(count, daily_limit - used))
+                self.conn.execute(
+                    'INSERT INTO quota (day, account, used) VALUES (?, ?, ?) '
+                    'ON CONFLICT(day, account) DO UPDATE SET used = used + excluded.used',
+                    (day, account, granted),
+                )
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+        return granted
+
+    def release_quota(self, count, account='', day=None):
+        """
+        Give back reserved requests that were never sent. Pass the day
+        they were reserved for, in case the run crossed Pacific midnight.
+        """
+        if count <= 0:
+            return
+        with self.lock:
+            self.conn.execute(
+                'UPDATE quota SET used = MAX(0, used - ?) WHERE day = ? AND account = ?',
+                (count, day or quota_day(), account),
+            )
+            self.conn.commit()
+
+    def usage_by_account(self, day=None):
+        """{account: requests used} for the given quota day"""
+        return dict(self.conn.execute(
+            'SELECT account, used FROM quota WHERE day = ? ORDER BY account', (day or quota_day(),)
+        ))
+
+    def summary(self):
+        """Totals for check_submission_history.py"""
+        total, ok, last = self.conn.execute(
+            'SELECT COUNT(*), SUM(success), MAX(submitted_at) FROM submissions'
+        ).fetchone()
+        urls = self.conn.execute('SELECT COUNT(DISTINCT url) FROM submissions').fetchone()[0]
+        return {
+            'total': total,
+            'success': ok or 0,
+            'failed': total - (ok or 0),
+            'unique_urls': urls,
+            'last_submitted': last,
+            'quota_used_today': sum(self.usage_by_account().values()),
+        }
+
+
+class AccountLedger:
+    """
+    SubmissionLedger bound to one service account.
+
+    Quota and records are per account; the resubmit window is shared, so a
+    URL notified through any account is skipped by all of them.
+    """
+
+    def __init__(self, ledger, account):
+        self.ledger = ledger
+        self.name = account
+
+    def record(self, url, notification_type, success, result):
+        self.ledger.record(url, notification_type, success, result, account=self.name)
+
+    def filter_recent(self, urls, window_hours=RESUBMIT_WINDOW_HOURS, notification_type='URL_UPDATED'):
+        return self.ledger.filter_recent(urls, window_hours, notification_type)
+
+    def quota_used(self, day=None):
+        return self.ledger.quota_used(day, account=self.name)
+
+    def quota_remaining(self, daily_limit):
+        return self.ledger.quota_remaining(daily_limit, account=self.name)
+
+    def reserve_quota(self, count, daily_limit, day=None):
+        return self.ledger.reserve_quota(count, daily_limit, account=self.name, day=day)
+
+    def release_quota(self, count, day=None):
+        self.ledger.release_quota(count, account=self.name, day=day)
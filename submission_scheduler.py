@@ -0,0 +1,210 @@
+"""
+Indexing API Submission Scheduler
+=================================
+Decides which URLs get the daily publish quota first.
+
+Every URL gets a priority score from:
+  - newness: pages we just created (NEW_CATEGORY_URLS) or never notified
+  - staleness: days since the last successful notification (ledger)
+  - index status: URLs whose getMetadata shows a removal newer than the
+    last update, or that Google never received (metadata_sweep cache)
+  - audit issues: pages seo_audit.py flagged are held back until fixed,
+    because Google is unlikely to index thin or broken pages
+
+The scheduler pops URLs off a priority queue day by day, giving each day
+as many URLs as the service accounts have quota for, and writes the
+resulting multi-day plan to submission-plan.csv.
+
+Usage:
+    python submission_scheduler.py            # plan for every sitemap URL
+
+    from submission_scheduler import prioritize
+    urls = prioritize(urls, ledger)           # highest value first
+"""
+
+import csv
+import heapq
+import os
+import time
+from datetime import date, timedelta
+
+from indexing_client import NEW_CATEGORY_URLS, AccountPool, load_urls
+from metadata_sweep import NEVER_RECEIVED, MetadataCache
+from submission_engine import REQUESTS_PER_DAY
+from submission_ledger import LEDGER_FILE, SubmissionLedger, quota_day
+
+AUDIT_REPORT = 'seo-audit-report.csv'
+PLAN_FILE = 'submission-plan.csv'
+
+# Score weights
+NEW_PAGE_SCORE = 50
+NEVER_SUBMITTED_SCORE = 40
+DROPPED_OUT_SCORE = 40
+STALE_SCORE_PER_DAY = 1
+STALE_SCORE_MAX = 30
+ERROR_ISSUE_PENALTY = 15      # ❌ issues (missing title, fetch failed, ...)
+WARNING_ISSUE_PENALTY = 5     # ⚠️ issues (length, word count, ...)
+
+# getMetadata answers older than this are too stale to plan with
+INDEX_STATUS_MAX_AGE_HOURS = 24 * 7
+
+
+def load_audit_issues(path=AUDIT_REPORT):
+    """{url: [issue, ...]} from the last seo_audit.py report"""
+    if not os.path.exists(path):
+        return {}
+    issues = {}
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row['Issues'] and row['Issues'] != 'OK':
+                issues[row['URL']] = row['Issues'].split(' | ')
+    return issues
+
+
+def load_index_status(urls, path=LEDGER_FILE):
+    """{url: metadata row} cached by metadata_sweep.py"""
+    if not os.path.exists(path):
+        return {}
+    return MetadataCache(path, ttl_hours=INDEX_STATUS_MAX_AGE_HOURS).get_fresh(urls)
+
+
+def score_url(url, last_submitted, new_urls, audit_issues, index_status, now=None):
+    """(score, reasons) for one URL"""
+    now = now or time.time()
+    score = 0
+    reasons = []
+
+    if url in new_urls:
+        score += NEW_PAGE_SCORE
+        reasons.append('new page')
+
+    if last_submitted is None:
+        score += NEVER_SUBMITTED_SCORE
+        reasons.append('never submitted')
+    else:
+        days = (now - last_submitted) / 86400
+        stale = min(STALE_SCORE_MAX, int(days * STALE_SCORE_PER_DAY))
+        if stale:
+            score += stale
+            reasons.append(f'last sent {days:.0f}d ago')
+
+    status = index_status.get(url)
+    if status:
+        if status['status'] == NEVER_RECEIVED:
+            if last_submitted is not None:
+                # Ledger says we sent it, Google has no record
+                score += DROPPED_OUT_SCORE
+                reasons.append('unknown to Google')
+        elif status['latest_remove'] and status['latest_remove'] > (status['latest_update'] or ''):
+            score += DROPPED_OUT_SCORE
+            reasons.append('dropped out of index')
+
+    for issue in audit_issues.get(url, []):
+        score -= ERROR_ISSUE_PENALTY if issue.startswith('❌') else WARNING_ISSUE_PENALTY
+    if url in audit_issues:
+        reasons.append(f"{len(audit_issues[url])} audit issue(s)")
+
+    return score, reasons
+
+
+def score_urls(urls, ledger=None, new_urls=NEW_CATEGORY_URLS, notification_type='URL_UPDATED'):
+    """[(score, url, reasons)] for every URL, in input order"""
+    last_submitted = ledger.last_submitted_all(notification_type) if ledger is not None else {}
+    new_urls = set(new_urls)
+    audit_issues = load_audit_issues()
+    index_status = load_index_status(urls, ledger.path if ledger is not None else LEDGER_FILE)
+    now = time.time()
+    scored = []
+    for url in dict.fromkeys(urls):
+        score, reasons = score_url(url, last_submitted.get(url), new_urls, audit_issues,
+                                   index_status, now)
+        scored.append((score, url, reasons))
+    return scored
+
+
+def build_plan(scored, capacities):
+    """
+    Spread scored URLs over days, highest score first.
+
+    capacities[i] is the number of publishes available on day i; the last
+    entry repeats until every URL is planned. Returns a list of days, each
+    a list of (score, url, reasons).
+    """
+    # Ties keep sitemap order
+    heap = [(-score, index, url, reasons) for index, (score, url, reasons) in enumerate(scored)]
+    heapq.heapify(heap)
+
+    plan = []
+    while heap:
+        capacity = capacities[min(len(plan), len(capacities) - 1)]
+        if capacity <= 0 and len(plan) >= len(capacities) - 1:
+            # No quota on any later day either
+            break
+        day = []
+        while heap and len(day) < capacity:
+            neg_score, index, url, reasons = heapq.heappop(heap)
+            day.append((-neg_score, url, reasons))
+        plan.append(day)
+    return plan
+
+
+def daily_capacities(ledger=None, per_day=REQUESTS_PER_DAY):
+    """[publishes left today, publishes per following day] across all accounts"""
+    pool = AccountPool(ledger=ledger, per_day=per_day)
+    today = sum(pool.remaining(name) for name in pool.clients)
+    return [today, per_day * len(pool.clients)]
+
+
+def prioritize(urls, ledger=None, notification_type='URL_UPDATED'):
+    """urls reordered so the most valuable are submitted first"""
+    scored = score_urls(urls, ledger, notification_type=notification_type)
+    order = {url: -score for score, url, reasons in scored}
+    # sorted() is stable, so equal scores keep their original order
+    return sorted(dict.fromkeys(urls), key=order.get)
+
+
+def main():
+    print("=" * 80)
+    print("📅 INDEXING API SUBMISSION PLAN")
+    print("=" * 80)
+    print()
+
+    urls = load_urls()
+    if not urls:
+        return
+
+    ledger = SubmissionLedger()
+    capacities = daily_capacities(ledger)
+    if capacities[-1] <= 0:
+        print("❌ No service account quota to plan with")
+        return
+    plan = build_plan(score_urls(urls, ledger), capacities)
+
+    start = date.fromisoformat(quota_day())
+    print(f"✅ {len(urls)} URLs, {capacities[0]} publishes left today, "
+          f"{capacities[1]} per day after that")
+    print()
+
+    with open(PLAN_FILE, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Day', 'Date', 'Rank', 'URL', 'Score', 'Reasons'])
+        for number, day in enumerate(plan):
+            day_date = start + timedelta(days=number)
+            print(f"📆 Day {number + 1} ({day_date.isoformat()}): {len(day)} URLs")
+            for rank, (score, url, reasons) in enumerate(day, 1):
+                writer.writerow([number + 1, day_date.isoformat(), rank, url, score, '; '.join(reasons)])
+                if rank <= 5:
+                    print(f"   {score:>4}  {url}  ({', '.join(reasons) or 'no signals'})")
+            if len(day) > 5:
+                print(f"   ... and {len(day) - 5} more")
+            print()
+
+    print(f"💾 Full plan saved to: {PLAN_FILE}")
+    print("   indexing_api.py and reindex_urls.py submit in this order automatically.")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Process interrupted")
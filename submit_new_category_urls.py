@@ -4,54 +4,12 @@ Submit New Category Pages to Google Indexing API
 This script submits only the new category pages created today
 """
 
-import json
-import time
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+import sys
+from indexing_client import NEW_CATEGORY_URLS, AccountPool, print_account_usage, print_metrics
+from submission_engine import print_throughput
+from submission_ledger import SubmissionLedger
+from url_resolver import submission_urls
 
-SERVICE_ACCOUNT_FILE = 'service-account.json'
-SCOPES = ['https://www.googleapis.com/auth/indexing']
-
-# New category URLs to submit
-NEW_CATEGORY_URLS = [
-    'https://www.prourlmonitor.com/tools/category/seo',
-    'https://www.prourlmonitor.com/tools/category/domain',
-    'https://www.prourlmonitor.com/tools/category/network',
-    'https://www.prourlmonitor.com/tools/category/text',
-    'https://www.prourlmonitor.com/tools/category/code',
-    'https://www.prourlmonitor.com/tools/category/converters',
-    'https://www.prourlmonitor.com/tools/category/ai',
-]
-
-def get_indexing_service():
-    """Create authenticated indexing service"""
-    try:
-        credentials = service_account.Credentials.from_service_account_file(
-            SERVICE_ACCOUNT_FILE, 
-            scopes=SCOPES
-        )
-        service = build('indexing', 'v3', credentials=credentials)
-        return service
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        return None
-
-def submit_url(service, url):
-    """Submit URL for indexing"""
-    try:
-        body = {
-            'url': url,
-            'type': 'URL_UPDATED'
-        }
-        response = service.urlNotifications().publish(body=body).execute()
-        return True, response
-    except HttpError as e:
-        error_details = json.loads(e.content.decode('utf-8'))
-        error_message = error_details.get('error', {}).get('message', str(e))
-        return False, error_message
-    except Exception as e:
-        return False, str(e)
 
 def main():
     print("=" * 80)
@@ -63,9 +21,17 @@ def main():
     print()
     print("-" * 80)
     
-    # Get service
-    service = get_indexing_service()
-    if not service:
+    # Final canonical URLs only (--no-resolve submits the list as it is)
+    urls = NEW_CATEGORY_URLS
+    if '--no-resolve' not in sys.argv:
+        urls = submission_urls(urls)
+    
+    # Connect
+    client = AccountPool(ledger=SubmissionLedger())
+    try:
+        client.connect()
+    except Exception as e:
+        print(f"❌ Error: {e}")
         return
     
     print("✅ Connected to Google Indexing API")
@@ -73,24 +39,19 @@ def main():
     print("📤 Submitting category pages...")
     print("-" * 80)
     
-    success_count = 0
-    failed_count = 0
-    
-    for index, url in enumerate(NEW_CATEGORY_URLS, 1):
-        print(f"\n[{index}/{len(NEW_CATEGORY_URLS)}] {url}")
-        
-        success, result = submit_url(service, url)
-        
+    def report(index, total, url, success, result):
         if success:
-            success_count += 1
-            print(f"   ✅ Successfully submitted")
+            print(f"[{index}/{total}] ✅ {url}")
         else:
-            failed_count += 1
-            print(f"   ❌ Failed: {result}")
-        
-        # Rate limiting
-        if index < len(NEW_CATEGORY_URLS):
-            time.sleep(0.5)
+            print(f"[{index}/{total}] ❌ {url} - {result}")
+    
+    # --batch sends up to 100 URLs per HTTP request
+    # Ledger skips URLs notified recently (--force resubmits them anyway)
+    window_hours = 0 if '--force' in sys.argv else None
+    stats = client.submit(urls, batch='--batch' in sys.argv, on_result=report,
+                          window_hours=window_hours)
+    success_count = stats['success']
+    failed_count = stats['failed']
     
     # Summary
     print()
@@ -98,9 +59,12 @@ def main():
     print("📊 SUBMISSION COMPLETE")
     print("=" * 80)
     print()
-    print(f"Total URLs: {len(NEW_CATEGORY_URLS)}")
+    print(f"Total URLs: {len(urls)}")
     print(f"✅ Successfully submitted: {success_count}")
     print(f"❌ Failed: {failed_count}")
+    print_throughput(stats)
+    print_account_usage(stats)
+    print_metrics(client.metrics)
     print()
     print("=" * 80)
     print("⏰ WHAT'S NEXT?")
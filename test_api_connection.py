@@ -5,12 +5,7 @@ This script tests if your API setup is working correctly
 """
 
 import json
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-
-SERVICE_ACCOUNT_FILE = 'service-account.json'
-SCOPES = ['https://www.googleapis.com/auth/indexing']
+from indexing_client import IndexingClient, SERVICE_ACCOUNT_FILE, get_credentials, print_metrics
 
 def test_api():
     print("=" * 80)
@@ -38,10 +33,7 @@ def test_api():
     # Step 2: Test authentication
     print("2️⃣  Testing authentication...")
     try:
-        credentials = service_account.Credentials.from_service_account_file(
-            SERVICE_ACCOUNT_FILE, 
-            scopes=SCOPES
-        )
+        credentials = get_credentials(SERVICE_ACCOUNT_FILE)
         print("   ✅ Credentials loaded successfully")
         print()
     except Exception as e:
@@ -51,7 +43,8 @@ def test_api():
     # Step 3: Build service
     print("3️⃣  Building API service...")
     try:
-        service = build('indexing', 'v3', credentials=credentials)
+        client = IndexingClient(pool_size=1)
+        client.connect()
         print("   ✅ API service built successfully")
         print()
     except Exception as e:
@@ -73,18 +66,13 @@ def test_api():
     print("4️⃣  Testing with sample URL...")
     test_url = "https://www.prourlmonitor.com/"
     
-    try:
-        # Try to get metadata (this won't submit, just checks permission)
-        print(f"   Testing URL: {test_url}")
-        
-        # Try publishing a notification
-        body = {
-            'url': test_url,
-            'type': 'URL_UPDATED'
-        }
-        
-        response = service.urlNotifications().publish(body=body).execute()
-        
+    print(f"   Testing URL: {test_url}")
+    
+    # Try publishing a notification
+    success, result = client.publish(test_url)
+    
+    if success:
+        response = result
         print("   ✅ API CALL SUCCESSFUL! 🎉")
         print()
         print("   📊 Response:")
@@ -100,10 +88,9 @@ def test_api():
         print("      ✅ API calls are going through to Google")
         print()
         
-    except HttpError as e:
-        error_details = json.loads(e.content.decode('utf-8'))
-        error_message = error_details.get('error', {}).get('message', str(e))
-        error_code = error_details.get('error', {}).get('code', 'Unknown')
+    else:
+        error_message = str(result)
+        error_code = getattr(result, 'code', None) or 'Unknown'
         
         print(f"   ❌ API CALL FAILED")
         print(f"   Error Code: {error_code}")
@@ -148,20 +135,19 @@ def test_api():
             print("   🔴 UNKNOWN ERROR")
             print()
             print("   Full error details:")
-            print(f"   {error_details}")
-        
-        print()
+            print(f"   {error_message}")
         
-    except Exception as e:
-        print(f"   ❌ Unexpected error: {e}")
         print()
     
+    print_metrics(client.metrics)
+    print()
+    
     print("=" * 80)
     print("📊 TEST COMPLETE")
     print("=" * 80)
     print()
     
-    if 'response' in locals():
+    if success:
         print("✅ RESULT: Your API setup is WORKING!")
         print()
         print("🚀 Next steps:")
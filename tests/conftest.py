@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# No politeness delay against the local fixture site; read when crawl_engine is imported
+os.environ.setdefault('CRAWL_DELAY', '0')
+os.environ.setdefault('CRAWL_DELAY_MIN', '0')
+
+from fixture_site import FixtureSite  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def site():
+    """A small fixture site served on a free port for the whole session"""
+    fixture = FixtureSite(pages=20, latency=0, jitter=0)
+    server = fixture.serve()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,82 @@
+import os
+import time
+from datetime import datetime, timezone
+
+from audit_diff import plan_incremental, report_time
+from audit_report import ReportWriter
+
+REPORT_TIME = datetime(2026, 5, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def row(status='success'):
+    return {'status': status, 'issues': []}
+
+
+def test_plan_incremental():
+    previous = {
+        'https://example.com/old': row(),
+        'https://example.com/changed': row(),
+        'https://example.com/same-day': row(),
+        'https://example.com/failed': row('error'),
+        'https://example.com/no-lastmod': row(),
+    }
+    lastmod = {
+        'https://example.com/old': datetime(2026, 5, 1, tzinfo=timezone.utc),
+        'https://example.com/changed': datetime(2026, 5, 10, 13, 0, tzinfo=timezone.utc),
+        # Date-only lastmod on the report's own day may be later that day
+        'https://example.com/same-day': datetime(2026, 5, 10, tzinfo=timezone.utc),
+        'https://example.com/failed': datetime(2026, 5, 1, tzinfo=timezone.utc),
+        'https://example.com/new': datetime(2026, 5, 1, tzinfo=timezone.utc),
+    }
+    urls = list(previous) + ['https://example.com/new']
+    to_audit, reused = plan_incremental(urls, previous, REPORT_TIME, lastmod)
+    assert list(reused) == ['https://example.com/old']
+    assert reused['https://example.com/old'] is previous['https://example.com/old']
+    assert to_audit == [
+        'https://example.com/changed', 'https://example.com/same-day', 'https://example.com/failed',
+        'https://example.com/no-lastmod', 'https://example.com/new',
+    ]
+
+
+def test_plan_incremental_without_lastmod_audits_everything():
+    previous = {'https://example.com/': row()}
+    assert plan_incremental(['https://example.com/'], previous, REPORT_TIME) == (['https://example.com/'], {})
+
+
+def result(url):
+    return {'url': url, 'meta_title': 'Title', 'title_length': 5, 'meta_description': None, 'desc_length': 0,
+            'h1': None, 'word_count': 0, 'issues': [], 'status': 'success'}
+
+
+def test_report_time_is_when_the_run_started(tmp_path):
+    report = str(tmp_path / 'report.csv')
+
+    def writer():
+        return ReportWriter(report_path=report, fixing_path=str(tmp_path / 'fixing.txt'))
+
+    before = datetime.now(timezone.utc)
+    first = writer()
+    first.open()
+    first.write(result('https://example.com/a'))
+    first.close(complete=False)
+    time.sleep(0.05)
+    resumed_at = datetime.now(timezone.utc)
+
+    # The resumed run finishes later but keeps the interrupted run's start
+    resumed = writer()
+    resumed.open()
+    resumed.write(result('https://example.com/b'))
+    time.sleep(0.05)
+    resumed.close(complete=True)
+    started = report_time(report)
+    assert before <= started < resumed_at
+    assert started < datetime.fromtimestamp(os.path.getmtime(report), timezone.utc)
+
+
+def test_report_without_start_time_is_audited_in_full(tmp_path):
+    report = tmp_path / 'report.csv'
+    report.write_text('URL\n')
+    assert report_time(str(report)) is None
+    previous = {'https://example.com/': row()}
+    lastmod = {'https://example.com/': datetime(2020, 1, 1, tzinfo=timezone.utc)}
+    assert plan_incremental(['https://example.com/'], previous, None, lastmod) == (['https://example.com/'], {})
@@ -0,0 +1,115 @@
+import asyncio
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+# seo_audit (imported by crawl_engine) needs requests
+pytest.importorskip('requests')
+
+import crawl_engine  # noqa: E402
+from page_cache import PageCache  # noqa: E402
+from request_timing import new_timing  # noqa: E402
+
+
+class UrllibSession:
+    """crawl_engine session over urllib, for a crawl without aiohttp or httpx"""
+
+    errors = (OSError,)
+    url_errors = (ValueError,)
+
+    def __init__(self, concurrency=None, per_host=None):
+        self.requests = []
+
+    def fetch(self, url, headers):
+        self.requests.append((url, dict(headers or {})))
+        try:
+            with urlopen(Request(url, headers=headers or {}), timeout=10) as response:
+                return (response.status, response.reason, response.headers, response.read(),
+                        response.headers.get_content_charset(), [], new_timing())
+        except HTTPError as e:
+            return e.code, e.reason, e.headers, e.read(), None, [], new_timing()
+
+    async def get(self, url, headers=None):
+        return await asyncio.to_thread(self.fetch, url, headers)
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = UrllibSession()
+    monkeypatch.setattr(crawl_engine, 'open_session', lambda concurrency, per_host: session)
+    return session
+
+
+def crawl(urls, cache):
+    stats = {}
+    results = asyncio.run(crawl_engine.crawl(urls, concurrency=4, per_host=4, cache=cache, stats=stats,
+                                             parse_workers=0))
+    return results, stats
+
+
+def tool_urls(site):
+    return [site.base_url + path for path in site.site.tools[:5]]
+
+
+def test_unchanged_pages_come_from_the_cache(site, session, tmp_path):
+    urls = tool_urls(site)
+    cache = PageCache(str(tmp_path / 'cache.db'))
+    cold, stats = crawl(urls, cache)
+    assert stats['fetched'] == len(urls) and stats['not_modified'] == 0
+    cache.flush()
+
+    warm, stats = crawl(urls, PageCache(str(tmp_path / 'cache.db')))
+    assert stats['not_modified'] == len(urls) and stats['fetched'] == 0
+    assert all('If-None-Match' in headers for url, headers in session.requests[len(urls):])
+    for before, after in zip(cold, warm):
+        assert after['meta_title'] == before['meta_title']
+        assert after['word_count'] == before['word_count']
+
+
+def test_304_without_a_cached_record_refetches(site, session, tmp_path, monkeypatch):
+    urls = tool_urls(site)[:1]
+    cache = PageCache(str(tmp_path / 'cache.db'))
+    crawl(urls, cache)
+    # Validators are known but the record is gone
+    monkeypatch.setattr(cache, 'get', lambda url: None)
+    session.requests.clear()
+
+    results, stats = crawl(urls, cache)
+    result = results[0]
+    assert [bool(headers) for url, headers in session.requests] == [True, False]
+    assert result['status'] == 'success'
+    assert result['meta_title'] and result['word_count'] > 0
+    assert stats['not_modified'] == 0 and stats['fetched'] == 1
+
+
+def test_malformed_url_fails_alone(site, session, tmp_path):
+    urls = tool_urls(site)[:2] + ['http://[broken/']
+    results, stats = crawl(urls, None)
+    assert [result['status'] for result in results] == ['success', 'success', 'error']
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_failing_on_result_stops_the_crawl(site, session, tmp_path, cached):
+    urls = [site.base_url + path for path in site.site.tools]
+    cache = PageCache(str(tmp_path / 'cache.db'))
+    if cached:
+        # Warm cache: pages finish in the fetch stage (304) instead of the parse stage
+        crawl(urls, cache)
+        cache.flush()
+    calls = []
+
+    def on_result(index, total, result):
+        calls.append(result['url'])
+        raise OSError('disk full')
+
+    with pytest.raises(OSError, match='disk full'):
+        asyncio.run(asyncio.wait_for(
+            crawl_engine.crawl(urls, concurrency=4, per_host=4, on_result=on_result, cache=cache,
+                               parse_workers=0),
+            timeout=20,
+        ))
+    assert len(calls) == len(set(calls))
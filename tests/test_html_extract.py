@@ -0,0 +1,41 @@
+import pytest
+
+from fixture_site import FixtureSite
+from html_extract import BACKENDS, available_backends
+
+DOCUMENTS = [
+    '',
+    '<p>Hello world</p>',
+    '<html><head><title>Title</title></head>Hello <b>there</b></html>',
+    '<title>Title</title><h1>Heading</h1><p>Some text</p><script>var x</script>',
+    '<nav>Menu</nav><p>Text <style>p {}</style>here</p>',
+    '<html><body><h1><script>var a = 1;</script>Title</h1><p>Text</p></body></html>',
+    '<html><body><header><h1><style>.a {}</style>Big <span>Title</span></h1></header>'
+    '<main>Main text</main></body></html>',
+    '<html><head><title>Only head</title><meta name="description" content="Description"></head></html>',
+]
+
+
+def fields(page):
+    """Extracted fields with the text's whitespace normalized"""
+    return dict(page, text=' '.join(page['text'].split()))
+
+
+def fixture_pages():
+    site = FixtureSite(pages=5, latency=0, jitter=0)
+    return [site.render(path)[0].decode('utf-8') for path in list(site.pages)[:8]]
+
+
+@pytest.mark.parametrize('html', DOCUMENTS + fixture_pages())
+def test_backends_agree(html):
+    backends = available_backends()
+    expected = fields(BACKENDS['html.parser'](html, links=True))
+    for name in backends:
+        assert fields(BACKENDS[name](html, links=True)) == expected, name
+
+
+def test_body_less_documents_and_scripts_in_headings():
+    page = BACKENDS['html.parser']('<title>Title</title><h1><script>x()</script>Heading</h1><p>Text</p>')
+    assert page['h1'] == 'Heading'
+    assert page['meta_title'] == 'Title'
+    assert page['text'] == 'HeadingText'
@@ -0,0 +1,59 @@
+from indexability import RobotsCache, RobotsRules, is_noindex, noindex_source, NOINDEX_HEADER, NOINDEX_META
+
+ROBOTS = """
+User-agent: *
+Disallow: /
+
+User-agent: Googlebot
+Disallow: /tools/
+Allow: /tools/category/
+Disallow: /*.json$
+Allow: /private
+Disallow: /private
+Disallow: /search?
+"""
+
+
+def test_googlebot_group_wins_over_star():
+    rules = RobotsRules.parse(ROBOTS)
+    assert rules.check('/')[0]
+    assert rules.check('/blog/post')[0]
+
+
+def test_longest_match_wins():
+    rules = RobotsRules.parse(ROBOTS)
+    assert rules.check('/tools/ping') == (False, 'Disallow: /tools/')
+    assert rules.check('/tools/category/seo') == (True, 'Allow: /tools/category/')
+
+
+def test_allow_wins_a_tie():
+    rules = RobotsRules.parse(ROBOTS)
+    assert rules.check('/private/page') == (True, 'Allow: /private')
+
+
+def test_wildcards_and_end_anchor():
+    rules = RobotsRules.parse(ROBOTS)
+    assert not rules.check('/data/feed.json')[0]
+    assert rules.check('/data/feed.json?v=2')[0]
+    assert not rules.check('/search?q=seo')[0]
+    assert rules.check('/search')[0]
+
+
+def test_star_group_when_no_googlebot_group():
+    rules = RobotsRules.parse("User-agent: *\nDisallow: /admin\n")
+    assert not rules.check('/admin/users')[0]
+    assert rules.check('/about')[0]
+
+
+def test_robots_cache_reads_the_site(site):
+    robots = RobotsCache()
+    assert robots.check(site.base_url + '/tools/ping')[0]
+    assert robots.check(site.base_url + '/api/status') == (False, 'Disallow: /api/')
+
+
+def test_noindex_directives():
+    assert is_noindex('noindex, follow')
+    assert is_noindex('googlebot: none')
+    assert not is_noindex('otherbot: noindex')
+    assert noindex_source('index, follow', 'noindex') == NOINDEX_HEADER
+    assert noindex_source('NOINDEX', None) == NOINDEX_META
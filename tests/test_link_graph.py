@@ -0,0 +1,34 @@
+import pytest
+
+# seo_audit (imported by crawl_engine) needs requests
+pytest.importorskip('requests')
+
+import crawl_engine  # noqa: E402
+import link_graph  # noqa: E402
+
+
+def test_crawl_site_runs_one_crawl(site, monkeypatch):
+    sessions = []
+    open_session = crawl_engine.open_session
+
+    def counting_session(concurrency, per_host):
+        sessions.append(open_session(concurrency, per_host))
+        return sessions[-1]
+
+    monkeypatch.setattr(crawl_engine, 'open_session', counting_session)
+    # Not linked from any page: only reached as an orphan, after the link crawl
+    orphan = site.base_url + '/tools/not-linked'
+    sitemap = [site.base_url + path for path in site.site.sitemap] + [orphan]
+    audited = []
+    homepage = site.base_url + '/'
+    graph = link_graph.crawl_site(homepage, sitemap, on_result=lambda index, total, result:
+                                  audited.append(result['url']))
+
+    assert len(sessions) == 1
+    assert len(audited) == len(set(audited))
+    assert set(sitemap) <= set(audited)
+    assert audited[-1] == orphan
+    rows = {url: depth for url, in_sitemap, depth, inlinks, outlinks in graph.rows(sitemap, homepage)}
+    assert rows[link_graph.normalize_url(homepage)] == 0
+    assert rows[link_graph.normalize_url(orphan)] is None
+    assert sum(depth is None for depth in rows.values()) == 1
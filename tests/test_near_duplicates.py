@@ -0,0 +1,41 @@
+import random
+
+from near_duplicates import DUPLICATE_THRESHOLD, find_clusters, minhash_signature, similarity
+
+WORDS = [f"word{number}" for number in range(2000)]
+
+
+def text(rng, words=400):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def test_identical_texts_have_identical_signatures():
+    rng = random.Random(1)
+    page = text(rng)
+    assert minhash_signature(page) == minhash_signature(page)
+    assert minhash_signature('too short') is None
+
+
+def test_clusters_near_duplicates_only():
+    rng = random.Random(7)
+    template = text(rng)
+    signatures = {
+        'https://example.com/tools/a': minhash_signature(template),
+        # Same copy with a different closing line
+        'https://example.com/tools/b': minhash_signature(template + ' try the tool now'),
+        'https://example.com/tools/c': minhash_signature('free online tool ' + template),
+    }
+    for number in range(20):
+        signatures[f"https://example.com/other/{number}"] = minhash_signature(text(rng))
+
+    clusters = find_clusters(signatures)
+    assert len(clusters) == 1
+    assert [url for url, score in clusters[0]] == [
+        'https://example.com/tools/a', 'https://example.com/tools/b', 'https://example.com/tools/c',
+    ]
+    assert all(score >= DUPLICATE_THRESHOLD for url, score in clusters[0])
+
+
+def test_unrelated_pages_are_not_similar():
+    rng = random.Random(3)
+    assert similarity(minhash_signature(text(rng)), minhash_signature(text(rng))) < 0.2
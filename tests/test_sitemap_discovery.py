@@ -0,0 +1,57 @@
+import io
+from datetime import datetime, timezone
+
+from sitemap_discovery import discover, parse_sitemap
+
+URLSET = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc> https://example.com/ </loc><lastmod>2026-03-01</lastmod></url>
+  <url><loc>https://example.com/tools/ping</loc><lastmod>2026-03-02T10:30:00Z</lastmod></url>
+  <url><loc>https://example.com/blog/post</loc></url>
+  <url><lastmod>2026-03-03</lastmod></url>
+</urlset>"""
+
+INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/sitemap-1.xml</loc></sitemap>
+  <sitemap><loc>https://example.com/sitemap-2.xml.gz</loc></sitemap>
+</sitemapindex>"""
+
+
+def parse(document):
+    urls, sitemaps = [], []
+    parse_sitemap(io.BytesIO(document), lambda loc, lastmod: urls.append((loc, lastmod)), sitemaps.append)
+    return urls, sitemaps
+
+
+def test_parse_urlset():
+    urls, sitemaps = parse(URLSET)
+    assert sitemaps == []
+    assert urls == [
+        ('https://example.com/', datetime(2026, 3, 1, tzinfo=timezone.utc)),
+        ('https://example.com/tools/ping', datetime(2026, 3, 2, 10, 30, tzinfo=timezone.utc)),
+        ('https://example.com/blog/post', None),
+    ]
+
+
+def test_parse_sitemap_index():
+    urls, sitemaps = parse(INDEX)
+    assert urls == []
+    assert sitemaps == ['https://example.com/sitemap-1.xml', 'https://example.com/sitemap-2.xml.gz']
+
+
+def test_discover_follows_robots_and_gzip_children(site):
+    stats = {}
+    urls = [url for url, lastmod in discover(site.base_url, stats=stats)]
+    assert len(urls) == len(site.site.sitemap)
+    assert urls[0] == site.base_url + '/'
+    assert stats['errors'] == 0 and stats['sitemaps'] == 2
+
+
+def test_discover_yields_each_url_once(site):
+    index = site.base_url + '/sitemap.xml'
+    child = site.base_url + '/sitemaps/0.xml'
+    stats = {}
+    urls = [url for url, lastmod in discover(sitemaps=[index, child, index], stats=stats)]
+    assert len(urls) == len(set(urls)) == len(site.site.sitemap)
+    assert stats['urls'] == len(urls)
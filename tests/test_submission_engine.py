@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+import submission_engine
+from submission_engine import TokenBucket, submit_urls
+from submission_ledger import SubmissionLedger, quota_day
+
+
+def test_burst_then_refill_rate():
+    bucket = TokenBucket(per_minute=600, per_day=1000, burst=5)
+    started = time.monotonic()
+    for _ in range(5):
+        assert bucket.acquire()
+    assert time.monotonic() - started < 0.05
+    # 600/min is one token every 0.1s once the burst is spent
+    for _ in range(3):
+        assert bucket.acquire()
+    assert time.monotonic() - started >= 0.25
+
+
+def test_daily_budget_is_a_hard_cap():
+    bucket = TokenBucket(per_minute=6000, per_day=3, burst=10)
+    assert [bucket.acquire() for _ in range(5)] == [True, True, True, False, False]
+    assert bucket.daily_remaining == 0
+
+
+def test_exhaust_and_close_refuse_tokens():
+    bucket = TokenBucket(per_minute=6000, per_day=100, burst=10)
+    bucket.exhaust()
+    assert not bucket.acquire()
+
+    bucket = TokenBucket(per_minute=6000, per_day=100, burst=10)
+    bucket.close()
+    assert not bucket.acquire()
+
+
+def test_close_releases_waiters():
+    bucket = TokenBucket(per_minute=1, per_day=100, burst=1)
+    assert bucket.acquire()
+    outcome = []
+    waiter = threading.Thread(target=lambda: outcome.append(bucket.acquire()))
+    waiter.start()
+    time.sleep(0.1)
+    bucket.close()
+    waiter.join(timeout=2)
+    assert outcome == [False]
+
+
+def test_pause_holds_tokens_back():
+    bucket = TokenBucket(per_minute=6000, per_day=100, burst=10)
+    bucket.pause(0.3)
+    started = time.monotonic()
+    assert bucket.acquire()
+    assert time.monotonic() - started >= 0.25
+
+
+def test_top_up_extends_the_daily_budget():
+    grants = [2, 0]
+    bucket = TokenBucket(per_minute=6000, per_day=1, burst=10, top_up=lambda: grants.pop(0))
+    assert [bucket.acquire() for _ in range(5)] == [True, True, True, False, False]
+    assert grants == []
+
+
+class HttpError(str):
+    code = None
+
+
+def http_error(code):
+    error = HttpError(f'HTTP {code}')
+    error.code = code
+    return error
+
+
+@pytest.fixture
+def ledger(tmp_path, monkeypatch):
+    monkeypatch.setattr(submission_engine, 'backoff_delay', lambda attempt: 0)
+    monkeypatch.setattr(submission_engine, 'QUOTA_PAUSE', 0)
+    ledger = SubmissionLedger(str(tmp_path / 'ledger.db'))
+    yield ledger
+    ledger.close()
+
+
+def run(ledger, tmp_path, submit, urls, **options):
+    return submit_urls(urls, service_factory=object, submit_fn=submit, per_minute=60000,
+                       ledger=ledger.account('test'), window_hours=0,
+                       checkpoint_file=str(tmp_path / 'checkpoint.json'), **options)
+
+
+def test_retries_never_defer_while_quota_remains(ledger, tmp_path):
+    failures = {f'u{i}': 3 for i in range(5)}
+
+    def submit(service, url):
+        if failures[url]:
+            failures[url] -= 1
+            return False, http_error(503)
+        return True, {}
+
+    stats = run(ledger, tmp_path, submit, [f'u{i}' for i in range(5)], per_day=200, max_workers=2, max_retries=3)
+    assert stats['deferred'] == []
+    assert stats['success'] == 5
+    # Unused reservation is released: only the requests actually sent count
+    assert ledger.quota_used(quota_day(), account='test') == stats['http_requests'] == 20
+
+
+def test_persistent_rate_limit_is_deferred_after_max_retries(ledger, tmp_path):
+    calls = []
+
+    def submit(service, url):
+        calls.append(url)
+        if url == 'u0':
+            return False, http_error(429)
+        return True, {}
+
+    stats = run(ledger, tmp_path, submit, ['u0', 'u1'], per_day=200, max_workers=1, max_retries=2)
+    assert stats['deferred'] == ['u0']
+    assert calls.count('u0') == 3
+    assert stats['success'] == 1
+
+
+def test_run_across_midnight_releases_into_the_reserved_day(ledger, tmp_path, monkeypatch):
+    def submit(service, url):
+        # Pacific midnight passes while the run is going
+        monkeypatch.setattr('submission_ledger.quota_day', lambda now=None: '2026-03-02')
+        return True, {}
+
+    monkeypatch.setattr(submission_engine, 'quota_day', lambda: '2026-03-01')
+    stats = run(ledger, tmp_path, submit, ['u0', 'u1'], per_day=200, max_workers=1, max_retries=2)
+    assert stats['success'] == 2
+    assert ledger.quota_used('2026-03-01', account='test') == 2
+    assert ledger.quota_used('2026-03-02', account='test') == 0
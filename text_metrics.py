@@ -0,0 +1,177 @@
+"""
+Text Metrics
+============
+Content metrics for a page's main text, computed in a single pass.
+
+One tokenizer walks the text with finditer - no token list is ever built -
+and hands every lower-cased word, and every sentence end, to a set of
+accumulators. Each accumulator keeps only running counters and reports
+its metrics at the end:
+
+  WordCount      word_count
+  SentenceStats  sentence_count, avg_sentence_length (words per sentence)
+  Readability    syllables_per_word, reading_ease (Flesch, 0-100, higher
+                 is easier; 60-70 is plain English)
+  TopTerms       top_terms: [(term, count)] of the most frequent words,
+                 stopwords and numbers left out
+
+A new metric is a class with word(word), sentence_end() and result(); add
+it to TEXT_ACCUMULATORS or pass it to analyze(). near_duplicates.py plugs
+its MinHash shingling into the same pass.
+
+Usage:
+    from text_metrics import analyze
+
+    metrics = analyze(page['text'])
+    print(metrics['word_count'], metrics['reading_ease'])
+"""
+
+import heapq
+import re
+from functools import lru_cache
+
+# Words are runs of \w (the audit has always counted \b\w+\b); a run of
+# . ! ? followed by whitespace (or the end) closes a sentence, so "3.5" and
+# "example.com" do not
+TOKEN_PATTERN = re.compile(r'(\w+)|[.!?]+(?=\s|$)')
+VOWEL_GROUPS = re.compile(r'[aeiouy]+')
+
+TOP_TERMS = 10
+MIN_TERM_LENGTH = 3
+STOPWORDS = frozenset((
+    'about', 'after', 'all', 'also', 'and', 'any', 'are', 'because', 'been', 'before', 'being', 'between',
+    'both', 'but', 'can', 'could', 'did', 'does', 'doing', 'down', 'each', 'few', 'for', 'from', 'further',
+    'had', 'has', 'have', 'having', 'her', 'here', 'hers', 'him', 'his', 'how', 'into', 'its', 'itself',
+    'just', 'more', 'most', 'much', 'must', 'not', 'now', 'off', 'once', 'only', 'other', 'our', 'ours',
+    'out', 'over', 'own', 'same', 'she', 'should', 'some', 'such', 'than', 'that', 'the', 'their',
+    'theirs', 'them', 'then', 'there', 'these', 'they', 'this', 'those', 'through', 'too', 'under',
+    'until', 'very', 'was', 'were', 'what', 'when', 'where', 'which', 'while', 'who', 'whom', 'why',
+    'will', 'with', 'would', 'you', 'your', 'yours', 'yourself',
+))
+
+
+@lru_cache(maxsize=1 << 16)
+def syllables(word):
+    """Estimated syllables in a lower-case word (vowel groups, silent final e)"""
+    if not word.isalpha():
+        return 1
+    count = len(VOWEL_GROUPS.findall(word))
+    if count > 1 and word.endswith('e') and not word.endswith(('le', 'ee')):
+        count -= 1
+    return max(1, count)
+
+
+class WordCount:
+    def __init__(self):
+        self.words = 0
+
+    def word(self, word):
+        self.words += 1
+
+    def sentence_end(self):
+        pass
+
+    def result(self):
+        return {'word_count': self.words}
+
+
+class SentenceStats:
+    def __init__(self):
+        self.words = 0
+        self.sentences = 0
+        self.open = False
+
+    def word(self, word):
+        self.words += 1
+        self.open = True
+
+    def sentence_end(self):
+        if self.open:
+            self.sentences += 1
+            self.open = False
+
+    def result(self):
+        # Trailing words without a full stop still form a sentence
+        sentences = self.sentences + self.open
+        return {
+            'sentence_count': sentences,
+            'avg_sentence_length': round(self.words / sentences, 1) if sentences else 0.0,
+        }
+
+
+class Readability:
+    def __init__(self):
+        self.words = 0
+        self.syllables = 0
+        self.sentences = 0
+        self.open = False
+
+    def word(self, word):
+        self.words += 1
+        self.syllables += syllables(word)
+        self.open = True
+
+    def sentence_end(self):
+        if self.open:
+            self.sentences += 1
+            self.open = False
+
+    def result(self):
+        if not self.words:
+            return {'syllables_per_word': None, 'reading_ease': None}
+        per_word = self.syllables / self.words
+        words_per_sentence = self.words / (self.sentences + self.open)
+        return {
+            'syllables_per_word': round(per_word, 2),
+            'reading_ease': round(206.835 - 1.015 * words_per_sentence - 84.6 * per_word, 1),
+        }
+
+
+class TopTerms:
+    def __init__(self, limit=TOP_TERMS):
+        self.limit = limit
+        self.counts = {}
+
+    def word(self, word):
+        if len(word) >= MIN_TERM_LENGTH and word not in STOPWORDS and not word.isdigit():
+            self.counts[word] = self.counts.get(word, 0) + 1
+
+    def sentence_end(self):
+        pass
+
+    def result(self):
+        # Most frequent first; ties keep the order the terms first appeared
+        return {'top_terms': heapq.nlargest(self.limit, self.counts.items(), key=lambda item: item[1])}
+
+
+TEXT_ACCUMULATORS = (WordCount, SentenceStats, Readability, TopTerms)
+
+
+def default_accumulators():
+    return [accumulator() for accumulator in TEXT_ACCUMULATORS]
+
+
+def analyze(text, accumulators=None):
+    """Metrics dict from one pass over text (default: every TEXT_ACCUMULATORS metric)"""
+    if accumulators is None:
+        accumulators = default_accumulators()
+    on_word = [accumulator.word for accumulator in accumulators]
+    on_sentence_end = [accumulator.sentence_end for accumulator in accumulators]
+    for match in TOKEN_PATTERN.finditer(text or ''):
+        word = match.group(1)
+        if word is None:
+            for handler in on_sentence_end:
+                handler()
+            continue
+        word = word.lower()
+        for handler in on_word:
+            handler(word)
+    metrics = {}
+    for accumulator in accumulators:
+        metrics.update(accumulator.result())
+    return metrics
+
+
+def format_terms(terms, word_count):
+    """'term 2.1%; other 1.4%' - top terms with their keyword density"""
+    return '; '.join(f"{term} {count / word_count:.1%}" for term, count in terms) if word_count else ''
@@ -0,0 +1,286 @@
+"""
+Redirect & Canonical Resolver
+=============================
+Works out the URL Google should actually be told about: follows each URL's
+redirects one hop at a time, then reads the canonical link of the page it
+lands on.
+
+Redirects are followed by hand (no automatic redirects) so every hop is
+recorded. Hop results are memoized across URLs: sitemap URLs that share a
+redirect (http -> https, bare domain -> www, missing trailing slash) fetch
+it once, and a URL already seen as a hop is never fetched again.
+
+Flagged per URL:
+  - redirect chains (more than one hop) and redirect loops
+  - canonical mismatches: the final page's canonical (a <link
+    rel="canonical"> or a Link: rel="canonical" header) names another URL
+  - URLs that end in an error or a broken canonical
+
+The Indexing API submitters (indexing_api.py, reindex_urls.py,
+resubmit_all_optimized.py, submit_new_category_urls.py) submit only the
+final canonical URLs, each once; --no-resolve submits the URLs as listed.
+seo_audit.py reports redirects and canonical mismatches as page issues.
+
+Usage:
+    python url_resolver.py                      # every sitemap URL
+    python url_resolver.py https://example.com/page
+"""
+
+import csv
+import os
+import re
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.parse import urljoin
+from urllib.request import HTTPRedirectHandler, Request, build_opener
+
+from html_extract import extract_stdlib
+from link_graph import normalize_url
+
+RESOLUTION_FILE = 'url-resolution.csv'
+
+USER_AGENT = 'ProURLMonitor-SEOAudit/1.0'
+RESOLVE_TIMEOUT = 10
+# URLs resolved at once
+RESOLVE_WORKERS = int(os.environ.get('RESOLVE_WORKERS', '8'))
+# Google follows up to 10 redirect hops
+MAX_REDIRECTS = 10
+# The canonical link sits in <head>; the rest of the page is not read
+HEAD_BYTES = 64 * 1024
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+# Problems flagged for a URL
+REDIRECT_CHAIN = 'Redirect chain'
+REDIRECT_LOOP = 'Redirect loop'
+TOO_MANY_REDIRECTS = 'Too many redirects'
+CANONICAL_MISMATCH = 'Canonical mismatch'
+BROKEN_CANONICAL = 'Broken canonical'
+UNREACHABLE = 'Unreachable'
+
+LINK_CANONICAL = re.compile(r'<([^>]+)>\s*;[^,]*rel="?canonical"?', re.IGNORECASE)
+
+
+def is_page(status):
+    return status is not None and 200 <= status < 300
+
+
+class NoRedirects(HTTPRedirectHandler):
+    """Hands 3xx responses back as HTTPError instead of following them"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_opener = build_opener(NoRedirects)
+
+
+def page_canonical(body, charset, content_type):
+    """Canonical href in the start of an HTML body, or None"""
+    if 'html' not in (content_type or ''):
+        return None
+    try:
+        html = body.decode(charset or 'utf-8', errors='replace')
+    except LookupError:
+        html = body.decode('utf-8', errors='replace')
+    return extract_stdlib(html)['canonical']
+
+
+def fetch_hop(url):
+    """
+    One request without following redirects:
+    (status, Location, canonical, error), status None when unreachable.
+    """
+    request = Request(url, headers={'User-Agent': USER_AGENT})
+    try:
+        with _opener.open(request, timeout=RESOLVE_TIMEOUT) as response:
+            headers = response.headers
+            header = LINK_CANONICAL.search(headers.get('Link') or '')
+            canonical = header.group(1) if header else page_canonical(
+                response.read(HEAD_BYTES), headers.get_content_charset(), headers.get_content_type())
+            return response.status, None, canonical, None
+    except HTTPError as e:
+        return e.code, e.headers.get('Location'), None, None
+    except Exception as e:
+        return None, None, None, str(e) or type(e).__name__
+
+
+class Resolver:
+    """Follows redirects hop by hop; every hop is fetched once, whichever URL reaches it"""
+
+    def __init__(self, fetch=fetch_hop, max_redirects=MAX_REDIRECTS):
+        self.fetch = fetch
+        self.max_redirects = max_redirects
+        self.hops = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def hop(self, url):
+        """(status, Location, canonical, error) for url, fetched on first use"""
+        with self.lock:
+            future = self.hops.get(url)
+            owner = future is None
+            if owner:
+                future = self.hops[url] = Future()
+                self.requests += 1
+        if owner:
+            try:
+                future.set_result(self.fetch(url))
+            except Exception as e:
+                future.set_result((None, None, None, str(e) or type(e).__name__))
+        return future.result()
+
+    def follow(self, url):
+        """(chain of URLs from url to the last one fetched, last hop, problem or None)"""
+        chain = [url]
+        while True:
+            hop = self.hop(chain[-1])
+            status, location = hop[0], hop[1]
+            if status not in REDIRECT_STATUSES or not location:
+                return chain, hop, None
+            target = urljoin(chain[-1], location.strip())
+            if target in chain:
+                return chain + [target], hop, REDIRECT_LOOP
+            chain.append(target)
+            if len(chain) > self.max_redirects + 1:
+                return chain, hop, TOO_MANY_REDIRECTS
+
+    def resolve(self, url):
+        """
+        Resolution dict: url, hops (redirect targets in order), final,
+        status, canonical, target (URL to submit, or None) and problems.
+        """
+        chain, (status, location, canonical, error), problem = self.follow(url)
+        final = chain[-1]
+        problems = [problem] if problem else []
+        if len(chain) > 2 and not problem:
+            problems.append(f"{REDIRECT_CHAIN} ({len(chain) - 1} hops)")
+        if problem or not is_page(status):
+            if not problem:
+                problems.append(f"{UNREACHABLE} ({error or status})")
+            target = None
+        else:
+            target = final
+        if canonical and target:
+            canonical = urljoin(final, canonical)
+            if normalize_url(canonical) == normalize_url(final):
+                # Same page; submit it as the site spells it
+                target = canonical
+            else:
+                problems.append(CANONICAL_MISMATCH)
+                # The canonical may itself redirect; it must end in a page
+                canonical_chain, (canonical_status, *_), canonical_problem = self.follow(canonical)
+                if canonical_problem or not is_page(canonical_status):
+                    problems.append(f"{BROKEN_CANONICAL} ({canonical_problem or canonical_status})")
+                else:
+                    target = canonical_chain[-1]
+        return {
+            'url': url,
+            'hops': chain[1:],
+            'final': final,
+            'status': status,
+            'canonical': canonical,
+            'target': target,
+            'problems': problems,
+        }
+
+    def resolve_all(self, urls, workers=RESOLVE_WORKERS):
+        """Resolution dicts in URL order"""
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            return list(executor.map(self.resolve, urls))
+
+
+def redirect_hops(history, final_url):
+    """Redirect targets of a followed response (aiohttp, httpx or requests history), or []"""
+    if not history:
+        return []
+    return [str(response.url) for response in history[1:]] + [str(final_url)]
+
+
+def print_resolutions(resolutions, limit=10):
+    """Summary of redirects and canonicals, with the flagged URLs"""
+    redirected = [r for r in resolutions if r['hops']]
+    flagged = [r for r in resolutions if r['problems']]
+    print(f"🔀 {len(redirected)} of {len(resolutions)} URLs redirect, {len(flagged)} flagged")
+    for resolution in flagged[:limit]:
+        print(f"   ⚠️  {resolution['url']}: {', '.join(resolution['problems'])}")
+        for hop in resolution['hops']:
+            print(f"      -> {hop}")
+        if resolution['target'] and resolution['target'] != resolution['final']:
+            print(f"      canonical: {resolution['target']}")
+    if len(flagged) > limit:
+        print(f"   ... and {len(flagged) - limit} more")
+
+
+def submission_targets(urls, resolver=None):
+    """
+    {url: final canonical URL to submit, or None} for every URL, printing
+    what was flagged on the way.
+    """
+    resolver = resolver or Resolver()
+    print(f"🔀 Resolving redirects and canonicals of {len(urls)} URLs...")
+    resolutions = resolver.resolve_all(urls)
+    print_resolutions(resolutions)
+    targets = {resolution['url']: resolution['target'] for resolution in resolutions}
+    unique = {normalize_url(target) for target in targets.values() if target}
+    print(f"✅ {len(unique)} final canonical URLs to submit "
+          f"({len(urls) - len(unique)} duplicates or dead ends dropped, {resolver.requests} requests)")
+    print()
+    return targets
+
+
+def unique_targets(targets):
+    """Submittable URLs from submission_targets(), each once (trailing-slash variants collapse)"""
+    unique = {}
+    for target in targets.values():
+        if target and normalize_url(target) not in unique:
+            unique[normalize_url(target)] = target
+    return list(unique.values())
+
+
+def submission_urls(urls, resolver=None):
+    """Final canonical URLs for urls, each once"""
+    return unique_targets(submission_targets(urls, resolver))
+
+
+def write_resolutions(resolutions, path=RESOLUTION_FILE):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['URL', 'Status', 'Hops', 'Final URL', 'Canonical', 'Submit As', 'Problems'])
+        for r in resolutions:
+            writer.writerow([r['url'], r['status'] or '', len(r['hops']), r['final'], r['canonical'] or '',
+                             r['target'] or '', '; '.join(r['problems'])])
+
+
+def main():
+    print("=" * 80)
+    print("🔀 REDIRECTS & CANONICALS")
+    print("=" * 80)
+    print()
+
+    urls = [arg for arg in sys.argv[1:] if arg.startswith('http')]
+    if not urls:
+        from sitemap_discovery import load_urls
+
+        print("📂 Discovering URLs from robots.txt and sitemaps...")
+        urls = load_urls()
+    if not urls:
+        print("❌ No URLs found!")
+        return
+
+    resolver = Resolver()
+    resolutions = resolver.resolve_all(urls)
+    print_resolutions(resolutions, limit=len(resolutions))
+    print(f"   {resolver.requests} requests for {len(urls)} URLs")
+    write_resolutions(resolutions)
+    print()
+    print(f"💾 Resolutions saved to: {RESOLUTION_FILE}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrupted")